@@ -0,0 +1,134 @@
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.security import SecurityMiddleware
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+from rest_framework.exceptions import Throttled
+
+from api.cache import aget_cached, hit
+from api.renderers import json_renderer
+from api.throttles import CatalogReadThrottle
+
+ASYNC_ACTIONS = ('list', 'retrieve')
+
+# Middleware, заголовки которых ставятся и на ответы из кэша: они
+# зависят только от настроек и не обращаются к БД.
+HEADER_MIDDLEWARE = (SecurityMiddleware, XFrameOptionsMiddleware)
+
+
+def json_response(status, data, headers=None):
+    response = HttpResponse(
+        b'' if data is None else json_renderer().render(data),
+        status=status,
+        content_type='application/json',
+    )
+    for name, value in (headers or {}).items():
+        response[name] = value
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+def is_cacheable(request):
+    """Анонимный GET, на который DRF ответил бы JSON."""
+    return (
+        request.method == 'GET'
+        and settings.RESPONSE_CACHE_ENABLED
+        and 'HTTP_AUTHORIZATION' not in request.META
+        and 'text/html' not in request.META.get('HTTP_ACCEPT', '')
+        and 'format' not in request.GET
+    )
+
+
+async def throttle(request):
+    """Ограничение чтения каталога, как у CatalogReadThrottle в DRF."""
+    limiter = CatalogReadThrottle()
+    keys = (limiter.get_ident(request),)
+    if settings.THROTTLE_BACKEND == 'local':
+        allowed = limiter.check(keys)
+    else:
+        allowed = await sync_to_async(limiter.check)(keys)
+    if allowed:
+        return None
+    error = Throttled(limiter.wait())
+    return json_response(
+        error.status_code, {'detail': error.detail},
+        {'Retry-After': str(int(limiter.wait()))},
+    )
+
+
+async def cached_read(view_class, action, request, kwargs):
+    """Ответ из кэша ответов или None, если его там нет."""
+    view = view_class(action=action, kwargs=kwargs)
+    cached = await aget_cached(request, view.get_cache_scopes())
+    if cached is None:
+        return None
+    rejected = await throttle(request)
+    if rejected is not None:
+        return rejected
+    return json_response(*hit(request, cached))
+
+
+class AsyncReadsMixin:
+    """Даёт list и retrieve чтение из кэша ответов без DRF.
+
+    Само представление остаётся синхронным, `cached_read` вызывает
+    CachedReadMiddleware.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        action = actions.get('get')
+        if action in ASYNC_ACTIONS:
+            view.cached_read = partial(cached_read, cls, action)
+        return view
+
+
+class CachedReadMiddleware:
+    """Отдаёт анонимные GET из кэша ответов прямо в цикле событий.
+
+    Подключается первым при ASYNC_READS. Встроенные middleware Django
+    синхронные, и под ASGI каждое из них переходит в поток; ответ из
+    кэша обходит их и получает только заголовки HEADER_MIDDLEWARE.
+    Остальные запросы идут по обычной цепочке, синхронные
+    представления Django выполняет в потоке.
+    """
+    sync_capable = False
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header_middleware = [
+            middleware(get_response) for middleware in HEADER_MIDDLEWARE
+        ]
+
+    async def __call__(self, request):
+        response = None
+        if is_cacheable(request):
+            response = await self.cached_response(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+    async def cached_response(self, request):
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        read = getattr(match.func, 'cached_read', None)
+        if read is None:
+            return None
+        request.resolver_match = match
+        for middleware in self.header_middleware:
+            process_request = getattr(middleware, 'process_request', None)
+            if process_request and process_request(request) is not None:
+                return None
+        response = await read(request, match.kwargs)
+        if response is not None:
+            for middleware in self.header_middleware:
+                response = middleware.process_response(request, response)
+        return response
@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from api.tokens import CLAIM_FIELDS
+from users.models import User
+
+# Поля пользователя в кэше аутентификации: без пароля и личных данных.
+CACHED_FIELDS = ('id', 'is_active') + CLAIM_FIELDS
+
+
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def make_user(values):
+    """Пользователь из значений части полей.
+
+    Остальные поля отложены: обращение к ним загрузит строку из БД.
+    """
+    fields = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    return User.from_db(
+        DEFAULT_DB_ALIAS, fields, [values[name] for name in fields]
+    )
+
+
+def cached_user(user_id):
+    """Пользователь из кэша или, при промахе, из БД с записью в кэш.
+
+    В кэше лежат только поля CACHED_FIELDS. При AUTH_USER_CACHE_TTL = 0
+    строка читается из БД без кэша.
+    """
+    if not settings.AUTH_USER_CACHE_TTL:
+        values = User.objects.filter(pk=user_id).values(*CACHED_FIELDS).first()
+        return None if values is None else make_user(values)
+    cache = caches[settings.AUTH_USER_CACHE_ALIAS]
+    key = user_cache_key(user_id)
+    values = cache.get(key)
+    if values is None:
+        values = User.objects.filter(pk=user_id).values(*CACHED_FIELDS).first()
+        if values is None:
+            return None
+        cache.set(key, values, settings.AUTH_USER_CACHE_TTL)
+    return make_user(values)
+
+
+def forget_user(user_id):
+    caches[settings.AUTH_USER_CACHE_ALIAS].delete(user_cache_key(user_id))
+
+
+def user_from_claims(user_id, token):
+    """Пользователь, собранный из утверждений токена."""
+    values = {'id': user_id}
+    values.update((field, token[field]) for field in CLAIM_FIELDS)
+    return make_user(values)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса к таблице пользователей.
+
+    При AUTH_USER_CACHE_TTL > 0 пользователь берётся из кэша
+    AUTH_USER_CACHE_ALIAS, который сбрасывается при сохранении
+    и удалении пользователя, так что смена роли и блокировка действуют
+    сразу; кэш должен быть общим для процессов (проверка api.E001).
+    При AUTH_USER_CACHE_TTL = 0 для чтения открытых данных имя и роль
+    берутся из утверждений RoleAccessToken и устаревают вместе
+    с токеном, блокировка при этом не проверяется. Запись, представления
+    с разрешениями `fresh_user` (только для администратора) и токены
+    без утверждений проверяются по строке пользователя в БД.
+    """
+    from_claims = False
+
+    def authenticate(self, request):
+        view = (request.parser_context or {}).get('view')
+        self.from_claims = (
+            request.method in SAFE_METHODS
+            and view is not None
+            and not any(
+                getattr(permission, 'fresh_user', False)
+                for permission in view.get_permissions()
+            )
+        )
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('В токене нет идентификатора пользователя.')
+        if (
+            self.from_claims
+            and not settings.AUTH_USER_CACHE_TTL
+            and all(field in validated_token for field in CLAIM_FIELDS)
+        ):
+            return user_from_claims(user_id, validated_token)
+        user = cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                'Пользователь заблокирован.', code='user_inactive'
+            )
+        return user
@@ -0,0 +1,386 @@
+from collections import defaultdict, namedtuple
+from time import perf_counter
+
+from django.db import connection
+from django.db.models import Count
+from rest_framework.test import APIClient
+
+from api.profiling import percentile
+from api.tokens import RoleAccessToken
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import ADMIN_ROLE, User
+
+BENCH_PREFIX = 'bench'
+BULK_SIZE = 10
+
+# Путь и тело запроса — значения или функции (контекст, номер
+# повтора). Созданные объекты сохраняются в `context.created[save]`,
+# по ним следующие сценарии изменяют и удаляют их.
+Scenario = namedtuple(
+    'Scenario', 'name method path data client status save',
+    defaults=(None, 'anon', 200, None),
+)
+
+
+def group_scenarios(basename, model_name):
+    url = f'/api/v1/{basename}/'
+    return (
+        Scenario(f'{basename}.list', 'get', url),
+        Scenario(f'{basename}.search', 'get', f'{url}?search=1'),
+        Scenario(
+            f'{basename}.stats', 'get',
+            lambda context, i: f'{url}{getattr(context, model_name)}/stats/',
+        ),
+        Scenario(
+            f'{basename}.create', 'post', url,
+            lambda context, i: {
+                'name': f'Бенчмарк {i}', 'slug': f'{BENCH_PREFIX}-{i}'
+            },
+            client='admin', status=201,
+        ),
+        Scenario(
+            f'{basename}.destroy', 'delete',
+            lambda context, i: f'{url}{BENCH_PREFIX}-{i}/',
+            client='admin', status=204,
+        ),
+    )
+
+
+def review_url(context, i):
+    return f'/api/v1/titles/{context.titles[i]}/reviews/'
+
+
+def comment_url(context, i=None):
+    return (
+        f'/api/v1/titles/{context.hot_title}/reviews/'
+        f'{context.hot_review}/comments/'
+    )
+
+
+SCENARIOS = (
+    *group_scenarios('genres', 'genre'),
+    *group_scenarios('categories', 'category'),
+    Scenario('titles.list', 'get', '/api/v1/titles/'),
+    Scenario(
+        'titles.filter', 'get',
+        lambda context, i: (
+            f'/api/v1/titles/?genre={context.genre}'
+            f'&category={context.category}'
+        ),
+    ),
+    Scenario('titles.name', 'get', '/api/v1/titles/?name=мир'),
+    Scenario('titles.ordering', 'get', '/api/v1/titles/?ordering=-rating'),
+    Scenario('titles.cursor', 'get', '/api/v1/titles/?pagination=cursor'),
+    Scenario('titles.top', 'get', '/api/v1/titles/top/'),
+    Scenario(
+        'titles.retrieve', 'get',
+        lambda context, i: f'/api/v1/titles/{context.hot_title}/',
+    ),
+    Scenario(
+        'titles.create', 'post', '/api/v1/titles/',
+        lambda context, i: {
+            'name': f'Бенчмарк {i}', 'year': 2000,
+            'genre': [context.genre], 'category': context.category,
+        },
+        client='admin', status=201, save='title',
+    ),
+    Scenario(
+        'titles.partial_update', 'patch',
+        lambda context, i: f'/api/v1/titles/{context.created["title"][i]}/',
+        {'name': 'Бенчмарк'}, client='admin',
+    ),
+    Scenario(
+        'titles.destroy', 'delete',
+        lambda context, i: f'/api/v1/titles/{context.created["title"][i]}/',
+        client='admin', status=204,
+    ),
+    Scenario(
+        'reviews.list', 'get',
+        lambda context, i: f'/api/v1/titles/{context.hot_title}/reviews/',
+    ),
+    Scenario(
+        'reviews.retrieve', 'get',
+        lambda context, i: (
+            f'/api/v1/titles/{context.hot_title}/reviews/'
+            f'{context.hot_review}/'
+        ),
+    ),
+    Scenario(
+        'reviews.create', 'post', review_url,
+        {'text': 'Бенчмарк', 'score': 7},
+        client='user', status=201, save='review',
+    ),
+    Scenario(
+        'reviews.partial_update', 'patch',
+        lambda context, i: (
+            f'{review_url(context, i)}{context.created["review"][i]}/'
+        ),
+        {'score': 3}, client='user',
+    ),
+    Scenario(
+        'reviews.destroy', 'delete',
+        lambda context, i: (
+            f'{review_url(context, i)}{context.created["review"][i]}/'
+        ),
+        client='user', status=204,
+    ),
+    Scenario(
+        'reviews.bulk', 'post',
+        lambda context, i: f'{review_url(context, i)}bulk/',
+        lambda context, i: [
+            {'author': author, 'text': 'Бенчмарк', 'score': 5}
+            for author in context.authors
+        ],
+        client='admin',
+    ),
+    Scenario('comments.list', 'get', comment_url),
+    Scenario(
+        'comments.retrieve', 'get',
+        lambda context, i: f'{comment_url(context)}{context.hot_comment}/',
+    ),
+    Scenario(
+        'comments.create', 'post', comment_url, {'text': 'Бенчмарк'},
+        client='user', status=201, save='comment',
+    ),
+    Scenario(
+        'comments.partial_update', 'patch',
+        lambda context, i: (
+            f'{comment_url(context)}{context.created["comment"][i]}/'
+        ),
+        {'text': 'Бенчмарк'}, client='user',
+    ),
+    Scenario(
+        'comments.destroy', 'delete',
+        lambda context, i: (
+            f'{comment_url(context)}{context.created["comment"][i]}/'
+        ),
+        client='user', status=204,
+    ),
+    Scenario(
+        'comments.bulk', 'post',
+        lambda context, i: f'{comment_url(context)}bulk/',
+        [{'text': 'Бенчмарк'}] * BULK_SIZE,
+        client='admin',
+    ),
+    Scenario('users.list', 'get', '/api/v1/users/', client='admin'),
+    Scenario(
+        'users.search', 'get', '/api/v1/users/?search=user1', client='admin'
+    ),
+    Scenario(
+        'users.retrieve', 'get',
+        lambda context, i: f'/api/v1/users/{context.username}/',
+        client='admin',
+    ),
+    Scenario(
+        'users.create', 'post', '/api/v1/users/',
+        lambda context, i: {
+            'username': f'{BENCH_PREFIX}-new-{i}',
+            'email': f'{BENCH_PREFIX}-new-{i}@yamdb.fake',
+        },
+        client='admin', status=201,
+    ),
+    Scenario(
+        'users.partial_update', 'patch',
+        lambda context, i: f'/api/v1/users/{BENCH_PREFIX}-new-{i}/',
+        {'bio': 'Бенчмарк'}, client='admin',
+    ),
+    Scenario(
+        'users.destroy', 'delete',
+        lambda context, i: f'/api/v1/users/{BENCH_PREFIX}-new-{i}/',
+        client='admin', status=204,
+    ),
+    Scenario('users.me', 'get', '/api/v1/users/me/', client='user'),
+    Scenario(
+        'users.me_update', 'patch', '/api/v1/users/me/',
+        {'bio': 'Бенчмарк'}, client='user',
+    ),
+)
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def value(item, context, index):
+    return item(context, index) if callable(item) else item
+
+
+def get_client(user=None):
+    client = APIClient()
+    if user is not None:
+        token = RoleAccessToken.for_user(user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+class Context:
+    """Объекты набора данных, к которым обращаются сценарии.
+
+    Популярное произведение — с наибольшим числом отзывов, его отзыв —
+    с наибольшим числом комментариев. Пользователи бенчмарка создаются
+    заново; отзывы пишутся на первые `iterations` произведений.
+    """
+
+    def __init__(self, iterations):
+        self.hot_title = (
+            Title.objects.order_by('-rating_count', 'id')
+            .values_list('id', flat=True).first()
+        )
+        self.hot_review = (
+            Review.objects.filter(title_id=self.hot_title)
+            .annotate(comments_count=Count('comments'))
+            .order_by('-comments_count', 'id')
+            .values_list('id', flat=True).first()
+        )
+        self.hot_comment = (
+            Comment.objects.filter(review_id=self.hot_review)
+            .values_list('id', flat=True).first()
+        )
+        self.genre = Genre.objects.values_list('slug', flat=True).first()
+        self.category = (
+            Category.objects.values_list('slug', flat=True).first()
+        )
+        self.username = (
+            User.objects.order_by('id').values_list('username', flat=True)
+            .first()
+        )
+        self.titles = list(
+            Title.objects.order_by('id')
+            .values_list('id', flat=True)[:iterations]
+        )
+        self.created = defaultdict(list)
+        if self.hot_comment is None or len(self.titles) < iterations:
+            raise BenchmarkError(
+                f'Нужны произведения (не меньше {iterations}) с отзывами '
+                'и комментариями: загрузите данные через generate_data.'
+            )
+        self.authors = [
+            f'{BENCH_PREFIX}-author-{number}' for number in range(BULK_SIZE)
+        ]
+        User.objects.bulk_create(
+            User(username=username, email=f'{username}@yamdb.fake')
+            for username in self.authors
+        )
+        self.clients = {
+            'anon': get_client(),
+            'user': get_client(User.objects.create(
+                username=f'{BENCH_PREFIX}-user',
+                email=f'{BENCH_PREFIX}-user@yamdb.fake',
+            )),
+            'admin': get_client(User.objects.create(
+                username=f'{BENCH_PREFIX}-admin',
+                email=f'{BENCH_PREFIX}-admin@yamdb.fake',
+                role=ADMIN_ROLE,
+            )),
+        }
+        # Пользователь токена попадает в кэш до замеров, иначе число
+        # SQL зависело бы от того, какой сценарий идёт первым.
+        for name in ('user', 'admin'):
+            self.clients[name].get('/api/v1/users/me/')
+
+
+class QueryCounter:
+    """Обёртка запросов к БД, считает их число."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def request(scenario, context, index):
+    client = context.clients[scenario.client]
+    response = getattr(client, scenario.method)(
+        value(scenario.path, context, index),
+        value(scenario.data, context, index),
+        format='json',
+    )
+    if response.status_code != scenario.status:
+        raise BenchmarkError(
+            f'{scenario.name}: ответ {response.status_code} вместо '
+            f'{scenario.status}: {response.content[:200]!r}'
+        )
+    if scenario.save:
+        context.created[scenario.save].append(response.data['id'])
+
+
+def measure(scenario, context, indexes):
+    """Время каждого запроса сценария и общее число SQL-запросов."""
+    counter = QueryCounter()
+    timings = []
+    with connection.execute_wrapper(counter):
+        for index in indexes:
+            started = perf_counter()
+            request(scenario, context, index)
+            timings.append(perf_counter() - started)
+    return timings, counter.count
+
+
+def run(scenarios, iterations, warmup=0, rounds=1):
+    """Замеры сценариев: запросы в секунду, перцентили и SQL на запрос.
+
+    Сценарии прогоняются по кругу `rounds` раз, по `iterations`
+    запросов за круг, так что кратковременный шум задевает все
+    сценарии понемногу. `best` — наименьшая медиана кругов. Прогрев
+    повторяет только чтения: запись меняет данные.
+    """
+    context = Context(iterations * rounds)
+    for scenario in scenarios:
+        if scenario.method == 'get':
+            for index in range(warmup):
+                request(scenario, context, index)
+    samples = {scenario.name: ([], [], 0) for scenario in scenarios}
+    for number in range(rounds):
+        indexes = range(number * iterations, (number + 1) * iterations)
+        for scenario in scenarios:
+            timings, medians, queries = samples[scenario.name]
+            measured, count = measure(scenario, context, indexes)
+            timings.extend(measured)
+            medians.append(percentile(measured, 0.5))
+            samples[scenario.name] = (timings, medians, queries + count)
+    return {
+        name: {
+            'requests': len(timings),
+            'rps': len(timings) / sum(timings),
+            'p50': percentile(timings, 0.5),
+            'p95': percentile(timings, 0.95),
+            'p99': percentile(timings, 0.99),
+            'best': min(medians),
+            'queries': queries / len(timings),
+        }
+        for name, (timings, medians, queries) in samples.items()
+    }
+
+
+def dataset():
+    return {
+        model.__name__.lower(): model.objects.count()
+        for model in (Title, Review, Comment, User)
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Регрессии по сравнению с базовыми замерами.
+
+    Регрессия — больше SQL-запросов на запрос или лучшая медиана
+    кругов выше базовой больше чем на долю `tolerance`. Хвосты
+    распределения слишком шумные для порога, они только выводятся.
+    """
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if round(stats['queries'], 2) > round(base['queries'], 2):
+            regressions.append(
+                f'{name}: SQL на запрос {stats["queries"]:.2f} '
+                f'вместо {base["queries"]:.2f}'
+            )
+        if stats['best'] > base['best'] * (1 + tolerance):
+            regressions.append(
+                f'{name}: медиана {stats["best"] * 1000:.2f} мс '
+                f'вместо {base["best"] * 1000:.2f} мс'
+            )
+    return regressions
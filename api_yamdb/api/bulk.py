@@ -0,0 +1,218 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.exceptions import ParseError, ValidationError
+
+from api.cache import invalidate
+from api.serializers import (BulkCommentSerializer, BulkReviewSerializer,
+                             CommentSerializer, ReviewSerializer)
+from reviews.models import Comment, Review, Title
+from reviews.rating import update_title_rating
+from reviews.stats import review_day, shift_review_volume
+from users.models import ADMIN_ROLE, User
+
+NOT_A_LIST = 'Ожидается список записей.'
+TOO_MANY_ITEMS = 'Не больше {limit} записей в одном запросе.'
+AUTHOR_FORBIDDEN = 'Указывать автора может только администратор.'
+AUTHOR_NOT_FOUND = 'Пользователь не найден.'
+TITLE_REQUIRED = 'Укажите произведение.'
+TITLE_NOT_FOUND = 'Произведение не найдено.'
+DUPLICATE_REVIEW = 'Возможен только один отзыв на произведение!'
+
+
+def check_batch(items):
+    if not isinstance(items, list):
+        raise ValidationError(NOT_A_LIST)
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise ValidationError(
+            TOO_MANY_ITEMS.format(limit=settings.BULK_MAX_ITEMS)
+        )
+
+
+def failure(code, field, message):
+    return {'status': code, 'errors': {field: [message]}}
+
+
+def validate_items(items, serializer_class, user):
+    """Проверяет поля записей, не обращаясь к БД.
+
+    Возвращает список результатов, где у прошедших проверку записей
+    пока None, и их данные по номерам записей.
+    """
+    results = [None] * len(items)
+    valid = {}
+    is_admin = user.role == ADMIN_ROLE or user.is_superuser
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if not serializer.is_valid():
+            results[index] = {
+                'status': status.HTTP_400_BAD_REQUEST,
+                'errors': serializer.errors,
+            }
+            continue
+        data = dict(serializer.validated_data)
+        if data.get('author', user.username) != user.username and (
+            not is_admin
+        ):
+            results[index] = failure(
+                status.HTTP_403_FORBIDDEN, 'author', AUTHOR_FORBIDDEN
+            )
+            continue
+        valid[index] = data
+    return results, valid
+
+
+def resolve_authors(valid, user, results):
+    """Подставляет авторов записей, выбирая их одним запросом."""
+    names = {
+        data['author'] for data in valid.values()
+        if data.get('author', user.username) != user.username
+    }
+    authors = {user.username: user}
+    if names:
+        authors.update(
+            (author.username, author)
+            for author in User.objects.filter(username__in=names)
+        )
+    for index, data in list(valid.items()):
+        author = authors.get(data.pop('author', user.username))
+        if author is None:
+            results[index] = failure(
+                status.HTTP_404_NOT_FOUND, 'author', AUTHOR_NOT_FOUND
+            )
+            del valid[index]
+        else:
+            data['author'] = author
+
+
+def resolve_titles(valid, results):
+    """Подставляет произведения из поля `title`, выбирая их одним запросом."""
+    ids = {data['title'] for data in valid.values() if 'title' in data}
+    titles = Title.objects.in_bulk(ids) if ids else {}
+    for index, data in list(valid.items()):
+        if 'title' not in data:
+            results[index] = failure(
+                status.HTTP_400_BAD_REQUEST, 'title', TITLE_REQUIRED
+            )
+        elif data['title'] not in titles:
+            results[index] = failure(
+                status.HTTP_404_NOT_FOUND, 'title', TITLE_NOT_FOUND
+            )
+        else:
+            data['title'] = titles[data['title']]
+            continue
+        del valid[index]
+
+
+def reject_duplicates(valid, results):
+    """Отклоняет повторные отзывы — уже сохранённые и внутри пачки."""
+    pairs = {(data['title'].pk, data['author'].pk) for data in valid.values()}
+    if not pairs:
+        return
+    existing = set(
+        Review.objects
+        .filter(
+            title_id__in={title_id for title_id, _ in pairs},
+            author_id__in={author_id for _, author_id in pairs},
+        )
+        .values_list('title_id', 'author_id')
+    )
+    for index, data in list(valid.items()):
+        pair = (data['title'].pk, data['author'].pk)
+        if pair in existing:
+            results[index] = failure(
+                status.HTTP_400_BAD_REQUEST,
+                'non_field_errors',
+                DUPLICATE_REVIEW,
+            )
+            del valid[index]
+        existing.add(pair)
+
+
+def save_reviews(reviews):
+    """Вставляет отзывы и сдвигает рейтинг каждого произведения один раз.
+
+    Отзывы по дням и статистика жанров и категорий сдвигаются так же:
+    один раз на произведение и день.
+    """
+    ratings = defaultdict(lambda: [0, 0])
+    try:
+        with transaction.atomic():
+            Review.objects.bulk_create(reviews)
+            days = defaultdict(int)
+            for review in reviews:
+                ratings[review.title_id][0] += review.score
+                ratings[review.title_id][1] += 1
+                days[review.title_id, review_day(review.pub_date)] += 1
+            for title_id, (score, count) in ratings.items():
+                update_title_rating(title_id, score, count)
+            for (title_id, day), count in days.items():
+                shift_review_volume(title_id, day, count)
+    except IntegrityError:
+        raise ParseError(DUPLICATE_REVIEW)
+    invalidate('titles', *(
+        scope
+        for title_id in ratings
+        for scope in (f'title:{title_id}', f'reviews:{title_id}')
+    ))
+
+
+def bulk_reviews(items, user, title=None):
+    """Создаёт пачку отзывов и возвращает результат по каждой записи.
+
+    Если `title` не передан, произведение берётся из поля `title`
+    записи. Авторы, произведения и уже оставленные отзывы выбираются
+    общими запросами на всю пачку, отзывы вставляются одним
+    bulk_create, сигналы моделей при этом не вызываются.
+    """
+    check_batch(items)
+    results, valid = validate_items(items, BulkReviewSerializer, user)
+    resolve_authors(valid, user, results)
+    if title is None:
+        resolve_titles(valid, results)
+    else:
+        for data in valid.values():
+            data['title'] = title
+    reject_duplicates(valid, results)
+    reviews = {index: Review(**data) for index, data in valid.items()}
+    if reviews:
+        save_reviews(list(reviews.values()))
+    for index, review in reviews.items():
+        results[index] = {
+            'status': status.HTTP_201_CREATED,
+            'data': ReviewSerializer(review).data,
+        }
+    return results
+
+
+def bulk_comments(items, user, review):
+    """Создаёт пачку комментариев к отзыву, как bulk_reviews — отзывы."""
+    check_batch(items)
+    results, valid = validate_items(items, BulkCommentSerializer, user)
+    resolve_authors(valid, user, results)
+    comments = {
+        index: Comment(review=review, **data)
+        for index, data in valid.items()
+    }
+    if comments:
+        Comment.objects.bulk_create(comments.values())
+        invalidate(f'comments:{review.pk}')
+    for index, comment in comments.items():
+        results[index] = {
+            'status': status.HTTP_201_CREATED,
+            'data': CommentSerializer(comment).data,
+        }
+    return results
+
+
+def summary(results):
+    created = sum(
+        result['status'] == status.HTTP_201_CREATED for result in results
+    )
+    return {
+        'created': created,
+        'failed': len(results) - created,
+        'results': results,
+    }
@@ -0,0 +1,175 @@
+import hashlib
+from collections import Counter
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+# Счётчики текущего процесса: попадания, промахи и сбросы кэша.
+STATS = Counter()
+
+# Заголовки, которые кэшируются вместе с данными ответа.
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def generation_key(scope):
+    return f'response-generation:{scope}'
+
+
+def get_generations(scopes):
+    """Текущие поколения областей кэша.
+
+    Поколение — случайная метка, которая меняется при каждом сбросе.
+    Если метка вытеснена из кэша, создаётся новая, и старые ответы
+    становятся недостижимыми. Метки живут столько же, сколько ответы:
+    при кэше в памяти процесса чужие сбросы не видны, и устаревание
+    ограничено этим сроком.
+    """
+    cache = get_cache()
+    keys = [generation_key(scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, uuid4().hex)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def invalidate(*scopes, using=None):
+    """Сбрасывает области после фиксации текущей транзакции.
+
+    Сброс внутри транзакции дал бы читателю закэшировать ещё старые
+    данные под новым поколением. Вне транзакции сброс выполняется
+    сразу.
+    """
+    def bump():
+        get_cache().set_many(
+            {generation_key(scope): uuid4().hex for scope in scopes}
+        )
+        STATS['invalidations'] += len(scopes)
+
+    transaction.on_commit(bump, using=using)
+
+
+async def aget_generations(scopes):
+    """То же, что get_generations, для асинхронных представлений."""
+    cache = get_cache()
+    if isinstance(cache, LocMemCache):
+        return get_generations(scopes)
+    keys = [generation_key(scope) for scope in scopes]
+    generations = await cache.aget_many(keys)
+    for key in keys:
+        if key not in generations:
+            await cache.aadd(key, uuid4().hex)
+            generations[key] = await cache.aget(key)
+    return [generations[key] for key in keys]
+
+
+def make_key(request, generations):
+    query = sorted(
+        (name, values)
+        for name, values in request.GET.lists()
+        if any(values)
+    )
+    source = repr((
+        request.build_absolute_uri(request.path),
+        query,
+        generations,
+    ))
+    return f'response:{hashlib.md5(source.encode()).hexdigest()}'
+
+
+def response_key(request, scopes):
+    return make_key(request, get_generations(scopes))
+
+
+async def aget_cached(request, scopes):
+    """Запись кэша для запроса или None, без обращения к потокам DRF.
+
+    Кэш в памяти процесса читается прямо в цикле событий: его
+    асинхронные методы — обёртки sync_to_async с переходом в поток.
+    """
+    cache = get_cache()
+    key = make_key(request, await aget_generations(scopes))
+    if isinstance(cache, LocMemCache):
+        return cache.get(key)
+    return await cache.aget(key)
+
+
+def hit(request, cached):
+    """Статус, данные и заголовки ответа из записи кэша.
+
+    Если условные заголовки запроса совпали, данных нет и статус — 304.
+    """
+    STATS['hits'] += 1
+    data, headers = cached
+    headers = dict(headers, **{'X-Cache': 'HIT'})
+    conditional = get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=parse_http_date_safe(headers.get('Last-Modified')),
+    )
+    if conditional is not None:
+        return conditional.status_code, None, headers
+    return 200, data, headers
+
+
+def cached_response(scopes, method, request, *args, **kwargs):
+    """Возвращает данные ответа из кэша или вызывает `method` и кэширует."""
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return method(request, *args, **kwargs)
+    cache = get_cache()
+    key = response_key(request, scopes)
+    cached = cache.get(key)
+    if cached is not None:
+        status, data, headers = hit(request, cached)
+        return Response(data, status=status, headers=headers)
+    STATS['misses'] += 1
+    response = method(request, *args, **kwargs)
+    if response.status_code == 200:
+        cache.set(key, (response.data, {
+            name: response[name]
+            for name in CACHED_HEADERS if response.has_header(name)
+        }))
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+class CachedListMixin:
+    """Кэширует список по пути, параметрам запроса и областям кэша.
+
+    Области возвращает `get_cache_scopes`, их сбрасывают сигналы
+    моделей из api.signals.
+    """
+    cache_scopes = ()
+
+    def get_cache_scopes(self):
+        return self.cache_scopes
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            self.get_cache_scopes(), super().list, request, *args, **kwargs
+        )
+
+
+class CachedRetrieveMixin:
+    """Кэширует объект так же, как CachedListMixin кэширует список."""
+    cache_scopes = ()
+
+    def get_cache_scopes(self):
+        return self.cache_scopes
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            self.get_cache_scopes(), super().retrieve,
+            request, *args, **kwargs
+        )
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Warning, register
+
+# Кэши, которые видит только свой процесс.
+LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def is_shared(alias):
+    return not isinstance(caches[alias], LOCAL_CACHES)
+
+
+@register()
+def auth_user_cache(app_configs, **kwargs):
+    """Кэш пользователей при AUTH_USER_CACHE_TTL > 0 должен быть общим.
+
+    Иначе блокировка и смена роли сбрасывают кэш только в том процессе,
+    где они произошли.
+    """
+    if not settings.AUTH_USER_CACHE_TTL or is_shared(
+        settings.AUTH_USER_CACHE_ALIAS
+    ):
+        return []
+    return [Error(
+        'Кэш AUTH_USER_CACHE_ALIAS не общий для процессов.',
+        hint='Задайте AUTH_CACHE_BACKEND (например, Redis) '
+             'или AUTH_USER_CACHE_TTL=0.',
+        id='api.E001',
+    )]
+
+
+@register()
+def response_cache(app_configs, **kwargs):
+    """Кэш ответов в памяти процесса годится только для одного воркера.
+
+    Сигналы сбрасывают его в процессе, где прошла запись, остальные
+    воркеры отдают устаревшие ответы до истечения записей.
+    """
+    if not settings.RESPONSE_CACHE_ENABLED or is_shared(
+        settings.RESPONSE_CACHE_ALIAS
+    ):
+        return []
+    return [Warning(
+        'Кэш ответов включён, но не общий для воркеров gunicorn.',
+        hint='Задайте RESPONSE_CACHE_BACKEND (например, Redis), '
+             'выключите RESPONSE_CACHE_ENABLED или, с одним воркером, '
+             'добавьте api.W001 в SILENCED_SYSTEM_CHECKS.',
+        id='api.W001',
+    )]
+
+
+@register()
+def throttle_cache(app_configs, **kwargs):
+    """Счётчики THROTTLE_BACKEND=cache должны лежать в общем кэше."""
+    if settings.THROTTLE_BACKEND != 'cache' or is_shared(
+        settings.THROTTLE_CACHE_ALIAS
+    ):
+        return []
+    return [Error(
+        'THROTTLE_BACKEND=cache, но кэш THROTTLE_CACHE_ALIAS '
+        'не общий для процессов.',
+        hint='Задайте DEFAULT_CACHE_BACKEND (например, Redis) '
+             'или THROTTLE_BACKEND=local.',
+        id='api.E002',
+    )]
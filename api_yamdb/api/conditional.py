@@ -0,0 +1,102 @@
+import hashlib
+
+from django.core.paginator import Page
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.cache import get_generations
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для list и retrieve, ответ 304 без сериализации.
+
+    ETag списка строится из записей страницы, которые всё равно читаются
+    для ответа, и числа записей, если его считает пагинатор: отдельного
+    запроса к набору нет, и режимы `?count=false` и
+    `?pagination=cursor` остаются без COUNT. ETag
+    объекта строится из его id, даты правки `last_modified_field`
+    и полей `state_fields` — для моделей без даты правки это поля
+    ответа. К ним добавляются поколения
+    областей `get_version_scopes`: они меняются сигналами при правке
+    записей, которую не видно по строкам страницы, — удалении,
+    переименовании жанра или категории. Поэтому Last-Modified у списка
+    нет: по максимальной дате правки такие изменения не видны.
+    """
+    last_modified_field = None
+    state_fields = ()
+    version_scopes = ()
+
+    def get_version_scopes(self):
+        return self.version_scopes
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset if page is None else page)
+        state = {'rows': [self.get_row_state(row) for row in rows]}
+        counted = getattr(self.paginator, 'page', None)
+        if isinstance(counted, Page):
+            state['count'] = counted.paginator.count
+
+        def respond(request, *args, **kwargs):
+            serializer = self.get_serializer(rows, many=True)
+            if page is None:
+                return Response(serializer.data)
+            return self.get_paginated_response(serializer.data)
+
+        return self.conditional_response(
+            state, respond, request, *args, **kwargs
+        )
+
+    def get_row_state(self, row):
+        """Строка `.values()` целиком или id и дата правки объекта."""
+        if isinstance(row, dict):
+            return tuple(row.items())
+        if self.last_modified_field:
+            return row.pk, getattr(row, self.last_modified_field)
+        return row.pk
+
+    def retrieve(self, request, *args, **kwargs):
+        fields = ['pk', *self.state_fields]
+        if self.last_modified_field:
+            fields.append(self.last_modified_field)
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        state = (
+            self.get_queryset()
+            .filter(**{self.lookup_field: lookup})
+            .values(*fields)
+            .first()
+        )
+        if state is None:
+            return super().retrieve(request, *args, **kwargs)
+        if self.last_modified_field:
+            state['modified'] = state.pop(self.last_modified_field)
+        return self.conditional_response(
+            state, super().retrieve, request, *args, **kwargs
+        )
+
+    def conditional_response(self, state, method, request, *args, **kwargs):
+        source = repr((
+            request.get_full_path(),
+            sorted(state.items()),
+            get_generations(self.get_version_scopes()),
+        ))
+        headers = {
+            'ETag': quote_etag(hashlib.md5(source.encode()).hexdigest()),
+        }
+        last_modified = None
+        if state.get('modified') is not None:
+            last_modified = int(state['modified'].timestamp())
+            headers['Last-Modified'] = http_date(last_modified)
+        conditional = get_conditional_response(
+            request, etag=headers['ETag'], last_modified=last_modified
+        )
+        if conditional is not None:
+            return Response(status=conditional.status_code, headers=headers)
+        response = method(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for name, value in headers.items():
+                response[name] = value
+        return response
@@ -0,0 +1,82 @@
+from collections import Counter
+from weakref import WeakSet
+
+from django.conf import settings
+from django.db import connections
+
+from api.metrics import observe_query
+
+# Новые соединения с БД в текущем процессе по псевдонимам.
+CONNECTS = Counter()
+
+# Обёртки соединений всех потоков процесса, которые хоть раз
+# подключались: по ним считаются открытые соединения.
+WRAPPERS = WeakSet()
+
+
+def connection_opened(connection):
+    CONNECTS[connection.alias] += 1
+    WRAPPERS.add(connection)
+    if (
+        settings.METRICS_ENABLED
+        and observe_query not in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.append(observe_query)
+
+
+def server_connections(connection):
+    """Соединения с базой на стороне PostgreSQL по состояниям."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT coalesce(state, %s), count(*) FROM pg_stat_activity '
+            'WHERE datname = current_database() GROUP BY 1',
+            ['unknown'],
+        )
+        return dict(cursor.fetchall())
+
+
+def pool_stats(connection):
+    """Размер пула psycopg и ожидание соединения из него."""
+    stats = connection.pool.get_stats()
+    requests = stats.get('requests_num', 0)
+    return {
+        'size': stats.get('pool_size', 0),
+        'available': stats.get('pool_available', 0),
+        'max_size': stats.get('pool_max', 0),
+        'waiting': stats.get('requests_waiting', 0),
+        'requests': requests,
+        'queued': stats.get('requests_queued', 0),
+        'errors': stats.get('requests_errors', 0),
+        'wait_ms': stats.get('requests_wait_ms', 0),
+        'avg_wait_ms': (
+            stats.get('requests_wait_ms', 0) / requests if requests else 0
+        ),
+    }
+
+
+def connection_stats():
+    """Настройки и состояние соединений по псевдонимам БД."""
+    stats = {}
+    for connection in connections.all():
+        alias = connection.alias
+        settings_dict = connection.settings_dict
+        item = {
+            'vendor': connection.vendor,
+            'pool': settings.DB_POOL or None,
+            'conn_max_age': settings_dict['CONN_MAX_AGE'],
+            'health_checks': settings_dict['CONN_HEALTH_CHECKS'],
+            'server_side_cursors': not settings_dict.get(
+                'DISABLE_SERVER_SIDE_CURSORS'
+            ),
+            'connects': CONNECTS[alias],
+            'open': sum(
+                wrapper.alias == alias and wrapper.connection is not None
+                for wrapper in list(WRAPPERS)
+            ),
+        }
+        if getattr(connection, 'pool', None) is not None:
+            item['pool_stats'] = pool_stats(connection)
+        if connection.vendor == 'postgresql':
+            item['server_connections'] = server_connections(connection)
+        stats[alias] = item
+    return stats
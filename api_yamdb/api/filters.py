@@ -1,13 +1,88 @@
-from django_filters.rest_framework import CharFilter, FilterSet
+from django_filters.rest_framework import (CharFilter, FilterSet,
+                                           IsoDateTimeFilter, NumberFilter)
+from rest_framework.filters import OrderingFilter
 
-from reviews.models import Title
+from reviews.models import Comment, Review, Title
+from reviews.search import search_titles
+
+
+class StableOrderingFilter(OrderingFilter):
+    """OrderingFilter, который всегда добавляет `id` в конец сортировки.
+
+    Без уникального последнего поля строки с равными значениями
+    (например, одинаковым рейтингом) переходят между страницами.
+    """
+    unique_fields = frozenset(('id', '-id', 'pk', '-pk'))
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering is None:
+            ordering = (
+                queryset.query.order_by or queryset.model._meta.ordering
+            )
+        ordering = tuple(ordering)
+        if self.unique_fields.isdisjoint(ordering):
+            ordering += ('id',)
+        return ordering
 
 
 class FilterTitle(FilterSet):
     category = CharFilter(field_name='category__slug', lookup_expr='iexact')
     genre = CharFilter(field_name='genre__slug', lookup_expr='iexact')
     name = CharFilter(field_name='name', lookup_expr='icontains')
+    rating_min = NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = NumberFilter(field_name='rating', lookup_expr='lte')
+    q = CharFilter(method='filter_search')
+
+    class Meta:
+        model = Title
+        fields = (
+            'year', 'category', 'genre', 'name', 'rating_min', 'rating_max',
+            'q',
+        )
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value).order_by('-search_rank', 'id')
+
+
+class TopTitleFilter(FilterSet):
+    category = CharFilter(field_name='category__slug', lookup_expr='iexact')
+    genre = CharFilter(field_name='genre__slug', lookup_expr='iexact')
 
     class Meta:
         model = Title
-        fields = ('year', 'category', 'genre', 'name')
+        fields = ('year', 'category', 'genre')
+
+
+class ExportTitleFilter(FilterTitle):
+    updated_since = IsoDateTimeFilter(
+        field_name='updated_at', lookup_expr='gte'
+    )
+
+    class Meta(FilterTitle.Meta):
+        fields = FilterTitle.Meta.fields + ('updated_since',)
+
+
+class ExportReviewFilter(FilterSet):
+    title = NumberFilter(field_name='title_id')
+    author = CharFilter(field_name='author__username')
+    updated_since = IsoDateTimeFilter(
+        field_name='pub_date', lookup_expr='gte'
+    )
+
+    class Meta:
+        model = Review
+        fields = ('title', 'author', 'updated_since')
+
+
+class ExportCommentFilter(FilterSet):
+    title = NumberFilter(field_name='review__title_id')
+    review = NumberFilter(field_name='review_id')
+    author = CharFilter(field_name='author__username')
+    updated_since = IsoDateTimeFilter(
+        field_name='pub_date', lookup_expr='gte'
+    )
+
+    class Meta:
+        model = Comment
+        fields = ('title', 'review', 'author', 'updated_since')
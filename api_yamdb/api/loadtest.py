@@ -0,0 +1,346 @@
+import json
+import random
+import threading
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException
+from itertools import count
+from math import ceil
+from time import perf_counter, sleep, time
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.db.models import Count
+
+from api.profiling import percentile
+from api.tokens import RoleAccessToken
+from reviews.models import Category, Genre, Review, Title
+from users.models import OutgoingEmail, User
+
+LOAD_PREFIX = 'load'
+HOT_TITLES = 20
+CODE_MARKER = 'Confirmation code: '
+
+# Доли действий в трафике по умолчанию.
+DEFAULT_MIX = {
+    'browse': 45,
+    'title': 10,
+    'reviews': 20,
+    'comments': 10,
+    'review_post': 5,
+    'review_patch': 5,
+    'signup': 5,
+}
+ORDERINGS = ('-rating', '-year', 'name')
+# Запросы, которые можно повторить на новом соединении.
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+
+Sample = namedtuple('Sample', 'name status ok seconds')
+
+
+def parse_mix(text):
+    """'browse=50,reviews=30' -> {'browse': 50, 'reviews': 30}."""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'Неизвестное действие: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Client:
+    """HTTP-клиент с постоянным соединением на каждый поток.
+
+    Ошибка соединения или протокола даёт статус None; идемпотентный
+    запрос на переиспользованном соединении сначала повторяется
+    на новом.
+    """
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.local = threading.local()
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'Accept': 'application/json'}
+        body = None
+        if data is not None:
+            body = json.dumps(data)
+            headers['Content-Type'] = 'application/json'
+        if token is not None:
+            headers['Authorization'] = f'Bearer {token}'
+        retry = method in IDEMPOTENT_METHODS
+        while True:
+            connection = getattr(self.local, 'connection', None)
+            reused = connection is not None
+            if not reused:
+                connection = self.local.connection = HTTPConnection(
+                    self.host, self.port, timeout=30
+                )
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+                return response.status, response.read()
+            except (OSError, HTTPException):
+                connection.close()
+                self.local.connection = None
+                # Сервер мог закрыть простаивающее соединение: идемпотентный
+                # запрос повторяется один раз на новом.
+                if not (reused and retry):
+                    return None, b''
+                retry = False
+
+
+class Traffic:
+    """Модель трафика: действия, их доли и данные, к которым они идут.
+
+    Популярные произведения — с наибольшим числом отзывов, чем выше
+    место, тем чаще к ним обращаются. Отзывы пишут пользователи
+    нагрузки, созданные заново на каждый прогон; регистрации тоже
+    идут под их префиксом, так что `cleanup` удаляет всё созданное.
+    """
+
+    def __init__(self, client, mix, users=20):
+        self.client = client
+        self.mix = mix
+        self.run = f'{LOAD_PREFIX}{int(time())}'
+        self.hot = list(
+            Title.objects.order_by('-rating_count', 'id')
+            .values_list('id', flat=True)[:HOT_TITLES]
+        )
+        self.hot_weights = [1 / rank for rank in range(1, len(self.hot) + 1)]
+        self.hot_reviews = {
+            title: list(
+                Review.objects.filter(title_id=title)
+                .annotate(comments_count=Count('comments'))
+                .order_by('-comments_count', 'id')
+                .values_list('id', flat=True)[:5]
+            )
+            for title in self.hot
+        }
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        self.categories = list(
+            Category.objects.values_list('slug', flat=True)
+        )
+        self.years = list(
+            Title.objects.order_by('year').values_list('year', flat=True)
+            .distinct()[:100]
+        )
+        self.pages = max(1, min(5, ceil(
+            Title.objects.count() / settings.REST_FRAMEWORK['PAGE_SIZE']
+        )))
+        self.titles = list(Title.objects.values_list('id', flat=True))
+        if not self.hot or not self.genres:
+            raise ValueError(
+                'Нужны произведения, жанры и отзывы: загрузите данные '
+                'через load_csv или generate_data.'
+            )
+        self.tokens = [
+            str(RoleAccessToken.for_user(User.objects.create(
+                username=f'{self.run}-{number}',
+                email=f'{self.run}-{number}@yamdb.fake',
+            )))
+            for number in range(users)
+        ]
+        self.written = count()
+        self.signups = count()
+        self.written_reviews = []
+
+    def choose(self, rng):
+        return rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+
+    def hot_title(self, rng):
+        return rng.choices(self.hot, weights=self.hot_weights)[0]
+
+    def send(self, samples, name, method, path, data=None, token=None,
+             expect=200):
+        started = perf_counter()
+        status, body = self.client.request(method, path, data, token)
+        samples.append(Sample(
+            name, status or 0, status == expect, perf_counter() - started
+        ))
+        return body if status == expect else None
+
+    def browse(self, rng, samples):
+        params = {}
+        for name, values in (
+            ('genre', self.genres), ('category', self.categories),
+            ('year', self.years), ('ordering', ORDERINGS),
+        ):
+            if values and rng.random() < 0.3:
+                params[name] = rng.choice(values)
+        if not params:
+            params['page'] = rng.randint(1, self.pages)
+        self.send(
+            samples, 'browse', 'GET', f'/api/v1/titles/?{urlencode(params)}'
+        )
+
+    def title(self, rng, samples):
+        self.send(
+            samples, 'title', 'GET', f'/api/v1/titles/{self.hot_title(rng)}/'
+        )
+
+    def reviews(self, rng, samples):
+        self.send(
+            samples, 'reviews', 'GET',
+            f'/api/v1/titles/{self.hot_title(rng)}/reviews/',
+        )
+
+    def comments(self, rng, samples):
+        title = self.hot_title(rng)
+        reviews = self.hot_reviews[title]
+        if not reviews:
+            return self.reviews(rng, samples)
+        self.send(
+            samples, 'comments', 'GET',
+            f'/api/v1/titles/{title}/reviews/{rng.choice(reviews)}/comments/',
+        )
+
+    def review_post(self, rng, samples):
+        """Каждый пользователь по очереди пишет отзывы на все произведения.
+
+        Пары пользователь — произведение не повторяются, пока их хватает.
+        """
+        number = next(self.written)
+        token = self.tokens[number % len(self.tokens)]
+        title = self.titles[number // len(self.tokens) % len(self.titles)]
+        path = f'/api/v1/titles/{title}/reviews/'
+        body = self.send(
+            samples, 'review_post', 'POST', path,
+            {'text': 'Отзыв под нагрузкой', 'score': rng.randint(1, 10)},
+            token, expect=201,
+        )
+        if body is not None:
+            self.written_reviews.append(
+                (token, f'{path}{json.loads(body)["id"]}/')
+            )
+
+    def review_patch(self, rng, samples):
+        if not self.written_reviews:
+            return self.review_post(rng, samples)
+        token, path = rng.choice(self.written_reviews)
+        self.send(
+            samples, 'review_patch', 'PATCH', path,
+            {'score': rng.randint(1, 10)}, token,
+        )
+
+    def signup(self, rng, samples):
+        """Регистрация и обмен кода из письма на токен."""
+        username = f'{self.run}-s{next(self.signups)}'
+        email = f'{username}@yamdb.fake'
+        if self.send(
+            samples, 'signup', 'POST', '/api/v1/auth/signup/',
+            {'username': username, 'email': email},
+        ) is None:
+            return
+        message = (
+            OutgoingEmail.objects.filter(recipient=email)
+            .order_by('-id').values_list('message', flat=True).first()
+        )
+        code = (message or '').partition(CODE_MARKER)[2].strip()
+        self.send(
+            samples, 'token', 'POST', '/api/v1/auth/token/',
+            {'username': username, 'confirmation_code': code},
+        )
+
+    def act(self, name, rng, samples):
+        getattr(self, name)(rng, samples)
+
+    def cleanup(self):
+        emails = User.objects.filter(
+            username__startswith=f'{self.run}-'
+        ).values_list('email', flat=True)
+        OutgoingEmail.objects.filter(recipient__in=list(emails)).delete()
+        return User.objects.filter(
+            username__startswith=f'{self.run}-'
+        ).delete()[0]
+
+
+def closed_loop(traffic, concurrency, duration, seed):
+    """`concurrency` клиентов шлют запросы друг за другом."""
+    samples = []
+    flows = []
+    deadline = perf_counter() + duration
+
+    def worker(number):
+        rng = random.Random(seed + number)
+        while perf_counter() < deadline:
+            started = perf_counter()
+            traffic.act(traffic.choose(rng), rng, samples)
+            flows.append((perf_counter() - started, 0.0))
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    return samples, flows
+
+
+def open_loop(traffic, rate, concurrency, duration, seed):
+    """Действия приходят с частотой `rate` в секунду (поток Пуассона).
+
+    Приход не ждёт ответа на предыдущие; если все `concurrency`
+    потоков заняты, действие ждёт в очереди, и это ожидание входит
+    в его время ответа.
+    """
+    samples = []
+    flows = []
+    rng = random.Random(seed)
+
+    def arrival(name, due, action_seed):
+        started = perf_counter()
+        traffic.act(name, random.Random(action_seed), samples)
+        flows.append((perf_counter() - due, started - due))
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        begin = due = perf_counter()
+        while due < begin + duration:
+            delay = due - perf_counter()
+            if delay > 0:
+                sleep(delay)
+            executor.submit(
+                arrival, traffic.choose(rng), due, rng.getrandbits(32)
+            )
+            due += rng.expovariate(rate)
+    return samples, flows
+
+
+def summarize(samples, flows, elapsed):
+    """Итоги уровня нагрузки: общие и по действиям."""
+    latencies = [latency for latency, _ in flows] or [0.0]
+    waits = [wait for _, wait in flows] or [0.0]
+    errors = sum(not sample.ok for sample in samples)
+    by_action = {}
+    for sample in samples:
+        by_action.setdefault(sample.name, []).append(sample)
+    return {
+        'requests': len(samples),
+        'rps': len(samples) / elapsed,
+        'error_rate': errors / max(1, len(samples)),
+        'p50': percentile(latencies, 0.5),
+        'p90': percentile(latencies, 0.9),
+        'p99': percentile(latencies, 0.99),
+        'max': max(latencies),
+        'queue': sum(waits) / len(waits),
+        'statuses': dict(Counter(sample.status for sample in samples)),
+        'actions': {
+            name: {
+                'requests': len(items),
+                'errors': sum(not item.ok for item in items),
+                'p50': percentile([item.seconds for item in items], 0.5),
+                'p95': percentile([item.seconds for item in items], 0.95),
+                'p99': percentile([item.seconds for item in items], 0.99),
+            }
+            for name, items in sorted(by_action.items())
+        },
+    }
+
+
+def run_level(traffic, duration, concurrency, rate=None, seed=1):
+    started = perf_counter()
+    if rate:
+        samples, flows = open_loop(traffic, rate, concurrency, duration, seed)
+    else:
+        samples, flows = closed_loop(traffic, concurrency, duration, seed)
+    return summarize(samples, flows, perf_counter() - started)
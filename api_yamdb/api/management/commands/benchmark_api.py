@@ -0,0 +1,109 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from api.benchmark import SCENARIOS, BenchmarkError, compare, dataset, run
+
+
+def ms(seconds):
+    return f'{seconds * 1000:.2f}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет сценарии всех представлений router_v1 тестовым '
+        'клиентом DRF в одном процессе и сравнивает с базовыми замерами. '
+        'Изменения данных откатываются после прогона.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=20,
+            help='Число замеряемых запросов каждого сценария за круг.',
+        )
+        parser.add_argument(
+            '--rounds', type=int, default=3,
+            help='Число кругов по всем сценариям.',
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=3,
+            help='Число незамеряемых запросов перед чтениями.',
+        )
+        parser.add_argument(
+            '--only', nargs='+', metavar='GROUP',
+            help='Группы сценариев: genres, titles, reviews и т. д.',
+        )
+        parser.add_argument(
+            '--cache',
+            action='store_true',
+            help='Не отключать кэш ответов.',
+        )
+        parser.add_argument(
+            '--output', help='Записать замеры в JSON-файл.'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON-файл базовых замеров: при регрессии команда '
+                 'завершается с ошибкой.',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Допустимый рост лучшей медианы кругов, доля.',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['rounds'] < 1:
+            raise CommandError('--iterations и --rounds должны быть > 0.')
+        scenarios = [
+            scenario for scenario in SCENARIOS
+            if not options['only']
+            or scenario.name.split('.')[0] in options['only']
+        ]
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            THROTTLE_RATES={},
+            RESPONSE_CACHE_ENABLED=options['cache'],
+        ), transaction.atomic():
+            try:
+                results = run(
+                    scenarios, options['iterations'], options['warmup'],
+                    options['rounds'],
+                )
+            except BenchmarkError as error:
+                raise CommandError(error)
+            finally:
+                transaction.set_rollback(True)
+        self.stdout.write(
+            'Сценарий | запросов/с | p50, мс | p95, мс | p99, мс | '
+            'SQL на запрос'
+        )
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name} | {stats["rps"]:.0f} | {ms(stats["p50"])} | '
+                f'{ms(stats["p95"])} | {ms(stats["p99"])} | '
+                f'{stats["queries"]:.1f}'
+            )
+        report = {'dataset': dataset(), 'scenarios': results}
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2, ensure_ascii=False)
+        if not options['baseline']:
+            return
+        with open(options['baseline']) as file:
+            baseline = json.load(file)
+        if baseline['dataset'] != report['dataset']:
+            self.stderr.write(
+                f'Набор данных отличается от базового: {baseline["dataset"]}'
+            )
+        regressions = compare(
+            results, baseline['scenarios'], options['tolerance']
+        )
+        if regressions:
+            raise CommandError(
+                'Регрессии по сравнению с базовыми замерами:\n'
+                + '\n'.join(regressions)
+            )
+        self.stdout.write('Регрессий нет.')
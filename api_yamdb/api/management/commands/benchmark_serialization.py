@@ -0,0 +1,98 @@
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import (CommentSerializer, FlatCommentSerializer,
+                             FlatReviewSerializer, FlatTitleSerializer,
+                             GetTitleSerializer, ReviewSerializer)
+from reviews.models import Comment, Review, Title
+
+
+def ms(seconds):
+    return f'{seconds * 1000:.2f}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время страницы списка: чтение из БД, сериализация '
+        'и JSON. ModelSerializer и JSONRenderer, плоский сериализатор '
+        'и JSONRenderer, плоский сериализатор и FastJSONRenderer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=100,
+            help='Число записей на странице.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=30,
+            help='Число замеров каждого варианта.',
+        )
+
+    def handle(self, *args, **options):
+        if options['size'] < 1 or options['repeat'] < 1:
+            raise CommandError('--size и --repeat должны быть > 0.')
+        size = options['size']
+        title = (
+            Title.objects.order_by('-rating_count', 'id').values('id').first()
+        )
+        if title is None or not Comment.objects.exists():
+            raise CommandError(
+                'Нужны отзывы и комментарии: загрузите данные через '
+                'load_csv или generate_data.'
+            )
+        pages = (
+            (
+                'titles',
+                Title.objects.select_related('category')
+                .prefetch_related('genre').order_by('-year', 'id'),
+                GetTitleSerializer, FlatTitleSerializer,
+            ),
+            (
+                'reviews',
+                Review.objects.filter(title_id=title['id'])
+                .select_related('author', 'title')
+                .order_by('pub_date', 'id'),
+                ReviewSerializer, FlatReviewSerializer,
+            ),
+            (
+                'comments',
+                Comment.objects.select_related('author').order_by('id'),
+                CommentSerializer, FlatCommentSerializer,
+            ),
+        )
+        if orjson is None:
+            self.stderr.write('orjson не установлен: FastJSONRenderer = DRF.')
+        self.stdout.write(
+            'Страница | записей | ModelSerializer, мс | плоский, мс | '
+            'плоский + orjson, мс | ускорение'
+        )
+        for name, queryset, serializer, flat in pages:
+            rows = flat.rows(queryset)
+            variants = (
+                (queryset[:size], serializer, JSONRenderer()),
+                (rows[:size], flat, JSONRenderer()),
+                (rows[:size], flat, FastJSONRenderer()),
+            )
+            times = [
+                self.measure(*variant, options['repeat'])
+                for variant in variants
+            ]
+            self.stdout.write(
+                f'{name} | {len(queryset[:size])} | '
+                + ' | '.join(ms(seconds) for seconds in times)
+                + f' | ×{times[0] / times[-1]:.1f}'
+            )
+
+    @staticmethod
+    def measure(page, serializer, renderer, repeat):
+        """Медиана времени: чтение страницы, сериализация и JSON."""
+        samples = []
+        for _ in range(repeat + 1):
+            started = perf_counter()
+            renderer.render(serializer(page.all(), many=True).data)
+            samples.append(perf_counter() - started)
+        return median(samples[1:])
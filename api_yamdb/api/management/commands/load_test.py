@@ -0,0 +1,106 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.loadtest import DEFAULT_MIX, Client, Traffic, parse_mix, run_level
+
+
+def ms(seconds):
+    return f'{seconds * 1000:.1f}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает запущенный сервер смесью чтения и записи: просмотр '
+        'произведений с фильтрами, отзывы и комментарии популярных '
+        'произведений, отзывы от пользователей, регистрация и токены. '
+        'Выводит пропускную способность, задержки и долю ошибок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='http://127.0.0.1:8000',
+            help='Адрес сервера; он должен работать с той же базой.',
+        )
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Длительность каждого уровня нагрузки, в секундах.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+', default=[16],
+            help='Число клиентов; при --rate — наибольшее число '
+                 'одновременных запросов.',
+        )
+        parser.add_argument(
+            '--rate', type=float, nargs='+',
+            help='Частота прихода действий в секунду (открытая модель). '
+                 'Без неё клиенты шлют запросы друг за другом.',
+        )
+        parser.add_argument(
+            '--mix',
+            default=','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items()),
+            help='Доли действий: ' + ', '.join(DEFAULT_MIX) + '.',
+        )
+        parser.add_argument(
+            '--users', type=int, default=20,
+            help='Число пользователей, которые пишут отзывы.',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Записать итоги в JSON-файл.')
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Не удалять созданных пользователей и их отзывы.',
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or min(options['concurrency']) < 1:
+            raise CommandError('--users и --concurrency должны быть > 0.')
+        try:
+            traffic = Traffic(
+                Client(options['url']), parse_mix(options['mix']),
+                options['users'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        levels = [
+            (rate, concurrency)
+            for rate in options['rate'] or [None]
+            for concurrency in options['concurrency']
+        ]
+        results = []
+        try:
+            for rate, concurrency in levels:
+                result = run_level(
+                    traffic, options['duration'], concurrency, rate,
+                    options['seed'],
+                )
+                results.append(
+                    {'rate': rate, 'concurrency': concurrency, **result}
+                )
+                self.report(rate, concurrency, result)
+        finally:
+            if not options['keep']:
+                traffic.cleanup()
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, indent=2)
+
+    def report(self, rate, concurrency, result):
+        level = f'клиентов {concurrency}'
+        if rate:
+            level = f'приход {rate:g}/с, потоков {concurrency}'
+        self.stdout.write(
+            f'{level}: {result["rps"]:.0f} запр/с, '
+            f'ошибок {result["error_rate"] * 100:.1f} %, '
+            f'p50 {ms(result["p50"])} мс, p90 {ms(result["p90"])} мс, '
+            f'p99 {ms(result["p99"])} мс, max {ms(result["max"])} мс, '
+            f'ожидание в очереди {ms(result["queue"])} мс, '
+            f'статусы {result["statuses"]}'
+        )
+        for name, stats in result['actions'].items():
+            self.stdout.write(
+                f'  {name}: {stats["requests"]} запросов, '
+                f'ошибок {stats["errors"]}, p50 {ms(stats["p50"])} мс, '
+                f'p95 {ms(stats["p95"])} мс, p99 {ms(stats["p99"])} мс'
+            )
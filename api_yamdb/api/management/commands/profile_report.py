@@ -0,0 +1,73 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.profiling import load_snapshots, summarize
+
+SORT_KEYS = ('p50', 'p95', 'p99', 'db', 'queries')
+
+
+def ms(seconds):
+    return f'{seconds * 1000:.1f}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит самые медленные представления и самые частые формы SQL '
+        'по снимкам профилирования всех процессов (PROFILING_DIR).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=10,
+            help='Число строк в каждой таблице.',
+        )
+        parser.add_argument(
+            '--sort', choices=SORT_KEYS, default='p95',
+            help='Порядок представлений: перцентиль времени, время БД '
+                 'или число запросов к БД.',
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Удалить снимки после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        directory = settings.PROFILING_DIR
+        endpoints, shapes = summarize(load_snapshots(directory))
+        if not endpoints:
+            self.stdout.write(
+                f'Нет снимков в {directory}: включите PROFILING_ENABLED.'
+            )
+            return
+        limit = options['limit']
+        endpoints.sort(key=lambda row: row[options['sort']], reverse=True)
+        self.stdout.write(
+            'Представление | запросов | p50, мс | p95, мс | p99, мс | '
+            'БД, мс | сериализация, мс | SQL в среднем | SQL максимум'
+        )
+        for row in endpoints[:limit]:
+            self.stdout.write(
+                f'{row["endpoint"]} | {row["requests"]} | {ms(row["p50"])} | '
+                f'{ms(row["p95"])} | {ms(row["p99"])} | {ms(row["db"])} | '
+                f'{ms(row["serialize"])} | {row["queries"]:.1f} | '
+                f'{row["max_queries"]}'
+            )
+        shapes.sort(
+            key=lambda row: (row['max_per_request'], row['count']),
+            reverse=True,
+        )
+        self.stdout.write('')
+        self.stdout.write(
+            'Повторов за запрос | выполнений | время, мс | представление | SQL'
+        )
+        for row in shapes[:limit]:
+            self.stdout.write(
+                f'{row["max_per_request"]} | {row["count"]} | '
+                f'{ms(row["time"])} | {row["endpoint"]} | {row["shape"]}'
+            )
+        if options['reset']:
+            for name in os.listdir(directory):
+                if name.startswith('profile-'):
+                    os.remove(os.path.join(directory, name))
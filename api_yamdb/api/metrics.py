@@ -0,0 +1,156 @@
+import os
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+
+from api.profiling import view_route
+
+# Метка представления текущего запроса для метрик запросов к БД;
+# вне запросов (команды, фоновые задачи) — 'other'.
+route = ContextVar('route', default='other')
+
+# Методы, которые идут в метки как есть; остальные — 'other', чтобы
+# клиент не мог создавать новые серии.
+METHODS = frozenset(
+    ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+)
+
+REQUESTS = Counter(
+    'yamdb_http_requests_total',
+    'Запросы по представлениям, методам и статусам.',
+    ('route', 'method', 'status'),
+)
+REQUEST_SECONDS = Histogram(
+    'yamdb_http_request_duration_seconds',
+    'Время обработки запроса.',
+    ('route', 'method'),
+)
+DB_QUERY_SECONDS = Histogram(
+    'yamdb_db_query_duration_seconds',
+    'Время запросов к БД; _count — число запросов.',
+    ('route',),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+             0.5, 1, 2.5),
+)
+AUTH_FAILURES = Counter(
+    'yamdb_auth_failures_total',
+    'Отказы в выдаче токена по причинам.',
+    ('reason',),
+)
+SIGNUPS = Counter(
+    'yamdb_signups_total',
+    'Регистрации: новые пользователи и повторные запросы кода.',
+    ('kind',),
+)
+PAGES = Histogram(
+    'yamdb_pagination_page',
+    'Номер запрошенной страницы списка.',
+    ('route',),
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100, 500, 1000),
+)
+CURSOR_PAGES = Counter(
+    'yamdb_pagination_cursor_total',
+    'Страницы, запрошенные по курсору.',
+    ('route',),
+)
+
+
+def observe_query(execute, sql, params, many, context):
+    """Обёртка запросов к БД, подключается к каждому соединению."""
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        DB_QUERY_SECONDS.labels(route.get()).observe(
+            perf_counter() - started
+        )
+
+
+def observe_page(view, page_number=None):
+    name = f'{type(view).__name__}.{getattr(view, "action", None)}'
+    if page_number is None:
+        CURSOR_PAGES.labels(name).inc()
+    else:
+        PAGES.labels(name).observe(page_number)
+
+
+def method_label(method):
+    return method if method in METHODS else 'other'
+
+
+def registry():
+    """Реестр текущего процесса или сводный по PROMETHEUS_MULTIPROC_DIR."""
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    collector = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collector)
+    return collector
+
+
+def metrics(request):
+    """Метрики в текстовом формате Prometheus.
+
+    Если задан METRICS_TOKEN, нужен заголовок `Authorization: Bearer`.
+    """
+    if settings.METRICS_TOKEN and not constant_time_compare(
+        request.headers.get('Authorization', ''),
+        f'Bearer {settings.METRICS_TOKEN}',
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        generate_latest(registry()), content_type=CONTENT_TYPE_LATEST
+    )
+
+
+class MetricsMiddleware:
+    """Число и время запросов по представлениям, методам и статусам.
+
+    Стоит первым в цепочке и работает и под WSGI, и под ASGI, так что
+    ответы CachedReadMiddleware тоже учитываются.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def start(self, request):
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            match = None
+        method = method_label(request.method)
+        return route.set(view_route(match, method)), perf_counter()
+
+    def finish(self, request, response, token, started):
+        name = route.get()
+        route.reset(token)
+        method = method_label(request.method)
+        REQUEST_SECONDS.labels(name, method).observe(
+            perf_counter() - started
+        )
+        REQUESTS.labels(name, method, response.status_code).inc()
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token, started = self.start(request)
+        response = self.get_response(request)
+        return self.finish(request, response, token, started)
+
+    async def __acall__(self, request):
+        token, started = self.start(request)
+        response = await self.get_response(request)
+        return self.finish(request, response, token, started)
@@ -1,11 +1,44 @@
+from django.shortcuts import get_object_or_404
 from rest_framework.mixins import (CreateModelMixin,
                                    ListModelMixin,
                                    DestroyModelMixin)
 from rest_framework.viewsets import GenericViewSet
 
+FLAT_ACTIONS = ('list', 'retrieve')
+
 
 class CreateListDestroyViewSet(CreateModelMixin,
                                ListModelMixin,
                                DestroyModelMixin,
                                GenericViewSet):
     pass
+
+
+class FlatReadMixin:
+    """list и retrieve отдают строки `.values()` через
+    `flat_serializer_class`, остальные действия работают как обычно.
+    """
+    flat_serializer_class = None
+
+    def get_serializer_class(self):
+        if self.action in FLAT_ACTIONS:
+            return self.flat_serializer_class
+        return super().get_serializer_class()
+
+    def paginate_queryset(self, queryset):
+        if self.action == 'list':
+            queryset = self.flat_serializer_class.rows(queryset)
+        return super().paginate_queryset(queryset)
+
+    def get_object(self):
+        if self.action != 'retrieve':
+            return super().get_object()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            self.flat_serializer_class.rows(
+                self.filter_queryset(self.get_queryset())
+            ),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+        )
+        self.check_object_permissions(self.request, row)
+        return row
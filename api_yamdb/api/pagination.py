@@ -0,0 +1,240 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.metrics import observe_page
+
+INVALID_CURSOR = 'Неверный курсор.'
+INVALID_PAGE = 'Неверная страница.'
+
+
+def encode_value(value):
+    """Сериализует значение ключа без потери микросекунд."""
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} нельзя записать в курсор')
+
+
+class KeysetPagination(BasePagination):
+    """Постраничный вывод по ключу сортировки, без COUNT и OFFSET.
+
+    Порядок задаётся атрибутом `cursor_ordering` представления, последнее
+    поле должно быть уникальным. Курсор хранит значения этих полей у
+    крайней записи страницы, следующая страница выбирается условием
+    по индексу. Параметры из `cursor_conflicts` представления задают
+    свой порядок, с курсором они дают 400.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        conflicts = [
+            name for name in getattr(view, 'cursor_conflicts', ())
+            if request.query_params.get(name)
+        ]
+        if conflicts:
+            raise ParseError(
+                'Курсорный режим не сочетается с параметрами: '
+                + ', '.join(conflicts)
+            )
+        self.base_url = request.build_absolute_uri()
+        self.ordering = tuple(view.cursor_ordering)
+        position, reverse = self.decode_cursor(request, queryset.model)
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self.invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def after(ordering, position):
+        """Условие «строго после позиции» для составного ключа."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_position(self, row):
+        names = [field.lstrip('-') for field in self.ordering]
+        if isinstance(row, dict):
+            return [row[name] for name in names]
+        return [getattr(row, name) for name in names]
+
+    def encode_cursor(self, row, reverse):
+        payload = {'p': self.get_position(row)}
+        if reverse:
+            payload['r'] = 1
+        cursor = urlsafe_b64encode(
+            json.dumps(payload, default=encode_value).encode()
+        ).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor
+        )
+
+    def decode_cursor(self, request, model):
+        """Позиция и направление из курсора.
+
+        Значения приводятся к типам полей модели, курсор с чужими
+        значениями даёт 404, а не ошибку в запросе к БД.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor.encode()))
+            position = payload['p']
+            reverse = bool(payload.get('r'))
+            if (
+                not isinstance(position, list)
+                or len(position) != len(self.ordering)
+                or None in position
+            ):
+                raise ValueError(position)
+            position = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(INVALID_CURSOR)
+        return position, reverse
+
+
+class DefaultPagination(PageNumberPagination):
+    """Постраничный вывод по номеру страницы с двумя режимами по запросу.
+
+    `?pagination=cursor` (или наличие `cursor`) включает KeysetPagination
+    для представлений с атрибутом `cursor_ordering`. `?count=false`
+    отключает подсчёт записей: страница читается с запасом в одну
+    запись, поле `count` в ответе не выводится.
+    """
+    mode_query_param = 'pagination'
+    count_query_param = 'count'
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        self.countless = False
+        if self.use_keyset(request, view):
+            self.keyset = self.keyset_class()
+            observe_page(view)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        if request.query_params.get(self.count_query_param) == 'false':
+            rows = self.paginate_without_count(queryset, request)
+            observe_page(view, self.page_number)
+            return rows
+        rows = super().paginate_queryset(queryset, request, view)
+        if rows is not None:
+            observe_page(view, self.page.number)
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        if self.countless:
+            return Response(OrderedDict([
+                ('next', self.get_next_link()),
+                ('previous', self.get_previous_link()),
+                ('results', data),
+            ]))
+        return super().get_paginated_response(data)
+
+    def use_keyset(self, request, view):
+        return getattr(view, 'cursor_ordering', None) is not None and (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_without_count(self, queryset, request):
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(
+                request.query_params.get(self.page_query_param, 1)
+            )
+        except ValueError:
+            raise NotFound(INVALID_PAGE)
+        if self.page_number < 1:
+            raise NotFound(INVALID_PAGE)
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.countless = True
+        self.has_next = len(rows) > page_size
+        self.request = request
+        return rows[:page_size]
+
+    def get_next_link(self):
+        if not self.countless:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param,
+            self.page_number + 1,
+        )
+
+    def get_previous_link(self):
+        if not self.countless:
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
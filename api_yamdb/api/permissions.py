@@ -4,6 +4,12 @@ from users.models import ADMIN_ROLE
 
 
 class IsAdminUser(permissions.BasePermission):
+    """Только администратор.
+
+    `fresh_user`: роль и блокировка проверяются по БД, а не по
+    утверждениям токена, см. ClaimsJWTAuthentication.
+    """
+    fresh_user = True
 
     def has_permission(self, request, view):
         return (
@@ -29,7 +35,7 @@ class ReviewsCommentsPermissions(permissions.IsAuthenticatedOrReadOnly):
         if (
             request.method in ('PATCH', 'DELETE')
             and (
-                obj.author == request.user
+                obj.author_id == request.user.id
                 or request.user.role in ('admin', 'moderator')
             )
         ):
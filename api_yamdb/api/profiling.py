@@ -0,0 +1,272 @@
+import json
+import os
+import re
+import threading
+from collections import Counter, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from time import monotonic, perf_counter
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.serializers import ListSerializer, Serializer
+
+from api.serializers import FlatSerializer
+
+# Профиль текущего запроса: его заполняют обёртка запросов к БД
+# и обёртка Serializer.data.
+current = ContextVar('profile', default=None)
+
+PLACEHOLDERS = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+SPACES = re.compile(r'\s+')
+
+MAX_SHAPES = 1000
+
+
+def sql_shape(sql):
+    """SQL без значений: списки IN и литералы схлопываются."""
+    shape = PLACEHOLDERS.sub('(...)', sql)
+    shape = LITERALS.sub('?', shape)
+    return SPACES.sub(' ', shape).strip()
+
+
+class Profile:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.shapes = Counter()
+        self.shape_time = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            shape = sql_shape(sql)
+            self.queries += 1
+            self.db += elapsed
+            self.shapes[shape] += 1
+            self.shape_time[shape] += elapsed
+
+
+def timed(prop):
+    """Serializer.data, время которого засчитывается профилю запроса."""
+
+    def data(serializer):
+        profile = current.get()
+        if profile is None:
+            return prop.fget(serializer)
+        started = perf_counter()
+        try:
+            return prop.fget(serializer)
+        finally:
+            profile.serialize += perf_counter() - started
+
+    data.profiled = True
+    return property(data)
+
+
+def install():
+    """Подключает замер сериализации; без профилирования не вызывается.
+
+    FlatSerializer наследует BaseSerializer, и у него своё свойство
+    `data`; списки плоских сериализаторов замеряет ListSerializer.
+    """
+    for serializer in (Serializer, ListSerializer, FlatSerializer):
+        prop = serializer.__dict__['data']
+        if not getattr(prop.fget, 'profiled', False):
+            serializer.data = timed(prop)
+
+
+def view_route(match, method):
+    """Метка представления: `TitleViewSet.list`, `TokenView.post`."""
+    if match is None:
+        return 'unresolved'
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match.view_name or match._func_path
+    actions = getattr(match.func, 'actions', None) or {}
+    method = method.lower()
+    return f'{view_class.__name__}.{actions.get(method, method)}'
+
+
+def endpoint(request):
+    return view_route(
+        getattr(request, 'resolver_match', None), request.method
+    )
+
+
+class Recorder:
+    """Скользящие окна замеров по представлениям и частые формы SQL.
+
+    Окно хранит последние PROFILING_WINDOW запросов представления.
+    Раз в PROFILING_FLUSH_INTERVAL секунд снимок пишется в файл
+    PROFILING_DIR/profile-<pid>.json, и profile_report сводит снимки
+    всех процессов gunicorn.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+            self.shapes = {}
+            self.flushed_at = monotonic()
+
+    def record(self, name, total, profile):
+        with self.lock:
+            samples = self.endpoints.get(name)
+            if samples is None:
+                samples = self.endpoints[name] = deque(
+                    maxlen=settings.PROFILING_WINDOW
+                )
+            samples.append(
+                (total, profile.db, profile.serialize, profile.queries)
+            )
+            for shape, count in profile.shapes.items():
+                stored = self.shapes.get(shape)
+                if stored is None:
+                    if len(self.shapes) >= MAX_SHAPES:
+                        continue
+                    stored = self.shapes[shape] = [0, 0.0, 0, name]
+                stored[0] += count
+                stored[1] += profile.shape_time[shape]
+                if count > stored[2]:
+                    stored[2], stored[3] = count, name
+            due = (
+                monotonic() - self.flushed_at
+                >= settings.PROFILING_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'endpoints': {
+                    name: list(samples)
+                    for name, samples in self.endpoints.items()
+                },
+                'shapes': {
+                    shape: list(stored)
+                    for shape, stored in self.shapes.items()
+                },
+            }
+
+    def flush(self):
+        snapshot = self.snapshot()
+        self.flushed_at = monotonic()
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+        path = os.path.join(
+            settings.PROFILING_DIR, f'profile-{os.getpid()}.json'
+        )
+        with open(f'{path}.tmp', 'w') as file:
+            json.dump(snapshot, file)
+        os.replace(f'{path}.tmp', path)
+
+
+recorder = Recorder()
+
+
+def server_timing(total, profile):
+    return ', '.join((
+        f'db;dur={profile.db * 1000:.1f};desc="{profile.queries} queries"',
+        f'serialize;dur={profile.serialize * 1000:.1f}',
+        f'view;dur={total * 1000:.1f}',
+    ))
+
+
+class ProfilingMiddleware:
+    """Число и время запросов к БД, время сериализации и представления.
+
+    Подключается в MIDDLEWARE только при PROFILING_ENABLED, поэтому
+    без профилирования ничего не стоит. При PROFILING_SERVER_TIMING
+    замеры уходят клиенту в заголовке Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install()
+
+    def __call__(self, request):
+        profile = Profile()
+        token = current.set(profile)
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        total = perf_counter() - started
+        recorder.record(endpoint(request), total, profile)
+        if settings.PROFILING_SERVER_TIMING:
+            response['Server-Timing'] = server_timing(total, profile)
+        return response
+
+
+def load_snapshots(directory):
+    """Снимки всех процессов из каталога PROFILING_DIR."""
+    snapshots = []
+    if not os.path.isdir(directory):
+        return snapshots
+    for name in sorted(os.listdir(directory)):
+        if name.startswith('profile-') and name.endswith('.json'):
+            with open(os.path.join(directory, name)) as file:
+                snapshots.append(json.load(file))
+    return snapshots
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def summarize(snapshots):
+    """Сводка по представлениям и формам SQL из снимков процессов."""
+    endpoints = {}
+    shapes = {}
+    for snapshot in snapshots:
+        for name, samples in snapshot['endpoints'].items():
+            endpoints.setdefault(name, []).extend(samples)
+        for shape, (count, elapsed, repeats, name) in (
+            snapshot['shapes'].items()
+        ):
+            stored = shapes.setdefault(shape, [0, 0.0, 0, name])
+            stored[0] += count
+            stored[1] += elapsed
+            if repeats > stored[2]:
+                stored[2], stored[3] = repeats, name
+    rows = []
+    for name, samples in endpoints.items():
+        totals = [sample[0] for sample in samples]
+        queries = [sample[3] for sample in samples]
+        rows.append({
+            'endpoint': name,
+            'requests': len(samples),
+            'p50': percentile(totals, 0.5),
+            'p95': percentile(totals, 0.95),
+            'p99': percentile(totals, 0.99),
+            'db': sum(sample[1] for sample in samples) / len(samples),
+            'serialize': sum(sample[2] for sample in samples) / len(samples),
+            'queries': sum(queries) / len(samples),
+            'max_queries': max(queries),
+        })
+    return rows, [
+        {
+            'shape': shape,
+            'count': count,
+            'time': elapsed,
+            'max_per_request': repeats,
+            'endpoint': name,
+        }
+        for shape, (count, elapsed, repeats, name) in shapes.items()
+    ]
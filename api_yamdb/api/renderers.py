@@ -0,0 +1,36 @@
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson; без orjson и с отступами — как у DRF.
+
+    Ответ совпадает с ответом JSONRenderer: UTF-8 без пробелов,
+    даты, Decimal и ленивые строки приводит `encoder_class`.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        content = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+        return content.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace('\u2029'.encode(), b'\\u2029')
+
+
+def json_renderer():
+    """Рендерер JSON для ответов в обход DRF, по настройке FAST_JSON."""
+    return FastJSONRenderer() if settings.FAST_JSON else JSONRenderer()
@@ -1,12 +1,10 @@
-from django.db.models import Avg
+from collections import defaultdict
+
 from rest_framework import serializers
-from rest_framework.exceptions import ParseError
-from rest_framework.generics import get_object_or_404
 from rest_framework.serializers import (ModelSerializer,
-                                        SerializerMethodField,
                                         SlugRelatedField)
 
-from reviews.models import Category, Comment, Genre, Title, Review
+from reviews.models import Category, Comment, Genre, GenreTitle, Title, Review
 from users.models import User
 
 
@@ -24,10 +22,25 @@ class GenreSerializer(ModelSerializer):
         model = Genre
 
 
+class ReviewMonthSerializer(serializers.Serializer):
+    month = serializers.DateField(format='%Y-%m')
+    reviews = serializers.IntegerField()
+
+
+class GroupStatsSerializer(serializers.Serializer):
+    """Статистика жанра или категории из сводных таблиц."""
+    name = serializers.CharField()
+    slug = serializers.SlugField()
+    titles = serializers.IntegerField(source='stat.titles')
+    reviews = serializers.IntegerField(source='stat.reviews')
+    average_score = serializers.FloatField(source='stat.average_score')
+    months = ReviewMonthSerializer(many=True)
+    updated_at = serializers.DateTimeField(source='stat.updated_at')
+
+
 class GetTitleSerializer(ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
-    rating = SerializerMethodField()
 
     class Meta:
         fields = (
@@ -35,12 +48,14 @@ class GetTitleSerializer(ModelSerializer):
         )
         model = Title
 
-    def get_rating(self, obj):
-        try:
-            return int(Review.objects.filter(
-                title=obj).aggregate(Avg('score'))['score__avg'])
-        except TypeError:
-            return None
+
+class TopTitleSerializer(GetTitleSerializer):
+    recent_reviews = serializers.IntegerField(read_only=True, default=None)
+
+    class Meta(GetTitleSerializer.Meta):
+        fields = GetTitleSerializer.Meta.fields + (
+            'bayesian_rating', 'recent_reviews'
+        )
 
 
 class TitleSerializer(ModelSerializer):
@@ -71,20 +86,16 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = '__all__'
         model = Review
 
-    def validate(self, data):
-        title_id = (
-            self.context['request'].parser_context['kwargs']['title_id']
-        )
-        title = get_object_or_404(Title, pk=title_id)
-        user = self.context['request'].user
-        if (
-            self.context['request'].method == 'POST'
-            and Review.objects.filter(author=user, title=title).exists()
-        ):
-            raise ParseError(
-                'Возможен только один отзыв на произведение!'
-            )
-        return data
+
+class BulkReviewSerializer(serializers.ModelSerializer):
+    title = serializers.IntegerField(min_value=1, required=False)
+    author = serializers.CharField(max_length=150, required=False)
+
+    class Meta:
+        fields = ('title', 'author', 'text', 'score')
+        model = Review
+        # Повторы отзывов проверяются общим запросом на всю пачку.
+        validators = ()
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -97,6 +108,121 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
+class BulkCommentSerializer(serializers.ModelSerializer):
+    author = serializers.CharField(max_length=150, required=False)
+
+    class Meta:
+        fields = ('author', 'text')
+        model = Comment
+
+
+# Даты в ответах в формате DRF, как у DateTimeField ModelSerializer.
+DATETIME = serializers.DateTimeField()
+
+
+class FlatListSerializer(serializers.ListSerializer):
+    """Список строк: `prepare` дочернего сериализатора выбирает связанные
+    данные сразу для всей страницы.
+    """
+
+    def to_representation(self, data):
+        rows = list(data)
+        self.child.prepare(rows)
+        return [self.child.to_representation(row) for row in rows]
+
+
+class FlatSerializer(serializers.BaseSerializer):
+    """Только чтение: словари ответа из строк `.values()`.
+
+    Экземпляры моделей и поля ModelSerializer не создаются. `lookups`
+    — поля для `.values()`, ответ совпадает с ответом обычного
+    сериализатора.
+    """
+    lookups = ()
+
+    class Meta:
+        list_serializer_class = FlatListSerializer
+
+    @classmethod
+    def rows(cls, queryset):
+        return queryset.prefetch_related(None).values(*cls.lookups)
+
+    def prepare(self, rows):
+        pass
+
+    @property
+    def data(self):
+        if not hasattr(self, '_data'):
+            self.prepare([self.instance])
+        return super().data
+
+
+class FlatTitleSerializer(FlatSerializer):
+    """Как GetTitleSerializer; жанры страницы — одним запросом."""
+    lookups = (
+        'id', 'name', 'year', 'description', 'rating',
+        'category__name', 'category__slug',
+    )
+
+    def prepare(self, rows):
+        self.genres = defaultdict(list)
+        links = (
+            GenreTitle.objects
+            .filter(title_id__in=[row['id'] for row in rows])
+            .order_by('genre__name', 'genre_id')
+            .values_list('title_id', 'genre__name', 'genre__slug')
+        )
+        for title_id, name, slug in links:
+            self.genres[title_id].append({'name': name, 'slug': slug})
+
+    def to_representation(self, row):
+        category = None
+        if row['category__slug'] is not None:
+            category = {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            }
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'year': row['year'],
+            'description': row['description'],
+            'genre': self.genres.get(row['id'], []),
+            'category': category,
+            'rating': row['rating'],
+        }
+
+
+class FlatReviewSerializer(FlatSerializer):
+    """Как ReviewSerializer."""
+    lookups = (
+        'id', 'author__username', 'title__name', 'text', 'score', 'pub_date',
+    )
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'author': row['author__username'],
+            'title': row['title__name'],
+            'text': row['text'],
+            'score': row['score'],
+            'pub_date': DATETIME.to_representation(row['pub_date']),
+        }
+
+
+class FlatCommentSerializer(FlatSerializer):
+    """Как CommentSerializer."""
+    lookups = ('id', 'author__username', 'text', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'author': row['author__username'],
+            'text': row['text'],
+            'pub_date': DATETIME.to_representation(row['pub_date']),
+        }
+
+
 class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -0,0 +1,81 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.authentication import forget_user
+from api.cache import invalidate
+from api.db import connection_opened
+from api.suggest import KINDS, index_instance, unindex_instance
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title)
+from users.models import User
+
+
+@receiver((post_save, post_delete), sender=Category)
+def category_changed(sender, instance, **kwargs):
+    invalidate('categories')
+
+
+@receiver((post_save, post_delete), sender=Genre)
+def genre_changed(sender, instance, **kwargs):
+    invalidate('genres')
+
+
+@receiver((post_save, post_delete), sender=Title)
+def title_changed(sender, instance, **kwargs):
+    invalidate('titles', f'title:{instance.pk}', f'reviews:{instance.pk}')
+
+
+@receiver((post_save, post_delete), sender=GenreTitle)
+def title_genre_changed(sender, instance, **kwargs):
+    invalidate('titles', f'title:{instance.title_id}')
+
+
+@receiver((post_save, post_delete), sender=Review)
+def review_changed(sender, instance, **kwargs):
+    invalidate(
+        'titles',
+        f'title:{instance.title_id}',
+        f'reviews:{instance.title_id}',
+    )
+
+
+@receiver((post_save, post_delete), sender=User)
+def user_changed(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    invalidate(f'comments:{instance.review_id}')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Title):
+        invalidate('titles', f'title:{instance.pk}')
+    elif pk_set is None:
+        # Жанр отвязан от всех произведений: сброс области жанров
+        # задевает и карточки произведений.
+        invalidate('titles', 'genres')
+    else:
+        invalidate('titles', *(f'title:{pk}' for pk in pk_set))
+
+
+@receiver(post_save)
+def suggestion_saved(sender, instance, raw=False, using=None, **kwargs):
+    if sender in KINDS and not raw:
+        index_instance(instance, using)
+
+
+@receiver(post_delete)
+def suggestion_deleted(sender, instance, using=None, **kwargs):
+    if sender in KINDS:
+        unindex_instance(instance, using)
+
+
+@receiver(connection_created)
+def db_connected(sender, connection, **kwargs):
+    connection_opened(connection)
@@ -0,0 +1,192 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from time import monotonic
+
+from django.conf import settings
+from django.db import transaction
+
+from reviews.models import Category, Genre, Title
+
+WORD = re.compile(r'\w+')
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# Тип подсказки для каждой модели.
+KINDS = {Title: 'title', Genre: 'genre', Category: 'category'}
+
+
+def normalize(text):
+    return text.casefold().replace('ё', 'е')
+
+
+def make_item(kind, pk, name, slug=None):
+    if kind == 'title':
+        return {'type': kind, 'id': pk, 'name': name}
+    return {'type': kind, 'slug': slug, 'name': name}
+
+
+def discard(entries, entry):
+    index = bisect_left(entries, entry)
+    if index < len(entries) and entries[index] == entry:
+        del entries[index]
+
+
+class PrefixIndex:
+    """Индекс названий для подсказок: отсортированные массивы и bisect.
+
+    В `heads` лежат названия целиком, в `words` — их хвосты со второго
+    слова, чтобы «мир» находил «Война и мир». Совпадения с начала
+    названия выдаются раньше совпадений по словам. Индекс строится
+    при первом запросе, сигналы моделей поправляют его на месте,
+    а раз в SUGGEST_TTL секунд он строится заново: так подтягиваются
+    изменения из других процессов и записи, сохранённые без сигналов.
+
+    Новый индекс строится без блокировки поиска одним потоком,
+    остальные пока ищут по старому. Правки из сигналов, пришедшие
+    во время построения, повторяются на новом индексе при замене.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.build_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.built_at = None
+            self.heads = []
+            self.words = []
+            self.items = {}
+            self.pending = None
+
+    def entries(self, kind, pk, name):
+        name = normalize(name)
+        tails = [
+            (name[match.start():], kind, pk)
+            for match in WORD.finditer(name)
+            if match.start() > 0
+        ]
+        return (name, kind, pk), tails
+
+    def refresh(self, ttl):
+        """Строит индекс заново, если он не построен или устарел.
+
+        Первый запрос ждёт построения; устаревший индекс перестраивает
+        один поток, остальные не ждут его.
+        """
+        built_at = self.built_at
+        if built_at is not None and monotonic() - built_at <= ttl:
+            return
+        if not self.build_lock.acquire(blocking=built_at is None):
+            return
+        try:
+            if self.built_at == built_at:
+                self.rebuild()
+        finally:
+            self.build_lock.release()
+
+    def rebuild(self):
+        with self.lock:
+            self.pending = []
+        sources = (
+            ('title', Title.objects.values_list('id', 'name', 'id')),
+            ('genre', Genre.objects.values_list('id', 'name', 'slug')),
+            ('category', Category.objects.values_list('id', 'name', 'slug')),
+        )
+        heads, words, items = [], [], {}
+        for kind, rows in sources:
+            for pk, name, slug in rows:
+                head, tails = self.entries(kind, pk, name)
+                heads.append(head)
+                words.extend(tails)
+                items[(kind, pk)] = (make_item(kind, pk, name, slug), head,
+                                     tails)
+        heads.sort()
+        words.sort()
+        with self.lock:
+            self.heads, self.words, self.items = heads, words, items
+            self.built_at = monotonic()
+            pending, self.pending = self.pending, None
+            for kind, pk, item in pending:
+                self.apply(kind, pk, item)
+
+    def add(self, kind, pk, item):
+        self.change(kind, pk, item)
+
+    def remove(self, kind, pk):
+        self.change(kind, pk, None)
+
+    def change(self, kind, pk, item):
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append((kind, pk, item))
+            if self.built_at is not None:
+                self.apply(kind, pk, item)
+
+    def apply(self, kind, pk, item):
+        """Убирает запись из индекса и, если `item` задан, добавляет её."""
+        stored = self.items.pop((kind, pk), None)
+        if stored is not None:
+            _, head, tails = stored
+            discard(self.heads, head)
+            for tail in tails:
+                discard(self.words, tail)
+        if item is None:
+            return
+        head, tails = self.entries(kind, pk, item['name'])
+        insort(self.heads, head)
+        for tail in tails:
+            insort(self.words, tail)
+        self.items[(kind, pk)] = (item, head, tails)
+
+    def search(self, query, limit, kinds=None):
+        query = normalize(query.strip())
+        results = []
+        if not query:
+            return results
+        seen = set()
+        with self.lock:
+            for entries in (self.heads, self.words):
+                index = bisect_left(entries, (query,))
+                while index < len(entries) and len(results) < limit:
+                    key, kind, pk = entries[index]
+                    if not key.startswith(query):
+                        break
+                    index += 1
+                    if (
+                        (kinds is not None and kind not in kinds)
+                        or (kind, pk) in seen
+                    ):
+                        continue
+                    seen.add((kind, pk))
+                    results.append(self.items[(kind, pk)][0])
+        return results
+
+
+suggestions = PrefixIndex()
+
+
+def suggest(query, limit, kinds=None):
+    """Первые `limit` названий, начинающихся с `query` или его слов."""
+    suggestions.refresh(settings.SUGGEST_TTL)
+    return suggestions.search(query, limit, kinds)
+
+
+def index_instance(instance, using=None):
+    """Обновляет подсказку после фиксации транзакции, как invalidate.
+
+    Откаченная запись не остаётся в индексе до его перестроения.
+    """
+    kind = KINDS[type(instance)]
+    pk = instance.pk
+    item = make_item(kind, pk, instance.name, getattr(instance, 'slug', None))
+    transaction.on_commit(
+        lambda: suggestions.add(kind, pk, item), using=using
+    )
+
+
+def unindex_instance(instance, using=None):
+    kind, pk = KINDS[type(instance)], instance.pk
+    transaction.on_commit(lambda: suggestions.remove(kind, pk), using=using)
@@ -0,0 +1,171 @@
+from collections import Counter
+from time import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Отказы по областям ограничений в текущем процессе.
+REJECTIONS = Counter()
+
+
+def parse_rate(rate):
+    """'5/hour' -> (5, 3600)."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class LocalCounters:
+    """Счётчики окон в памяти процесса, без блокировок.
+
+    Чтение и запись словаря атомарны под GIL; при гонке потоков
+    теряется не больше одного удара, для ограничения частоты этого
+    достаточно. Лимиты при этом действуют на каждый процесс отдельно.
+    """
+    max_keys = 100000
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.windows = {}
+
+    def prune(self, index):
+        for key, stored in list(self.windows.items()):
+            if stored[0] < index - 1:
+                self.windows.pop(key, None)
+        if len(self.windows) >= self.max_keys:
+            self.windows.clear()
+
+    def hit(self, key, index, window):
+        stored = self.windows.get(key)
+        if stored is None or stored[0] < index - 1:
+            current, previous = 0, 0
+        elif stored[0] == index - 1:
+            current, previous = 0, stored[1]
+        else:
+            current, previous = stored[1], stored[2]
+        current += 1
+        if stored is None and len(self.windows) >= self.max_keys:
+            self.prune(index)
+        self.windows[key] = (index, current, previous)
+        return previous, current
+
+
+class CacheCounters:
+    """Счётчики окон в кэше THROTTLE_CACHE_ALIAS, общие для процессов.
+
+    Счётчик окна создаётся через add и растёт через incr — в Redis
+    и memcached это атомарные операции на стороне сервера.
+    """
+
+    def reset(self):
+        pass
+
+    def hit(self, key, index, window):
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        current_key = f'{key}:{index}'
+        cache.add(current_key, 0, 2 * window)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            cache.set(current_key, 1, 2 * window)
+            current = 1
+        return cache.get(f'{key}:{index - 1}', 0), current
+
+
+BACKENDS = {'local': LocalCounters(), 'cache': CacheCounters()}
+
+
+def reset_counters():
+    for backend in BACKENDS.values():
+        backend.reset()
+    REJECTIONS.clear()
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Ограничение частоты по скользящему окну.
+
+    Число запросов за последний период оценивается по счётчикам
+    текущего и предыдущего окна: предыдущий берётся с весом
+    оставшейся от него доли. Частота области `scope` задаётся в
+    THROTTLE_RATES, счётчики хранятся в THROTTLE_BACKEND.
+    """
+    scope = None
+
+    def get_keys(self, request):
+        return ()
+
+    def allow_request(self, request, view):
+        return self.check(self.get_keys(request))
+
+    def check(self, keys):
+        """Засчитывает запрос по каждому ключу и проверяет лимит."""
+        rate = settings.THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return True
+        limit, window = parse_rate(rate)
+        now = time()
+        index, offset = divmod(now, window)
+        self.remaining = window - offset
+        backend = BACKENDS[settings.THROTTLE_BACKEND]
+        allowed = True
+        for key in keys:
+            previous, current = backend.hit(
+                f'throttle:{self.scope}:{key}', int(index), window
+            )
+            estimate = previous * (1 - offset / window) + current
+            allowed = allowed and estimate <= limit
+        if not allowed:
+            REJECTIONS[self.scope] += 1
+        return allowed
+
+    def wait(self):
+        return self.remaining
+
+
+class CatalogReadThrottle(SlidingWindowThrottle):
+    """Чтение каталога анонимами, по IP."""
+    scope = 'catalog'
+
+    def get_keys(self, request):
+        if request.method in SAFE_METHODS and not (
+            request.user and request.user.is_authenticated
+        ):
+            return (self.get_ident(request),)
+        return ()
+
+
+class WriteThrottle(SlidingWindowThrottle):
+    """Запись отзывов и комментариев, по пользователю."""
+    scope = 'writes'
+
+    def get_keys(self, request):
+        if request.method not in SAFE_METHODS and (
+            request.user and request.user.is_authenticated
+        ):
+            return (request.user.pk,)
+        return ()
+
+
+class AuthThrottle(SlidingWindowThrottle):
+    """Регистрация и получение токена, по IP."""
+    scope = 'auth'
+
+    def get_keys(self, request):
+        return (self.get_ident(request),)
+
+
+class SignupUserThrottle(SlidingWindowThrottle):
+    """Письма на одно имя пользователя и один адрес."""
+    scope = 'signup'
+
+    def get_keys(self, request):
+        return tuple(
+            f'{field}:{str(request.data[field]).lower()}'
+            for field in ('username', 'email')
+            if request.data.get(field)
+        )
@@ -0,0 +1,18 @@
+from rest_framework_simplejwt.tokens import AccessToken
+
+# Поля пользователя, которые копируются в утверждения токена.
+CLAIM_FIELDS = ('username', 'role', 'is_superuser')
+
+
+class RoleAccessToken(AccessToken):
+    """Access-токен с именем и ролью пользователя в утверждениях.
+
+    По ним ClaimsJWTAuthentication узнаёт пользователя без запроса к БД.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        return token
@@ -2,12 +2,20 @@ from rest_framework.routers import SimpleRouter
 
 from django.urls import include, path
 
-from api.views import (CategoryViewSet,
+from api.views import (BulkReviewView,
+                       CacheStatsView,
+                       CategoryViewSet,
+                       CommentExportView,
                        CommentViewSet,
+                       DatabaseStatsView,
                        GenreViewSet,
+                       ReviewExportView,
                        ReviewViewSet,
+                       TitleExportView,
+                       ThrottleStatsView,
                        TitleViewSet,
                        SignupView,
+                       SuggestView,
                        TokenView,
                        UserViewSet)
 
@@ -31,4 +39,12 @@ urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/signup/', SignupView.as_view()),
     path('v1/auth/token/', TokenView.as_view()),
+    path('v1/reviews/bulk/', BulkReviewView.as_view()),
+    path('v1/export/titles/', TitleExportView.as_view()),
+    path('v1/export/reviews/', ReviewExportView.as_view()),
+    path('v1/export/comments/', CommentExportView.as_view()),
+    path('v1/suggest/', SuggestView.as_view()),
+    path('v1/cache/stats/', CacheStatsView.as_view()),
+    path('v1/db/stats/', DatabaseStatsView.as_view()),
+    path('v1/throttle/stats/', ThrottleStatsView.as_view()),
 ]
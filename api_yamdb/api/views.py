@@ -1,117 +1,273 @@
-import hashlib
-from datetime import datetime, timedelta
-from string import ascii_letters, digits
+from datetime import date
 
-from django.core.mail import send_mail
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.utils.crypto import get_random_string
+from django.utils import timezone
+from django.utils.functional import cached_property
 
 from rest_framework import generics, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
 from rest_framework.filters import SearchFilter
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 
-from rest_framework_simplejwt.tokens import RefreshToken
-
 from django_filters.rest_framework import DjangoFilterBackend
-
-from api.filters import FilterTitle
-from api.mixins import CreateListDestroyViewSet
+from django_filters.utils import translate_validation
+
+from api.async_views import AsyncReadsMixin
+from api.bulk import bulk_comments, bulk_reviews, summary
+from api.cache import (STATS, CachedListMixin, CachedRetrieveMixin,
+                       cached_response)
+from api.conditional import ConditionalGetMixin
+from api.db import connection_stats
+from api.export import export_response, stream_rows, with_genres
+from api.filters import (ExportCommentFilter,
+                         ExportReviewFilter,
+                         ExportTitleFilter,
+                         FilterTitle,
+                         StableOrderingFilter,
+                         TopTitleFilter)
+from api.metrics import AUTH_FAILURES, SIGNUPS
+from api.mixins import CreateListDestroyViewSet, FlatReadMixin
+from api.parsers import FastJSONParser, NDJSONParser
+from api.suggest import DEFAULT_LIMIT, MAX_LIMIT, suggest
+from api.throttles import REJECTIONS, AuthThrottle, SignupUserThrottle
+from api.tokens import RoleAccessToken
 from api.serializers import (CategorySerializer,
                              CommentSerializer,
+                             FlatCommentSerializer,
+                             FlatReviewSerializer,
+                             FlatTitleSerializer,
                              GenreSerializer,
-                             GetTitleSerializer,
+                             GroupStatsSerializer,
                              ReviewSerializer,
                              TitleSerializer,
+                             TopTitleSerializer,
                              UserSerializer)
 from api.permissions import (CategoriesGenresTitlesPermissions,
                              ReviewsCommentsPermissions,
                              IsAdminUser)
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.leaderboard import top_titles, trending_titles
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+
+from users.codes import check_code, issue_code
+from users.models import User
+from users.outbox import enqueue
+
+STATS_MONTHS = 12
+STATS_MAX_MONTHS = 120
+
+TOP_LIMIT = 10
+TOP_MAX_LIMIT = 100
+TRENDING_MAX_DAYS = 365
+
+BULK_PARSERS = (
+    FastJSONParser if settings.FAST_JSON else JSONParser, NDJSONParser
+)
 
-from users.models import ConfCode, User
 
+def int_param(request, name, default, low, high):
+    """Целый параметр запроса, приведённый к границам [low, high]."""
+    try:
+        value = int(request.query_params.get(name, default))
+    except ValueError:
+        raise ParseError(f'Параметр {name} должен быть числом.')
+    return max(low, min(value, high))
 
-class AbstractViewSet(CreateListDestroyViewSet):
+
+def first_month(today, months):
+    """Первый день месяца, с которого начинаются последние `months` месяцев."""
+    index = today.year * 12 + today.month - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class AbstractViewSet(CachedListMixin, CreateListDestroyViewSet):
     lookup_field = 'slug'
     permission_classes = (CategoriesGenresTitlesPermissions,)
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
 
+    @action(detail=True, methods=['get'], url_path='stats')
+    def stats(self, request, slug=None):
+        months = int_param(
+            request, 'months', STATS_MONTHS, 1, STATS_MAX_MONTHS
+        )
+        group = get_object_or_404(
+            self.get_queryset().select_related('stat'), slug=slug
+        )
+        group.months = group.review_months.filter(
+            month__gte=first_month(timezone.localdate(), months),
+            reviews__gt=0,
+        ).order_by('month')
+        return Response(
+            GroupStatsSerializer(group).data, status=status.HTTP_200_OK
+        )
+
 
 class GenreViewSet(AbstractViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_scopes = ('genres',)
 
 
 class CategoryViewSet(AbstractViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
-
-
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all()
-    filter_backends = (DjangoFilterBackend,)
+    cache_scopes = ('categories',)
+
+
+class TitleViewSet(AsyncReadsMixin,
+                   FlatReadMixin,
+                   CachedListMixin,
+                   CachedRetrieveMixin,
+                   ConditionalGetMixin,
+                   viewsets.ModelViewSet):
+    queryset = (
+        Title.objects
+        .select_related('category')
+        .prefetch_related('genre')
+    )
+    filter_backends = (DjangoFilterBackend, StableOrderingFilter)
     filterset_class = FilterTitle
+    ordering_fields = ('rating', 'year', 'name')
+    cursor_ordering = ('-year', 'id')
+    cursor_conflicts = ('ordering', 'q')
+    last_modified_field = 'updated_at'
     permission_classes = (CategoriesGenresTitlesPermissions,)
+    serializer_class = TitleSerializer
+    flat_serializer_class = FlatTitleSerializer
+
+    def get_cache_scopes(self):
+        scopes = ('genres', 'categories')
+        if self.action == 'retrieve':
+            return scopes + (f'title:{self.kwargs["pk"]}',)
+        return scopes + ('titles',)
+
+    def get_version_scopes(self):
+        return self.get_cache_scopes()
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
-            return GetTitleSerializer
-        return TitleSerializer
+        if self.action == 'top':
+            return TopTitleSerializer
+        return super().get_serializer_class()
+
+    @action(detail=False, methods=['get'], url_path='top')
+    def top(self, request):
+        """Лучшие произведения, а с параметром window — популярные
+        за последние window дней.
+        """
+        return cached_response(
+            self.get_cache_scopes(), self.get_leaderboard, request
+        )
+
+    def get_leaderboard(self, request):
+        limit = int_param(request, 'limit', TOP_LIMIT, 1, TOP_MAX_LIMIT)
+        filterset = TopTitleFilter(
+            request.query_params, queryset=self.get_queryset(),
+            request=request,
+        )
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        if request.query_params.get('window'):
+            titles = trending_titles(
+                filterset.qs,
+                int_param(request, 'window', 1, 1, TRENDING_MAX_DAYS),
+                limit,
+            )
+        else:
+            titles = top_titles(filterset.qs, limit)
+        serializer = self.get_serializer(titles, many=True)
+        return Response({'results': serializer.data})
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(AsyncReadsMixin,
+                    FlatReadMixin,
+                    CachedListMixin,
+                    CachedRetrieveMixin,
+                    ConditionalGetMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    flat_serializer_class = FlatReviewSerializer
     permission_classes = (ReviewsCommentsPermissions,)
+    cursor_ordering = ('pub_date', 'id')
+    # Даты правки нет: состояние для ETag — поля ответа, поколения
+    # в кэше процесса не видят правок через другие процессы.
+    state_fields = FlatReviewSerializer.lookups
+
+    @cached_property
+    def title(self):
+        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+
+    def get_cache_scopes(self):
+        return (f'reviews:{self.kwargs["title_id"]}',)
+
+    def get_version_scopes(self):
+        return self.get_cache_scopes()
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        new_queryset = title.reviews.all()
-        return new_queryset
+        return self.title.reviews.select_related('author')
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        try:
+            serializer.save(author=self.request.user, title=self.title)
+        except IntegrityError:
+            raise ParseError('Возможен только один отзыв на произведение!')
 
-        serializer.save(
-            author=self.request.user,
-            title=title
-        )
-
-    def perform_update(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        review_id = self.kwargs.get('pk')
-        author = Review.objects.get(pk=review_id).author
-        serializer.save(
-            author=author,
-            title_id=title.id
-        )
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk',
+        parser_classes=BULK_PARSERS,
+    )
+    def bulk(self, request, *args, **kwargs):
+        results = bulk_reviews(request.data, request.user, self.title)
+        return Response(summary(results), status=status.HTTP_200_OK)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(AsyncReadsMixin,
+                     FlatReadMixin,
+                     CachedListMixin,
+                     CachedRetrieveMixin,
+                     ConditionalGetMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
+    flat_serializer_class = FlatCommentSerializer
     permission_classes = (ReviewsCommentsPermissions,)
+    cursor_ordering = ('pub_date', 'id')
+    state_fields = FlatCommentSerializer.lookups
+
+    @cached_property
+    def review(self):
+        return get_object_or_404(
+            Review,
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+        )
+
+    def get_cache_scopes(self):
+        return (f'comments:{self.kwargs["review_id"]}',)
 
-    def get_review(self):
-        return get_object_or_404(Review, pk=self.kwargs.get('review_id'))
+    def get_version_scopes(self):
+        return self.get_cache_scopes()
 
     def get_queryset(self):
-        review = self.get_review()
-        new_queryset = review.comments.all()
-        return new_queryset
+        return self.review.comments.select_related('author')
 
     def perform_create(self, serializer):
-        review = self.get_review()
-        serializer.save(author=self.request.user, review_id=review.id)
-
-    def perform_update(self, serializer):
-        review = self.get_review()
-        comment_id = self.kwargs.get('pk')
-        author = Comment.objects.get(pk=comment_id).author
-        serializer.save(
-            author=author,
-            review_id=review.id
-        )
+        serializer.save(author=self.request.user, review=self.review)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk',
+        parser_classes=BULK_PARSERS,
+    )
+    def bulk(self, request, *args, **kwargs):
+        results = bulk_comments(request.data, request.user, self.review)
+        return Response(summary(results), status=status.HTTP_200_OK)
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -156,6 +312,7 @@ class SignupView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (AuthThrottle, SignupUserThrottle)
 
     def create(self, request, *args, **kwargs):
         if (
@@ -172,33 +329,26 @@ class SignupView(generics.CreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         serializer = self.get_serializer(data=request.data)
-        if not User.objects.filter(
+        exists = User.objects.filter(
             username=username,
             email=email
-        ).exists():
+        ).exists()
+        if not exists:
             serializer.is_valid(raise_exception=True)
             serializer.save()
-        secret_key = get_random_string(20, ascii_letters + digits) + username
-        secret_hash = hashlib.sha256((secret_key).encode('utf-8')).hexdigest()
-        send_mail(
+        code = issue_code(User.objects.get(username=username))
+        enqueue(
             subject='YamDB Confirmation code',
-            message=f'Confirmation code: {secret_hash}',
-            from_email='YamDB@example.com',
-            recipient_list=[email],
-            fail_silently=False,
-        )
-        ConfCode.objects.update_or_create(
-            user=User.objects.get(username=username),
-            defaults={
-                'code': secret_hash,
-                'expires': datetime.utcnow() + timedelta(days=1),
-            }
+            message=f'Confirmation code: {code}',
+            recipient=email,
         )
+        SIGNUPS.labels('repeat' if exists else 'new').inc()
         return Response(request.data, status=status.HTTP_200_OK)
 
 
 class TokenView(generics.CreateAPIView):
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (AuthThrottle,)
     serializer_class = UserSerializer
 
     def create(self, request, *args, **kwargs):
@@ -206,15 +356,188 @@ class TokenView(generics.CreateAPIView):
             'username' not in request.data
             or 'confirmation_code'not in request.data
         ):
+            AUTH_FAILURES.labels('missing_fields').inc()
             return Response(request.data, status=status.HTTP_400_BAD_REQUEST)
-        user = get_object_or_404(User, username=request.data['username'])
-        if (
-            user.conf_code.code != request.data['confirmation_code']
-            or user.conf_code.expires < datetime.utcnow()
+        try:
+            user = get_object_or_404(
+                User.objects.select_related('conf_code'),
+                username=request.data['username'],
+            )
+        except Http404:
+            AUTH_FAILURES.labels('unknown_user').inc()
+            raise
+        if not check_code(
+            getattr(user, 'conf_code', None),
+            request.data['confirmation_code'],
         ):
+            AUTH_FAILURES.labels('invalid_code').inc()
             return Response(request.data, status=status.HTTP_400_BAD_REQUEST)
-        token = RefreshToken.for_user(user)
+        token = RoleAccessToken.for_user(user)
         return Response(
-            data={'token': str(token.access_token)},
+            data={'token': str(token)},
             status=status.HTTP_200_OK
         )
+
+
+class BulkReviewView(generics.GenericAPIView):
+    permission_classes = (IsAdminUser,)
+    parser_classes = BULK_PARSERS
+
+    def post(self, request):
+        results = bulk_reviews(request.data, request.user)
+        return Response(summary(results), status=status.HTTP_200_OK)
+
+
+class ExportView(generics.GenericAPIView):
+    """Потоковая выгрузка записей в NDJSON или CSV (`?fmt=`).
+
+    `fields` задаёт колонки выгрузки и поля модели, из которых они
+    читаются. Записи читаются серверным курсором порциями по
+    EXPORT_CHUNK_SIZE, память не растёт с объёмом выгрузки.
+    """
+    permission_classes = (IsAdminUser,)
+    filter_backends = (DjangoFilterBackend,)
+    pagination_class = None
+    fields = {}
+    name = None
+
+    def get_columns(self):
+        return list(self.fields)
+
+    def get_rows(self, queryset):
+        rows = stream_rows(
+            queryset.order_by('id').values(*self.fields.values()),
+            ('id',),
+            settings.EXPORT_CHUNK_SIZE,
+        )
+        for row in rows:
+            yield {
+                column: row[field] for column, field in self.fields.items()
+            }
+
+    def get(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(
+            request._request,
+            self.get_rows(queryset),
+            self.get_columns(),
+            request.query_params.get('fmt', 'ndjson'),
+            self.name,
+            settings.EXPORT_CHUNK_SIZE,
+        )
+
+
+class TitleExportView(ExportView):
+    queryset = Title.objects.all()
+    filterset_class = ExportTitleFilter
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'year': 'year',
+        'description': 'description',
+        'category': 'category__slug',
+        'rating': 'rating',
+        'updated_at': 'updated_at',
+    }
+    name = 'titles'
+
+    def get_columns(self):
+        return super().get_columns() + ['genre']
+
+    def get_rows(self, queryset):
+        key = ('title_id', 'genre__slug')
+        genres = stream_rows(
+            GenreTitle.objects
+            .filter(title__in=queryset.values('id'))
+            .order_by(*key)
+            .values_list(*key),
+            key,
+            settings.EXPORT_CHUNK_SIZE,
+        )
+        return with_genres(super().get_rows(queryset), genres)
+
+
+class ReviewExportView(ExportView):
+    queryset = Review.objects.all()
+    filterset_class = ExportReviewFilter
+    fields = {
+        'id': 'id',
+        'title': 'title_id',
+        'author': 'author__username',
+        'text': 'text',
+        'score': 'score',
+        'pub_date': 'pub_date',
+    }
+    name = 'reviews'
+
+
+class CommentExportView(ExportView):
+    queryset = Comment.objects.all()
+    filterset_class = ExportCommentFilter
+    fields = {
+        'id': 'id',
+        'title': 'review__title_id',
+        'review': 'review_id',
+        'author': 'author__username',
+        'text': 'text',
+        'pub_date': 'pub_date',
+    }
+    name = 'comments'
+
+
+class SuggestView(generics.GenericAPIView):
+    """Подсказки по названиям произведений, жанров и категорий.
+
+    Ответ строится из индекса в памяти процесса, без запросов к БД
+    и без проверки токена.
+    """
+    authentication_classes = ()
+    permission_classes = (permissions.AllowAny,)
+    kinds = ('title', 'genre', 'category')
+
+    def get(self, request):
+        limit = int_param(request, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+        kinds = set(self.kinds)
+        if request.query_params.get('type'):
+            kinds = set(request.query_params['type'].split(','))
+            if not kinds <= set(self.kinds):
+                raise ParseError(
+                    'Параметр type принимает значения: '
+                    f'{", ".join(self.kinds)}.'
+                )
+        results = suggest(
+            request.query_params.get('q', ''),
+            limit,
+            kinds,
+        )
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+class CacheStatsView(generics.GenericAPIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(
+            {
+                'hits': STATS['hits'],
+                'misses': STATS['misses'],
+                'invalidations': STATS['invalidations'],
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class DatabaseStatsView(generics.GenericAPIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(connection_stats(), status=status.HTTP_200_OK)
+
+
+class ThrottleStatsView(generics.GenericAPIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(
+            {'rejections': dict(REJECTIONS)}, status=status.HTTP_200_OK
+        )
@@ -1,10 +1,11 @@
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-SECRET_KEY = os.getenv('SECRET_KEY'),
+SECRET_KEY = os.getenv('SECRET_KEY')
 
 DEBUG = False
 
@@ -18,8 +19,8 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
-    'reviews',
-    'api',
+    'reviews.apps.ReviewsConfig',
+    'api.apps.ApiConfig',
     'users',
     'django_filters',
 ]
@@ -56,13 +57,44 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# wsgi — синхронные воркеры gunicorn, asgi — uvicorn-воркеры
+# (см. gunicorn.conf.py).
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+# Соединения с БД: постоянные (DB_CONN_MAX_AGE секунд, none — без
+# ограничения) с проверкой перед запросом или из пула DB_POOL:
+# builtin — пул psycopg 3 в процессе, pgbouncer — внешний PgBouncer
+# в режиме transaction, с которым нельзя держать серверные курсоры.
+# Под ASGI синхронный код запроса идёт в новом потоке, и постоянные
+# соединения копились бы по потокам: там они выключены, нужен пул.
+DB_POOL = os.getenv('DB_POOL', '')
+DB_CONN_MAX_AGE = os.getenv(
+    'DB_CONN_MAX_AGE', '0' if SERVER_MODE == 'asgi' else '60'
+)
+
+# Профиль SQLite для локальных замеров: WAL и отложенная синхронизация.
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL;'
+    'PRAGMA synchronous=NORMAL;'
+    'PRAGMA cache_size=-65536;'
+    'PRAGMA temp_store=MEMORY;'
+    'PRAGMA mmap_size=268435456;'
+)
+
 if os.getenv('DB_ENGINE') == 'django.db.backends.sqlite3':
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+            'OPTIONS': {},
         }
     }
+    if os.getenv('SQLITE_PROFILE') == 'fast':
+        DATABASES['default']['OPTIONS'] = {
+            'init_command': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        }
 else:
     DATABASES = {
         'default': {
@@ -72,8 +104,26 @@ else:
             'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
             'HOST': os.getenv('DB_HOST'),
             'PORT': os.getenv('DB_PORT'),
+            'OPTIONS': {},
+            'DISABLE_SERVER_SIDE_CURSORS': DB_POOL == 'pgbouncer',
         }
     }
+    if DB_POOL == 'builtin':
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        }
+        # Пул сам держит соединения, постоянные соединения с ним
+        # несовместимы.
+        DB_CONN_MAX_AGE = '0'
+
+DATABASES['default'].update(
+    CONN_MAX_AGE=(
+        None if DB_CONN_MAX_AGE == 'none' else int(DB_CONN_MAX_AGE)
+    ),
+    CONN_HEALTH_CHECKS=os.getenv('DB_CONN_HEALTH_CHECKS', '1') == '1',
+)
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -98,8 +148,6 @@ TIME_ZONE = 'Europe/Moscow'
 
 USE_I18N = True
 
-USE_L10N = True
-
 USE_TZ = True
 
 
@@ -109,17 +157,144 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'api_yamdb/api/static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+CACHES = {
+    # Кэш по умолчанию, в нём и счётчики THROTTLE_BACKEND=cache.
+    'default': {
+        'BACKEND': os.getenv(
+            'DEFAULT_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('DEFAULT_CACHE_LOCATION', ''),
+    },
+    # Локальная память и файлы — для разработки и тестов, в production
+    # кэш должен быть общим для всех процессов (Redis).
+    'responses': {
+        'BACKEND': os.getenv(
+            'RESPONSE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', 'responses'),
+        'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 1000)),
+        },
+    },
+    # Кэш пользователей для аутентификации, общий для процессов.
+    'auth': {
+        'BACKEND': os.getenv(
+            'AUTH_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('AUTH_CACHE_LOCATION', 'auth'),
+    },
+}
+
+RESPONSE_CACHE_ALIAS = 'responses'
+
+# Без общего бэкенда (RESPONSE_CACHE_BACKEND) кэш ответов по умолчанию
+# выключен: сброс в памяти процесса не виден другим воркерам.
+RESPONSE_CACHE_ENABLED = os.getenv(
+    'RESPONSE_CACHE_ENABLED',
+    '1' if os.getenv('RESPONSE_CACHE_BACKEND') else '0',
+) == '1'
+
+# Профилирование запросов: число и время запросов к БД, время
+# сериализации и представления по представлениям DRF (api/profiling.py).
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', '0') == '1'
+PROFILING_SERVER_TIMING = os.getenv('PROFILING_SERVER_TIMING', '1') == '1'
+PROFILING_WINDOW = int(os.getenv('PROFILING_WINDOW', 1000))
+PROFILING_FLUSH_INTERVAL = float(os.getenv('PROFILING_FLUSH_INTERVAL', 5))
+PROFILING_DIR = os.getenv(
+    'PROFILING_DIR', os.path.join(tempfile.gettempdir(), 'yamdb-profiling')
+)
+if PROFILING_ENABLED:
+    MIDDLEWARE.insert(0, 'api.profiling.ProfilingMiddleware')
+
+# В режиме asgi чтение произведений, отзывов и комментариев из кэша
+# ответов не занимает поток.
+ASYNC_READS = os.getenv('ASYNC_READS', str(int(SERVER_MODE == 'asgi'))) == '1'
+if ASYNC_READS:
+    MIDDLEWARE.insert(0, 'api.async_views.CachedReadMiddleware')
+
+# Метрики Prometheus на /metrics; при заданном METRICS_TOKEN нужен
+# заголовок `Authorization: Bearer <токен>`.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(0, 'api.metrics.MetricsMiddleware')
+
+# Наибольшее число записей в одном запросе пакетной загрузки.
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 1000))
+
+# Размер порции серверного курсора и ответа в выгрузках.
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# Взвешенный рейтинг: средняя оценка, к которой добавлены
+# RATING_PRIOR_WEIGHT (> 0) голосов со средней RATING_PRIOR_MEAN.
+# После изменения нужно выполнить rebuild_ratings.
+RATING_PRIOR_MEAN = float(os.getenv('RATING_PRIOR_MEAN', 5.5))
+RATING_PRIOR_WEIGHT = int(os.getenv('RATING_PRIOR_WEIGHT', 10))
+
+# Сколько секунд строка пользователя хранится в кэше аутентификации;
+# 0 — для чтения брать имя и роль из утверждений токена, не обращаясь
+# к БД. Кэш должен быть общим для процессов, иначе сброс при смене роли
+# виден только в процессе, где она произошла, поэтому без
+# AUTH_CACHE_BACKEND по умолчанию кэш выключен.
+AUTH_USER_CACHE_ALIAS = 'auth'
+AUTH_USER_CACHE_TTL = int(os.getenv(
+    'AUTH_USER_CACHE_TTL', 60 if os.getenv('AUTH_CACHE_BACKEND') else 0
+))
+
+# Ограничения частоты запросов по областям, «число/период» (s, m, h, d):
+# чтение каталога анонимами с одного IP, запись одним пользователем,
+# регистрация и токен с одного IP, письма на одно имя или адрес.
+# Счётчики: local — в памяти процесса (лимит на каждый воркер),
+# cache — в кэше THROTTLE_CACHE_ALIAS; общим для всех воркеров он
+# становится с DEFAULT_CACHE_BACKEND (проверка api.E002).
+THROTTLE_RATES = {
+    'catalog': os.getenv('THROTTLE_CATALOG_RATE', '600/min'),
+    'writes': os.getenv('THROTTLE_WRITES_RATE', '60/min'),
+    'auth': os.getenv('THROTTLE_AUTH_RATE', '30/hour'),
+    'signup': os.getenv('THROTTLE_SIGNUP_RATE', '5/hour'),
+}
+THROTTLE_BACKEND = os.getenv('THROTTLE_BACKEND', 'local')
+THROTTLE_CACHE_ALIAS = 'default'
+
+# Через сколько секунд индекс подсказок строится заново из БД.
+SUGGEST_TTL = int(os.getenv('SUGGEST_TTL', 300))
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttles.CatalogReadThrottle',
+        'api.throttles.WriteThrottle',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.DefaultPagination',
     'PAGE_SIZE': 10,
+    # Клиентский IP для ограничений берётся из X-Forwarded-For,
+    # который ставит nginx перед приложением.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 1)),
 }
 
+# JSON через orjson (если установлен): ответы и тела запросов те же,
+# что у рендерера и парсера DRF.
+FAST_JSON = os.getenv('FAST_JSON', '0') == '1'
+if FAST_JSON:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ]
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ]
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -129,4 +304,19 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
 
-EMAIL_BACKEND = 'django.core.mail.backends.dummy.EmailBackend'
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND', 'django.core.mail.backends.dummy.EmailBackend'
+)
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', '0') == '1'
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', 10))
+DEFAULT_FROM_EMAIL = 'YamDB@example.com'
+
+# Очередь писем: размер пачки, число попыток и задержка перед первым
+# повтором в секундах (дальше она удваивается).
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 100))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.getenv('EMAIL_OUTBOX_RETRY_DELAY', 60))
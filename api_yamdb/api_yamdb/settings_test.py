@@ -0,0 +1,15 @@
+from api_yamdb.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+SECRET_KEY = 'yamdb-test-secret-key'
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Тесты идут в одном процессе, кэш ответов в памяти ему достаточен.
+RESPONSE_CACHE_ENABLED = True
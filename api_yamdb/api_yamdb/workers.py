@@ -0,0 +1,18 @@
+import os
+
+from uvicorn_worker import UvicornWorker as BaseUvicornWorker
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """Воркер uvicorn для gunicorn.
+
+    Django не обрабатывает события lifespan. WEB_CONCURRENCY_LIMIT
+    ограничивает число одновременных соединений воркера: сверх него
+    uvicorn отвечает 503, а не заводит поток на каждый новый запрос.
+    """
+    CONFIG_KWARGS = {
+        **BaseUvicornWorker.CONFIG_KWARGS,
+        'lifespan': 'off',
+        'limit_concurrency': int(os.getenv('WEB_CONCURRENCY_LIMIT', 0))
+        or None,
+    }
@@ -0,0 +1,46 @@
+"""Настройки gunicorn из переменных окружения.
+
+SERVER_MODE=wsgi — потоковые воркеры gthread и WSGI-приложение,
+SERVER_MODE=asgi — uvicorn-воркеры и ASGI-приложение.
+Метрики Prometheus воркеров сводятся через PROMETHEUS_MULTIPROC_DIR.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+bind = os.getenv('WEB_BIND', '0.0.0.0:8000')
+workers = int(
+    os.getenv('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+)
+timeout = int(os.getenv('WEB_TIMEOUT', 30))
+keepalive = int(os.getenv('WEB_KEEPALIVE', 5))
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+accesslog = os.getenv('WEB_ACCESS_LOG') or None
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'api_yamdb.asgi:application'
+    worker_class = 'api_yamdb.workers.UvicornWorker'
+else:
+    wsgi_app = 'api_yamdb.wsgi:application'
+    worker_class = 'gthread'
+    threads = int(os.getenv('WEB_THREADS', 4))
+
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(tempfile.gettempdir(), 'yamdb-metrics'),
+)
+
+
+def on_starting(server):
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,139 @@
+import csv
+import os
+import random
+from datetime import date
+
+WORDS = (
+    'война', 'мир', 'тайна', 'остров', 'город', 'ночь', 'звезда', 'море',
+    'дорога', 'время', 'сердце', 'тень', 'огонь', 'зима', 'песня', 'дом',
+    'последний', 'белый', 'тихий', 'далёкий', 'старый', 'новый', 'чёрный',
+    'золотой', 'потерянный', 'forest', 'king', 'river', 'dream', 'light',
+)
+GENRES_PER_TITLE = 3
+FIRST_YEAR = 1950
+
+
+def review_counts(total, titles, users, skew):
+    """Число отзывов на произведения по убыванию популярности.
+
+    Доли убывают по закону Ципфа с показателем `skew`; у одного
+    произведения не больше `users` отзывов (один отзыв на автора),
+    недостающие отзывы достаются следующим по популярности.
+    """
+    weights = [1 / rank ** skew for rank in range(1, titles + 1)]
+    weight = sum(weights)
+    counts = [min(users, int(total * share / weight)) for share in weights]
+    shortfall = min(total, titles * users) - sum(counts)
+    for index in range(titles):
+        if shortfall <= 0:
+            break
+        added = min(users - counts[index], shortfall)
+        counts[index] += added
+        shortfall -= added
+    return counts
+
+
+def phrase(rng, low, high):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def open_csv(data_dir, name, header):
+    csv_file = open(
+        os.path.join(data_dir, name), 'w', encoding='utf-8', newline=''
+    )
+    writer = csv.writer(csv_file)
+    writer.writerow(header)
+    return csv_file, writer
+
+
+def generate(data_dir, titles=1000, users=1000, reviews=20000,
+             comments=20000, genres=20, categories=10, skew=1.0, seed=1):
+    """Пишет в `data_dir` CSV-файлы в формате load_csv.
+
+    Один и тот же `seed` даёт одни и те же данные. Возвращает число
+    строк по файлам.
+    """
+    rng = random.Random(seed)
+    os.makedirs(data_dir, exist_ok=True)
+    written = {}
+
+    csv_file, writer = open_csv(
+        data_dir, 'users.csv',
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+    )
+    with csv_file:
+        for pk in range(1, users + 1):
+            writer.writerow(
+                (pk, f'user{pk}', f'user{pk}@yamdb.fake', 'user', '', '', '')
+            )
+    written['users.csv'] = users
+
+    for name, count, label, slug in (
+        ('category.csv', categories, 'Категория', 'category'),
+        ('genre.csv', genres, 'Жанр', 'genre'),
+    ):
+        csv_file, writer = open_csv(data_dir, name, ('id', 'name', 'slug'))
+        with csv_file:
+            for pk in range(1, count + 1):
+                writer.writerow((pk, f'{label} {pk}', f'{slug}-{pk}'))
+        written[name] = count
+
+    last_year = date.today().year
+    links = 0
+    titles_file, writer = open_csv(
+        data_dir, 'titles.csv',
+        ('id', 'name', 'year', 'category', 'description'),
+    )
+    links_file, links_writer = open_csv(
+        data_dir, 'genre_title.csv', ('id', 'title_id', 'genre_id')
+    )
+    with titles_file, links_file:
+        for pk in range(1, titles + 1):
+            writer.writerow((
+                pk,
+                phrase(rng, 1, 4).capitalize(),
+                rng.randint(FIRST_YEAR, last_year),
+                rng.randint(1, categories) if categories else '',
+                phrase(rng, 5, 20),
+            ))
+            for genre in rng.sample(
+                range(1, genres + 1),
+                min(genres, rng.randint(1, GENRES_PER_TITLE)),
+            ):
+                links += 1
+                links_writer.writerow((links, pk, genre))
+    written['titles.csv'] = titles
+    written['genre_title.csv'] = links
+
+    # Популярность не совпадает с порядком id.
+    ranked = list(range(1, titles + 1))
+    rng.shuffle(ranked)
+    review_pk = 0
+    csv_file, writer = open_csv(
+        data_dir, 'review.csv', ('id', 'title_id', 'text', 'author', 'score')
+    )
+    with csv_file:
+        for title, count in zip(
+            ranked, review_counts(reviews, titles, users, skew)
+        ):
+            for author in rng.sample(range(1, users + 1), count):
+                review_pk += 1
+                writer.writerow((
+                    review_pk, title, phrase(rng, 3, 30), author,
+                    rng.randint(1, 10),
+                ))
+    written['review.csv'] = review_pk
+
+    csv_file, writer = open_csv(
+        data_dir, 'comments.csv', ('id', 'review_id', 'text', 'author')
+    )
+    if not review_pk:
+        comments = 0
+    with csv_file:
+        for pk in range(1, comments + 1):
+            writer.writerow((
+                pk, rng.randint(1, review_pk), phrase(rng, 2, 15),
+                rng.randint(1, users),
+            ))
+    written['comments.csv'] = comments
+    return written
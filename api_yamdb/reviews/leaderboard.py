@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from reviews.models import TitleReviewDay
+
+
+def top_titles(titles, limit):
+    """Лучшие произведения по взвешенному рейтингу.
+
+    Сортировка идёт по индексу title_bayesian_idx, произведения
+    без отзывов в рейтинг не попадают.
+    """
+    return list(
+        titles
+        .filter(rating_count__gt=0)
+        .order_by('-bayesian_rating', 'id')[:limit]
+    )
+
+
+def trending_titles(titles, days, limit):
+    """Произведения, которым за последние `days` дней оставили больше всего
+    отзывов, при равенстве — по взвешенному рейтингу.
+
+    Отзывы суммируются по таблице отзывов за день, поэтому запрос
+    читает только строки из окна, а не все отзывы. Каждому
+    произведению проставляется `recent_reviews`.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = (
+        TitleReviewDay.objects
+        .filter(day__gte=since, title__in=titles.values('pk'))
+        .values('title')
+        .annotate(recent=Sum('reviews'))
+        .filter(recent__gt=0)
+        .order_by('-recent', '-title__bayesian_rating', 'title')[:limit]
+    )
+    recent = {row['title']: row['recent'] for row in rows}
+    found = titles.in_bulk(recent)
+    result = []
+    for pk, reviews in recent.items():
+        title = found[pk]
+        title.recent_reviews = reviews
+        result.append(title)
+    return result
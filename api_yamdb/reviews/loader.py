@@ -0,0 +1,336 @@
+import csv
+import io
+import os
+from collections import namedtuple
+from concurrent.futures import (FIRST_COMPLETED, Future, ProcessPoolExecutor,
+                                wait)
+from contextlib import contextmanager
+from itertools import islice
+from time import monotonic
+
+import django
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.rating import rebuild_ratings
+from reviews.stats import refresh_stats
+from users.models import User
+
+CHUNK_SIZE = 5000
+SHARD_SIZE = 32 * 1024 * 1024
+
+# Файл, модель и переименование колонок CSV в атрибуты модели.
+# Внешние ключи пишутся напрямую в `<поле>_id`, без выборки объектов.
+SOURCES = (
+    ('users.csv', User, {}),
+    ('category.csv', Category, {}),
+    ('genre.csv', Genre, {}),
+    ('titles.csv', Title, {'category': 'category_id'}),
+    ('genre_title.csv', GenreTitle, {}),
+    ('review.csv', Review, {'author': 'author_id'}),
+    ('comments.csv', Comment, {'author': 'author_id'}),
+)
+
+
+Shard = namedtuple(
+    'Shard',
+    'name path model columns start stop chunk_size use_copy checkpoint',
+)
+
+
+def read_lines(binary_file, stop=None):
+    """Строки файла с текущей позиции, которые начинаются до `stop`."""
+    position = binary_file.tell()
+    for line in binary_file:
+        if stop is not None and position >= stop:
+            return
+        position += len(line)
+        yield line.decode('utf-8')
+
+
+def read_chunks(path, columns, chunk_size=CHUNK_SIZE, start=0, stop=None,
+                skip=0):
+    """Читает CSV порциями, в памяти держится не больше одной порции.
+
+    `start` и `stop` — границы части файла в байтах, `start` стоит
+    в начале строки. Заголовок читается отдельно, затем файл читается
+    с `start`; `skip` пропускает первые записи части.
+    """
+    with open(path, 'rb') as csv_file:
+        header = next(csv.reader([csv_file.readline().decode('utf-8')]))
+        if start > csv_file.tell():
+            csv_file.seek(start)
+        rows = islice(
+            csv.DictReader(read_lines(csv_file, stop), header), skip, None
+        )
+        while True:
+            chunk = [
+                {
+                    columns.get(key, key): (
+                        None if value == '' and key in columns else value
+                    )
+                    for key, value in row.items()
+                }
+                for row in islice(rows, chunk_size)
+            ]
+            if not chunk:
+                return
+            yield chunk
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def copy_objects(model, objects):
+    """Загружает объекты через COPY FROM STDIN (только PostgreSQL)."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not (field.primary_key and objects[0].pk is None)
+    ]
+    buffer = io.StringIO()
+    for obj in objects:
+        buffer.write('\t'.join(
+            copy_value(field.get_db_prep_save(
+                field.pre_save(obj, True), connection
+            ))
+            for field in fields
+        ))
+        buffer.write('\n')
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    sql = f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN'
+    with connection.cursor() as cursor:
+        if connection.Database.__name__ == 'psycopg':
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            cursor.copy_expert(sql, buffer)
+
+
+@contextmanager
+def given_dates(model, names):
+    """Отключает auto_now_add у полей, значения которых есть в файле.
+
+    Иначе pre_save при вставке заменит дату из CSV временем загрузки.
+    Поля модели общие для процесса, а загрузка в процессе однопоточная.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False) and field.attname in names
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def insert_chunk(model, rows, use_copy=False, ignore_conflicts=False):
+    """Сохраняет порцию строк одной транзакцией."""
+    objects = [model(**row) for row in rows]
+    with transaction.atomic(), given_dates(model, rows[0] if rows else ()):
+        if use_copy:
+            copy_objects(model, objects)
+        else:
+            model.objects.bulk_create(
+                objects, ignore_conflicts=ignore_conflicts
+            )
+    return len(objects)
+
+
+def reset_sequences(models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def split_file(path, shard_size):
+    """Границы частей файла по `shard_size` байт, без разбора CSV.
+
+    Каждая граница сдвигается к началу следующей строки, так что
+    процесс читает только свою часть. Записи с переводом строки внутри
+    кавычек при делении на части не поддерживаются.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as csv_file:
+        csv_file.readline()
+        offsets = [csv_file.tell()]
+        while offsets[-1] < size:
+            csv_file.seek(offsets[-1] + shard_size - 1)
+            csv_file.readline()
+            offsets.append(min(csv_file.tell(), size))
+    return list(zip(offsets, offsets[1:])) or [(offsets[0], offsets[0])]
+
+
+def dependencies(sources):
+    """Файлы, которые нужно загрузить раньше, — по внешним ключам моделей."""
+    by_model = {model: name for name, model, _ in sources}
+    return {
+        name: {
+            by_model[field.related_model]
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model in by_model
+            and field.related_model is not model
+        }
+        for name, model, _ in sources
+    }
+
+
+def read_checkpoint(path):
+    try:
+        with open(path, 'r') as checkpoint:
+            return int(checkpoint.read())
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path, loaded):
+    with open(f'{path}.tmp', 'w') as checkpoint:
+        checkpoint.write(str(loaded))
+    os.replace(f'{path}.tmp', path)
+
+
+def load_shard(shard):
+    """Загружает диапазон строк файла, отмечая прогресс после каждой порции.
+
+    Если прогресс уже записан, загрузка продолжается с первой
+    неподтверждённой строки. Первая порция после возобновления
+    сохраняется с игнорированием конфликтов: она могла быть
+    зафиксирована до того, как прогресс успел записаться.
+    """
+    model = apps.get_model(shard.model)
+    done = read_checkpoint(shard.checkpoint) if shard.checkpoint else 0
+    loaded = done
+    resumed = done > 0
+    chunks = read_chunks(
+        shard.path, shard.columns, shard.chunk_size,
+        shard.start, shard.stop, skip=done,
+    )
+    for chunk in chunks:
+        loaded += insert_chunk(
+            model, chunk,
+            use_copy=shard.use_copy and not resumed,
+            ignore_conflicts=resumed,
+        )
+        resumed = False
+        if shard.checkpoint:
+            write_checkpoint(shard.checkpoint, loaded)
+    return shard, loaded - done
+
+
+def make_shards(name, path, model, columns, options):
+    """Делит файл на части по `shard_size` байт."""
+    shard_size = options['shard_size']
+    bounds = [(0, None)]
+    if shard_size:
+        bounds = split_file(path, shard_size)
+    shards = []
+    for start, stop in bounds:
+        checkpoint = None
+        if options['checkpoint_dir']:
+            checkpoint = os.path.join(
+                options['checkpoint_dir'],
+                f'{name}.{start}-{"end" if stop is None else stop}',
+            )
+        shards.append(Shard(
+            name, path, model._meta.label, columns, start, stop,
+            options['chunk_size'], options['use_copy'], checkpoint,
+        ))
+    return shards
+
+
+def run_inline(function, argument):
+    future = Future()
+    future.set_result(function(argument))
+    return future
+
+
+def load_all(data_dir, chunk_size=CHUNK_SIZE, use_copy=False, workers=1,
+             shard_size=SHARD_SIZE, checkpoint_dir=None, report=print):
+    """Загружает все файлы SOURCES с учётом зависимостей между ними.
+
+    При `workers` > 1 файлы делятся на части по байтам, независимые
+    файлы и части загружаются параллельно процессами, у каждого
+    процесса своё соединение с БД. Каждый процесс начинает чтение
+    со своего смещения и не разбирает файл с начала.
+    """
+    options = {
+        'chunk_size': chunk_size,
+        'use_copy': use_copy,
+        'shard_size': shard_size if workers > 1 else None,
+        'checkpoint_dir': checkpoint_dir,
+    }
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+    waiting = dependencies(SOURCES)
+    shards = {
+        name: make_shards(
+            name, os.path.join(data_dir, name), model, columns, options
+        )
+        for name, model, columns in SOURCES
+    }
+    executor = None
+    submit = run_inline
+    if workers > 1:
+        connections.close_all()
+        executor = ProcessPoolExecutor(workers, initializer=django.setup)
+        submit = executor.submit
+    try:
+        run_shards(shards, waiting, submit, report)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    reset_sequences([model for _, model, _ in SOURCES])
+    rebuild_ratings()
+    refresh_stats()
+
+
+def run_shards(shards, waiting, submit, report):
+    """Запускает части файлов, как только загружены их зависимости."""
+    remaining = {name: len(items) for name, items in shards.items()}
+    loaded = dict.fromkeys(shards, 0)
+    started = {}
+    running = set()
+    while waiting or running:
+        ready = [name for name, needs in waiting.items() if not needs]
+        if not ready and not running:
+            raise ValueError(f'Циклическая зависимость файлов: {waiting}')
+        for name in ready:
+            del waiting[name]
+            started[name] = monotonic()
+            running.update(
+                submit(load_shard, shard) for shard in shards[name]
+            )
+        done, running = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            shard, rows = future.result()
+            loaded[shard.name] += rows
+            remaining[shard.name] -= 1
+            if remaining[shard.name]:
+                continue
+            elapsed = monotonic() - started[shard.name]
+            report(
+                f'{shard.name}: {loaded[shard.name]} строк за {elapsed:.1f} с '
+                f'({loaded[shard.name] / max(elapsed, 1e-6):.0f} строк/с)'
+            )
+            for needs in waiting.values():
+                needs.discard(shard.name)
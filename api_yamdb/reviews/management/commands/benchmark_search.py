@@ -0,0 +1,56 @@
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from reviews.models import Title
+from reviews.search import search_titles
+
+
+def fulltext(query):
+    return search_titles(Title.objects.all(), query).order_by(
+        '-search_rank', 'id'
+    )
+
+
+def icontains(query):
+    return Title.objects.filter(name__icontains=query).order_by('id')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время полнотекстового поиска произведений и поиска '
+        'через icontains: подсчёт и первая страница, как в списке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='+', help='Поисковые запросы.')
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Число повторов каждого запроса.',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=10,
+            help='Число записей на странице.',
+        )
+
+    def handle(self, *args, **options):
+        for query in options['queries']:
+            for name, build in (('fulltext', fulltext),
+                                ('icontains', icontains)):
+                timings = []
+                for _ in range(options['repeat']):
+                    started = perf_counter()
+                    queryset = build(query)
+                    total = queryset.count()
+                    list(queryset[:options['page_size']])
+                    timings.append(perf_counter() - started)
+                self.stdout.write(
+                    f'{query!r} {name}: {total} записей, '
+                    f'медиана {median(timings) * 1000:.2f} мс, '
+                    f'максимум {max(timings) * 1000:.2f} мс'
+                )
@@ -0,0 +1,137 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from time import perf_counter, sleep
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.models import Review
+
+MODES = ('wsgi', 'asgi')
+
+
+def percentile(timings, share):
+    return timings[min(len(timings) - 1, int(len(timings) * share))]
+
+
+def fetch(url):
+    started = perf_counter()
+    try:
+        with urlopen(url, timeout=30) as response:
+            response.read()
+            status = response.status
+    except HTTPError as error:
+        status = error.code
+    except URLError:
+        status = None
+    return status, perf_counter() - started
+
+
+def default_paths():
+    """Страницы чтения для произведения с наибольшим числом отзывов."""
+    review = Review.objects.order_by('-title__rating_count').first()
+    if review is None:
+        return ['/api/v1/titles/', '/api/v1/genres/']
+    title = f'/api/v1/titles/{review.title_id}/'
+    return [
+        '/api/v1/titles/',
+        title,
+        f'{title}reviews/',
+        f'{title}reviews/{review.id}/',
+        f'{title}reviews/{review.id}/comments/',
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает gunicorn в режимах wsgi и asgi (см. gunicorn.conf.py) '
+        'и сравнивает пропускную способность и задержки на чтении '
+        'произведений, отзывов и комментариев.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Пути для запросов; по умолчанию — произведение с '
+                 'наибольшим числом отзывов, его отзывы и комментарии.',
+        )
+        parser.add_argument(
+            '--modes', nargs='+', choices=MODES, default=MODES,
+            help='Режимы сервера для сравнения.',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Число запросов в каждом режиме.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=32,
+            help='Число одновременных клиентов.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Число процессов gunicorn (WEB_WORKERS).',
+        )
+        parser.add_argument(
+            '--port', type=int, default=8765,
+            help='Порт, на котором запускается сервер.',
+        )
+
+    def start(self, mode, options):
+        env = {
+            **os.environ,
+            'SERVER_MODE': mode,
+            'WEB_BIND': f'127.0.0.1:{options["port"]}',
+            'WEB_WORKERS': str(options['workers']),
+            'ALLOWED_HOSTS': '127.0.0.1',
+            'THROTTLE_CATALOG_RATE': f'{10 ** 9}/min',
+        }
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        url = f'http://127.0.0.1:{options["port"]}/api/v1/genres/'
+        for _ in range(100):
+            if fetch(url)[0] == 200:
+                return server
+            if server.poll() is not None:
+                break
+            sleep(0.1)
+        server.terminate()
+        raise CommandError(f'Сервер в режиме {mode} не запустился.')
+
+    def run(self, urls, options):
+        for url in urls:
+            fetch(url)
+        started = perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            results = list(executor.map(
+                fetch, islice(cycle(urls), options['requests'])
+            ))
+        elapsed = perf_counter() - started
+        timings = sorted(timing for _, timing in results)
+        errors = sum(status != 200 for status, _ in results)
+        return (
+            f'{len(results) / elapsed:.0f} запр/с, '
+            f'p50 {percentile(timings, 0.5) * 1000:.1f} мс, '
+            f'p95 {percentile(timings, 0.95) * 1000:.1f} мс, '
+            f'p99 {percentile(timings, 0.99) * 1000:.1f} мс, '
+            f'ошибок {errors}'
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or default_paths()
+        base = f'http://127.0.0.1:{options["port"]}'
+        urls = [base + path for path in paths]
+        for mode in options['modes']:
+            server = self.start(mode, options)
+            try:
+                self.stdout.write(f'{mode}: {self.run(urls, options)}')
+            finally:
+                server.terminate()
+                server.wait()
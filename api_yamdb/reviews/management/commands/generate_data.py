@@ -0,0 +1,105 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from reviews.generator import generate
+from reviews.loader import CHUNK_SIZE, SHARD_SIZE, load_all
+from reviews.models import Title
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт набор данных заданного размера с неравномерным '
+        'распределением отзывов и загружает его, как load_csv.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ('titles', 1000, 'Число произведений.'),
+            ('users', 1000, 'Число пользователей.'),
+            ('reviews', 20000, 'Число отзывов.'),
+            ('comments', 20000, 'Число комментариев.'),
+            ('genres', 20, 'Число жанров.'),
+            ('categories', 10, 'Число категорий.'),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default, help=help_text
+            )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.0,
+            help='Показатель закона Ципфа для отзывов по произведениям: '
+                 '0 — поровну, больше — сильнее перекос к популярным.',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=1, help='Зерно генератора.'
+        )
+        parser.add_argument(
+            '--data-dir',
+            default=os.path.join(tempfile.gettempdir(), 'yamdb-dataset'),
+            help='Каталог для CSV-файлов.',
+        )
+        parser.add_argument(
+            '--skip-load',
+            action='store_true',
+            help='Только записать CSV-файлы.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Число строк в одной транзакции.',
+        )
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='Загружать через COPY FROM STDIN (только PostgreSQL).',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Число процессов загрузки.',
+        )
+        parser.add_argument(
+            '--shard-size', type=int, default=SHARD_SIZE,
+            help='Размер части файла в байтах при --workers > 1.',
+        )
+
+    def handle(self, *args, **options):
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('COPY доступен только для PostgreSQL.')
+        if min(options['titles'], options['users'], options['genres']) < 1:
+            raise CommandError(
+                '--titles, --users и --genres должны быть больше 0.'
+            )
+        if not options['skip_load'] and (
+            Title.objects.exists() or User.objects.exists()
+        ):
+            raise CommandError(
+                'Данные загружаются с заданными id: нужна пустая база.'
+            )
+        written = generate(
+            options['data_dir'],
+            titles=options['titles'],
+            users=options['users'],
+            reviews=options['reviews'],
+            comments=options['comments'],
+            genres=options['genres'],
+            categories=options['categories'],
+            skew=options['skew'],
+            seed=options['seed'],
+        )
+        self.stdout.write(f'Файлы в {options["data_dir"]}: ' + ', '.join(
+            f'{name} — {rows}' for name, rows in written.items()
+        ))
+        if options['skip_load']:
+            return
+        load_all(
+            options['data_dir'],
+            chunk_size=options['chunk_size'],
+            use_copy=options['copy'],
+            workers=options['workers'],
+            shard_size=options['shard_size'],
+            report=self.stdout.write,
+        )
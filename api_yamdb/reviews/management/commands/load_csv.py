@@ -1,59 +1,58 @@
-from csv import DictReader
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
 
-from django.core.management.base import BaseCommand
-
-from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
-from users.models import User
-
-
-FILES = [
-    ('static/data/users.csv', User),
-    ('static/data/category.csv', Category),
-    ('static/data/genre.csv', Genre),
-    ('static/data/genre_title.csv', GenreTitle)
-]
+from reviews.loader import CHUNK_SIZE, SHARD_SIZE, load_all
 
 
 class Command(BaseCommand):
-
-    def reader(self, file, object):
-        for row in DictReader(open(file, 'r', encoding='utf-8')):
-            object(**row).save()
+    help = 'Загружает данные из CSV-файлов порциями через bulk_create.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default='static/data',
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Число строк в одной транзакции.',
+        )
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='Загружать через COPY FROM STDIN (только PostgreSQL).',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Число процессов загрузки.',
+        )
+        parser.add_argument(
+            '--shard-size',
+            type=int,
+            default=SHARD_SIZE,
+            help='Размер части файла в байтах при --workers > 1.',
+        )
+        parser.add_argument(
+            '--checkpoint-dir',
+            help='Каталог для отметок прогресса, позволяет продолжить '
+                 'прерванную загрузку.',
+        )
 
     def handle(self, *args, **options):
-        for i in range(2):
-            self.reader(*FILES[i])
-        with open('static/data/titles.csv', 'r', encoding='utf-8') as inp_f:
-            reader = DictReader(inp_f)
-            for row in reader:
-                titles = Title(
-                    id=row['id'],
-                    name=row['name'],
-                    year=row['year'],
-                    category=Category.objects.get(pk=row['category'])
-                )
-                titles.save()
-        self.reader(*FILES[3])
-        with open('static/data/review.csv', 'r', encoding='utf-8') as inp_f:
-            reader = DictReader(inp_f)
-            for row in reader:
-                review = Review(
-                    id=row['id'],
-                    title_id=row['title_id'],
-                    text=row['text'],
-                    author_id=row['author'],
-                    score=row['score'],
-                    pub_date=row['pub_date'],
-                )
-                review.save()
-        with open('static/data/comments.csv', 'r', encoding='utf-8') as inp_f:
-            reader = DictReader(inp_f)
-            for row in reader:
-                comments = Comment(
-                    id=row['id'],
-                    review_id=row['review_id'],
-                    text=row['text'],
-                    author=User.objects.get(pk=row['author']),
-                    pub_date=row['pub_date'],
-                )
-                comments.save()
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('COPY доступен только для PostgreSQL.')
+        if options['workers'] < 1 or options['shard_size'] < 1:
+            raise CommandError('--workers и --shard-size должны быть > 0.')
+        load_all(
+            options['data_dir'],
+            chunk_size=options['chunk_size'],
+            use_copy=options['copy'],
+            workers=options['workers'],
+            shard_size=options['shard_size'],
+            checkpoint_dir=options['checkpoint_dir'],
+            report=self.stdout.write,
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reviews.stats import refresh_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает статистику жанров и категорий и отзывы '
+        'на произведения по дням.'
+    )
+
+    def handle(self, *args, **options):
+        refresh_stats()
+        self.stdout.write('Статистика жанров и категорий пересчитана.')
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_rating'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='title',
+            name='rating',
+            field=models.PositiveSmallIntegerField(db_index=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+from django.db import migrations
+
+# SQL записан здесь, а не взят из reviews.search: правка модуля
+# не должна менять уже применённую миграцию.
+POSTGRESQL_INSTALL = (
+    'ALTER TABLE reviews_title ADD COLUMN IF NOT EXISTS search tsvector '
+    'GENERATED ALWAYS AS ('
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A')"
+    ' || '
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B')"
+    ') STORED',
+    'CREATE INDEX IF NOT EXISTS title_search_idx ON reviews_title '
+    'USING GIN (search)',
+)
+POSTGRESQL_UNINSTALL = (
+    'ALTER TABLE reviews_title DROP COLUMN IF EXISTS search',
+)
+
+SQLITE_INSTALL = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts USING fts5('
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_insert '
+    'AFTER INSERT ON reviews_title '
+    'BEGIN INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_delete '
+    'AFTER DELETE ON reviews_title '
+    'BEGIN INSERT INTO reviews_title_fts'
+    '(reviews_title_fts, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_update '
+    'AFTER UPDATE OF name, description ON reviews_title '
+    'BEGIN INSERT INTO reviews_title_fts'
+    '(reviews_title_fts, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); "
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+)
+SQLITE_UNINSTALL = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+)
+
+
+def execute(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def install_search(apps, schema_editor):
+    execute(schema_editor, {
+        'postgresql': POSTGRESQL_INSTALL,
+        'sqlite': SQLITE_INSTALL,
+    })
+
+
+def uninstall_search(apps, schema_editor):
+    execute(schema_editor, {
+        'postgresql': POSTGRESQL_UNINSTALL,
+        'sqlite': SQLITE_UNINSTALL,
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
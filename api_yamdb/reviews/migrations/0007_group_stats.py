@@ -0,0 +1,93 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from reviews.stats import refresh_group
+
+
+def fill_stats(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    for group, field in (('Genre', 'genre'), ('Category', 'category')):
+        refresh_group(
+            apps.get_model('reviews', group),
+            apps.get_model('reviews', f'{group}Stat'),
+            apps.get_model('reviews', f'{group}ReviewMonth'),
+            Title,
+            Review,
+            field,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStat',
+            fields=[
+                ('titles', models.PositiveIntegerField(default=0, verbose_name='Количество произведений')),
+                ('reviews', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('score_sum', models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата пересчёта')),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stat', serialize=False, to='reviews.Category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Статистика категории',
+                'verbose_name_plural': 'Статистика категорий',
+            },
+        ),
+        migrations.CreateModel(
+            name='GenreStat',
+            fields=[
+                ('titles', models.PositiveIntegerField(default=0, verbose_name='Количество произведений')),
+                ('reviews', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('score_sum', models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата пересчёта')),
+                ('genre', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stat', serialize=False, to='reviews.Genre', verbose_name='Жанр')),
+            ],
+            options={
+                'verbose_name': 'Статистика жанра',
+                'verbose_name_plural': 'Статистика жанров',
+            },
+        ),
+        migrations.CreateModel(
+            name='GenreReviewMonth',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Месяц')),
+                ('reviews', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('genre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_months', to='reviews.Genre', verbose_name='Жанр')),
+            ],
+            options={
+                'verbose_name': 'Отзывы жанра за месяц',
+                'verbose_name_plural': 'Отзывы жанров по месяцам',
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryReviewMonth',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Месяц')),
+                ('reviews', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_months', to='reviews.Category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Отзывы категории за месяц',
+                'verbose_name_plural': 'Отзывы категорий по месяцам',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='genrereviewmonth',
+            constraint=models.UniqueConstraint(fields=('genre', 'month'), name='genre_review_month'),
+        ),
+        migrations.AddConstraint(
+            model_name='categoryreviewmonth',
+            constraint=models.UniqueConstraint(fields=('category', 'month'), name='category_review_month'),
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
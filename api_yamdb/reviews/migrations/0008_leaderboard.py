@@ -0,0 +1,64 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import F, Q
+
+from reviews.rating import weighted_rating
+from reviews.stats import refresh_review_days
+
+
+def fill_leaderboard(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.update(bayesian_rating=weighted_rating(
+        F('rating_sum'), F('rating_count'), Q(rating_count=0)
+    ))
+    refresh_review_days(
+        apps.get_model('reviews', 'Review'),
+        apps.get_model('reviews', 'TitleReviewDay'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_group_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleReviewDay',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('reviews', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+            ],
+            options={
+                'verbose_name': 'Отзывы на произведение за день',
+                'verbose_name_plural': 'Отзывы на произведения по дням',
+            },
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='bayesian_rating',
+            field=models.FloatField(editable=False, help_text='Средняя оценка с априорными голосами, для рейтингов.', null=True, verbose_name='Взвешенный рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-bayesian_rating', 'id'], name='title_bayesian_idx'),
+        ),
+        migrations.AddField(
+            model_name='titlereviewday',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_days', to='reviews.Title', verbose_name='Произведение'),
+        ),
+        migrations.AddIndex(
+            model_name='titlereviewday',
+            index=models.Index(fields=['day', 'title'], name='review_day_title_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titlereviewday',
+            constraint=models.UniqueConstraint(fields=('title', 'day'), name='title_review_day'),
+        ),
+        migrations.RunPython(fill_leaderboard, migrations.RunPython.noop),
+    ]
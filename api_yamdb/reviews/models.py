@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 from reviews.validators import validate_year
@@ -72,11 +72,44 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок',
+    )
+    rating = models.PositiveSmallIntegerField(
+        null=True,
+        editable=False,
+        db_index=True,
+        verbose_name='Рейтинг',
+    )
+    bayesian_rating = models.FloatField(
+        null=True,
+        editable=False,
+        verbose_name='Взвешенный рейтинг',
+        help_text='Средняя оценка с априорными голосами, для рейтингов.',
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения',
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('-year',)
+        indexes = (
+            models.Index(fields=('-year', 'id'), name='title_year_id_idx'),
+            models.Index(
+                fields=('-bayesian_rating', 'id'), name='title_bayesian_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
@@ -154,10 +187,31 @@ class Review(AbstractModel):
                 fields=['title', 'author'], name='title_one_review'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx',
+            ),
+        )
         ordering = ('title',)
         verbose_name = 'Отзыв. model Review'
         verbose_name_plural = 'Отзывы. model Review'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not {'title_id', 'score'} & instance.get_deferred_fields():
+            instance.remember_rating_state()
+        return instance
+
+    def remember_rating_state(self):
+        """Запоминает оценку, уже учтённую в рейтинге произведения."""
+        self._rating_state = (self.title_id, self.score)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return (
             f'{self.author.username[:LIMIT_USERNAME]}',
@@ -188,6 +242,12 @@ class Comment(AbstractModel):
     )
 
     class Meta:
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx',
+            ),
+        )
         ordering = ('review', 'author')
         verbose_name = 'Комментарий. model Comment'
         verbose_name_plural = 'Комментарии. model Comment'
@@ -195,3 +255,135 @@ class Comment(AbstractModel):
     def __str__(self):
         return (f'{self.author.username[:LIMIT_USERNAME]}',
                 f'{self.text[:LIMIT_TEXT]}')
+
+
+class AbstractStat(models.Model):
+    """Сводка по группе произведений для статистики."""
+    titles = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество произведений',
+    )
+    reviews = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов',
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок',
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата пересчёта',
+    )
+
+    class Meta:
+        abstract = True
+
+    @property
+    def average_score(self):
+        if not self.reviews:
+            return None
+        return round(self.score_sum / self.reviews, 2)
+
+
+class GenreStat(AbstractStat):
+    genre = models.OneToOneField(
+        Genre,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stat',
+        verbose_name='Жанр',
+    )
+
+    class Meta:
+        verbose_name = 'Статистика жанра'
+        verbose_name_plural = 'Статистика жанров'
+
+
+class CategoryStat(AbstractStat):
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stat',
+        verbose_name='Категория',
+    )
+
+    class Meta:
+        verbose_name = 'Статистика категории'
+        verbose_name_plural = 'Статистика категорий'
+
+
+class AbstractReviewMonth(models.Model):
+    """Число отзывов на произведения группы за месяц."""
+    month = models.DateField(verbose_name='Месяц')
+    reviews = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов',
+    )
+
+    class Meta:
+        abstract = True
+
+
+class GenreReviewMonth(AbstractReviewMonth):
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        related_name='review_months',
+        verbose_name='Жанр',
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('genre', 'month'), name='genre_review_month'
+            ),
+        )
+        verbose_name = 'Отзывы жанра за месяц'
+        verbose_name_plural = 'Отзывы жанров по месяцам'
+
+
+class CategoryReviewMonth(AbstractReviewMonth):
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='review_months',
+        verbose_name='Категория',
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('category', 'month'), name='category_review_month'
+            ),
+        )
+        verbose_name = 'Отзывы категории за месяц'
+        verbose_name_plural = 'Отзывы категорий по месяцам'
+
+
+class TitleReviewDay(models.Model):
+    """Число отзывов на произведение за день, для популярного за период."""
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='review_days',
+        verbose_name='Произведение',
+    )
+    day = models.DateField(verbose_name='День')
+    reviews = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов',
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'day'), name='title_review_day'
+            ),
+        )
+        indexes = (
+            models.Index(fields=('day', 'title'), name='review_day_title_idx'),
+        )
+        verbose_name = 'Отзывы на произведение за день'
+        verbose_name_plural = 'Отзывы на произведения по дням'
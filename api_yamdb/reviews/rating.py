@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.db.models import (Case, Count, ExpressionWrapper, F, FloatField,
+                              IntegerField, OuterRef, Q, Subquery, Sum, Value,
+                              When)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from reviews.models import Review, Title
+from reviews.stats import shift_totals
+
+
+def weighted_rating(rating_sum, rating_count, empty):
+    """Байесовское среднее: оценки вместе с априорными голосами.
+
+    К оценкам добавляются RATING_PRIOR_WEIGHT голосов со средней
+    RATING_PRIOR_MEAN, так что произведение с парой отзывов не обгоняет
+    те, у которых их сотни. Если выполнено условие `empty`, рейтинга нет.
+    """
+    weight = settings.RATING_PRIOR_WEIGHT
+    return Case(
+        When(empty, then=Value(None)),
+        default=ExpressionWrapper(
+            (Value(float(weight * settings.RATING_PRIOR_MEAN)) + rating_sum)
+            / (Value(weight) + rating_count),
+            output_field=FloatField(),
+        ),
+        output_field=FloatField(),
+    )
+
+
+def update_title_rating(title_id, score_delta, count_delta):
+    """Сдвигает сумму и количество оценок одним UPDATE-запросом.
+
+    Вместе с рейтингом сдвигаются сводки жанров и категории произведения.
+    """
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Case(
+            When(rating_count=-count_delta, then=Value(None)),
+            default=ExpressionWrapper(
+                new_sum / new_count, output_field=IntegerField()
+            ),
+            output_field=IntegerField(),
+        ),
+        bayesian_rating=weighted_rating(
+            new_sum, new_count, Q(rating_count=-count_delta)
+        ),
+        updated_at=timezone.now(),
+    )
+    shift_totals(title_id, score_delta, count_delta)
+
+
+def rebuild_ratings(titles=None):
+    """Пересчитывает рейтинг произведений по таблице отзывов."""
+    if titles is None:
+        titles = Title.objects.all()
+    reviews = (
+        Review.objects
+        .filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+    )
+    updated = titles.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0,
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')),
+            0,
+        ),
+        rating=Subquery(
+            reviews.annotate(
+                total=ExpressionWrapper(
+                    Sum('score') / Count('id'), output_field=IntegerField()
+                )
+            ).values('total')
+        ),
+        updated_at=timezone.now(),
+    )
+    titles.update(bayesian_rating=weighted_rating(
+        F('rating_sum'), F('rating_count'), Q(rating_count=0)
+    ))
+    return updated
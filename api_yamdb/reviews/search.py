@@ -0,0 +1,134 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Конфигурация PostgreSQL для разбора текста на лексемы.
+SEARCH_CONFIG = 'russian'
+
+TABLE = 'reviews_title'
+FTS_TABLE = 'reviews_title_fts'
+
+POSTGRESQL_INSTALL = (
+    f'ALTER TABLE {TABLE} ADD COLUMN IF NOT EXISTS search tsvector '
+    'GENERATED ALWAYS AS ('
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A')"
+    ' || '
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')),"
+    " 'B')"
+    ') STORED',
+    f'CREATE INDEX IF NOT EXISTS title_search_idx ON {TABLE} '
+    'USING GIN (search)',
+)
+POSTGRESQL_UNINSTALL = (
+    f'ALTER TABLE {TABLE} DROP COLUMN IF EXISTS search',
+)
+
+SQLITE_INSTALL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    f"name, description, content='{TABLE}', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {TABLE} '
+    f'BEGIN INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {TABLE} '
+    f'BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update '
+    f'AFTER UPDATE OF name, description ON {TABLE} '
+    f'BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+)
+SQLITE_REBUILD = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+SQLITE_UNINSTALL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install(connection):
+    """Создаёт поисковый индекс произведений, если его ещё нет.
+
+    PostgreSQL: вычисляемая колонка tsvector с весами для названия
+    и описания и GIN-индекс по ней. SQLite: таблица FTS5 над таблицей
+    произведений и триггеры, которые поддерживают её при записи.
+    Триггеры пропадают, когда SQLite пересоздаёт таблицу при
+    миграции, поэтому установка повторяется после каждой миграции.
+    Строки таблицы при этом сохраняют id, и индекс заново строится,
+    только если таблица FTS5 создаётся.
+    """
+    statements = {
+        'postgresql': POSTGRESQL_INSTALL,
+        'sqlite': SQLITE_INSTALL,
+    }.get(connection.vendor, ())
+    created = (
+        connection.vendor == 'sqlite'
+        and FTS_TABLE not in connection.introspection.table_names()
+    )
+    execute(connection, statements)
+    if created:
+        execute(connection, (SQLITE_REBUILD,))
+
+
+def uninstall(connection):
+    statements = {
+        'postgresql': POSTGRESQL_UNINSTALL,
+        'sqlite': SQLITE_UNINSTALL,
+    }.get(connection.vendor, ())
+    execute(connection, statements)
+
+
+def fts_query(query):
+    """Запрос FTS5: все слова по префиксу, спецсимволы отбрасываются."""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
+
+
+def search_titles(queryset, query):
+    """Отбирает произведения по запросу и добавляет релевантность.
+
+    Релевантность записывается в аннотацию `search_rank`, чем больше,
+    тем выше. На СУБД без полнотекстового индекса поиск идёт по
+    вхождению подстроки в название и описание.
+    """
+    no_rank = Value(0.0, output_field=FloatField())
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        rank = RawSQL(
+            f'ts_rank({TABLE}.search, {tsquery})', (query,),
+            output_field=FloatField(),
+        )
+        matches = RawSQL(
+            f'{TABLE}.search @@ {tsquery}', (query,),
+            output_field=BooleanField(),
+        )
+        return queryset.filter(matches).annotate(search_rank=rank)
+    if vendor == 'sqlite':
+        match = fts_query(query)
+        if not match:
+            return queryset.annotate(search_rank=no_rank).none()
+        rank = RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {TABLE}.id',
+            (match,),
+            output_field=FloatField(),
+        )
+        matches = RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match,),
+        )
+        return queryset.filter(id__in=matches).annotate(search_rank=rank)
+    return queryset.filter(
+        Q(name__icontains=query) | Q(description__icontains=query)
+    ).annotate(search_rank=no_rank)
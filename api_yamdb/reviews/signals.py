@@ -0,0 +1,148 @@
+from django.db.models import F, QuerySet
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from reviews.models import (Category, CategoryStat, Genre, GenreStat,
+                            GenreTitle, Review, Title)
+from reviews.rating import rebuild_ratings, update_title_rating
+from reviews.stats import (clear_genre, refresh_stats, review_day,
+                           shift_groups, shift_review_volume, title_groups,
+                           titles_share)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_rating_state', None)
+    day = review_day(instance.pub_date)
+    if created:
+        update_title_rating(instance.title_id, instance.score, 1)
+        shift_review_volume(instance.title_id, day, 1)
+    elif previous is None:
+        rebuild_ratings(Title.objects.filter(pk=instance.title_id))
+        refresh_stats(*title_groups(instance.title_id))
+    elif previous[0] != instance.title_id:
+        update_title_rating(previous[0], -previous[1], -1)
+        shift_review_volume(previous[0], day, -1)
+        update_title_rating(instance.title_id, instance.score, 1)
+        shift_review_volume(instance.title_id, day, 1)
+    elif previous[1] != instance.score:
+        update_title_rating(
+            instance.title_id, instance.score - previous[1], 0
+        )
+    instance.remember_rating_state()
+
+
+def deletes_title(origin):
+    return isinstance(origin, Title) or (
+        isinstance(origin, QuerySet) and origin.model is Title
+    )
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, origin=None, **kwargs):
+    if deletes_title(origin):
+        # Отзывы удаляются вместе с произведением: сводки групп
+        # поправит title_deleted на весь вклад произведения.
+        return
+    title_id, score = getattr(
+        instance, '_rating_state', (instance.title_id, instance.score)
+    )
+    update_title_rating(title_id, -score, -1)
+    shift_review_volume(title_id, review_day(instance.pub_date), -1)
+
+
+@receiver(post_save, sender=Genre)
+def genre_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        GenreStat.objects.create(genre=instance)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        CategoryStat.objects.create(category=instance)
+
+
+@receiver(pre_save, sender=Title)
+def title_saving(sender, instance, raw, **kwargs):
+    if not raw and instance.pk is not None:
+        instance._stat_category = (
+            Title.objects.filter(pk=instance.pk)
+            .values_list('category_id', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_stat_category', None)
+    if created and instance.category_id is not None:
+        CategoryStat.objects.filter(category_id=instance.category_id).update(
+            titles=F('titles') + 1
+        )
+    elif not created and previous != instance.category_id:
+        share = titles_share([instance.pk])
+        shift_groups(share, categories={previous} - {None}, sign=-1)
+        shift_groups(share, categories={instance.category_id} - {None})
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleting(sender, instance, **kwargs):
+    instance._stat_groups = title_groups(instance.pk)
+    instance._stat_share = titles_share([instance.pk])
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    shift_groups(instance._stat_share, *instance._stat_groups, sign=-1)
+
+
+@receiver(post_save, sender=GenreTitle)
+def title_genre_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        shift_groups(titles_share([instance.title_id]), {instance.genre_id})
+
+
+def linked(instance, reverse, pk_set):
+    """Id из `pk_set`, которые действительно связаны с `instance`."""
+    if reverse:
+        links = GenreTitle.objects.filter(
+            genre_id=instance.pk, title_id__in=pk_set
+        )
+        return set(links.values_list('title_id', flat=True))
+    links = GenreTitle.objects.filter(
+        title_id=instance.pk, genre_id__in=pk_set
+    )
+    return set(links.values_list('genre_id', flat=True))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Переносит вклад произведений между жанрами.
+
+    Перед удалением связей запоминаются только существующие: в `pk_set`
+    приходят все переданные id. Жанр без произведений обнуляется.
+    """
+    if action == 'pre_remove':
+        instance._stat_removed = linked(instance, reverse, pk_set)
+    elif action == 'pre_clear' and not reverse:
+        instance._stat_removed = title_groups(instance.pk)[0]
+    elif action == 'post_clear' and reverse:
+        clear_genre(instance.pk)
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if action == 'post_add':
+            changed, sign = pk_set, 1
+        else:
+            changed, sign = instance._stat_removed, -1
+        if not changed:
+            return
+        if reverse:
+            shift_groups(titles_share(changed), {instance.pk}, sign=sign)
+        else:
+            shift_groups(titles_share([instance.pk]), changed, sign=sign)
@@ -0,0 +1,281 @@
+from django.db import connection, transaction
+from django.db.models import Count, DateField, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from django.utils import timezone
+
+from reviews.models import (Category, CategoryReviewMonth, CategoryStat,
+                            Genre, GenreReviewMonth, GenreStat, GenreTitle,
+                            Review, Title, TitleReviewDay)
+
+# Отзывы за месяц прибавляются к строке группы или создают её.
+MONTH_UPSERT = (
+    'INSERT INTO {table} ({column}, month, reviews) {select} '
+    'ON CONFLICT ({column}, month) '
+    'DO UPDATE SET reviews = {table}.reviews + excluded.reviews'
+)
+GENRE_MONTH_UPSERT = MONTH_UPSERT.format(
+    table=GenreReviewMonth._meta.db_table,
+    column='genre_id',
+    select=(
+        f'SELECT genre_id, %s, %s FROM {GenreTitle._meta.db_table} '
+        'WHERE title_id = %s'
+    ),
+)
+CATEGORY_MONTH_UPSERT = MONTH_UPSERT.format(
+    table=CategoryReviewMonth._meta.db_table,
+    column='category_id',
+    select=(
+        f'SELECT category_id, %s, %s FROM {Title._meta.db_table} '
+        'WHERE id = %s AND category_id IS NOT NULL'
+    ),
+)
+# Отзывы за месяц прибавляются к строке группы с заданным id.
+GENRE_MONTH_ROW_UPSERT = MONTH_UPSERT.format(
+    table=GenreReviewMonth._meta.db_table,
+    column='genre_id',
+    select='VALUES (%s, %s, %s)',
+)
+CATEGORY_MONTH_ROW_UPSERT = MONTH_UPSERT.format(
+    table=CategoryReviewMonth._meta.db_table,
+    column='category_id',
+    select='VALUES (%s, %s, %s)',
+)
+# Отзывы за день прибавляются к строке произведения или создают её.
+TITLE_DAY_UPSERT = (
+    f'INSERT INTO {TitleReviewDay._meta.db_table} (title_id, day, reviews) '
+    'VALUES (%s, %s, %s) ON CONFLICT (title_id, day) '
+    f'DO UPDATE SET reviews = {TitleReviewDay._meta.db_table}.reviews '
+    '+ excluded.reviews'
+)
+
+
+def review_day(pub_date):
+    return timezone.localtime(pub_date).date()
+
+
+def title_genres(title_id):
+    return GenreTitle.objects.filter(title_id=title_id).values('genre_id')
+
+
+def title_category(title_id):
+    return Title.objects.filter(pk=title_id).values('category_id')
+
+
+def shift_totals(title_id, score_delta, count_delta):
+    """Сдвигает сводки жанров и категории произведения вслед за рейтингом."""
+    changes = {
+        'reviews': F('reviews') + count_delta,
+        'score_sum': F('score_sum') + score_delta,
+    }
+    GenreStat.objects.filter(genre_id__in=title_genres(title_id)).update(
+        **changes
+    )
+    CategoryStat.objects.filter(
+        category_id__in=title_category(title_id)
+    ).update(**changes)
+
+
+def shift_review_volume(title_id, day, delta):
+    """Сдвигает число отзывов за день у произведения.
+
+    Вместе с ним сдвигается число отзывов за месяц у жанров
+    и категории произведения.
+    """
+    month = day.replace(day=1)
+    if delta > 0:
+        with connection.cursor() as cursor:
+            cursor.execute(TITLE_DAY_UPSERT, [title_id, day, delta])
+            for upsert in (GENRE_MONTH_UPSERT, CATEGORY_MONTH_UPSERT):
+                cursor.execute(upsert, [month, delta, title_id])
+        return
+    TitleReviewDay.objects.filter(title_id=title_id, day=day).update(
+        reviews=F('reviews') + delta
+    )
+    GenreReviewMonth.objects.filter(
+        month=month, genre_id__in=title_genres(title_id)
+    ).update(reviews=F('reviews') + delta)
+    CategoryReviewMonth.objects.filter(
+        month=month, category_id__in=title_category(title_id)
+    ).update(reviews=F('reviews') + delta)
+
+
+def titles_share(title_ids):
+    """Вклад произведений в сводки групп.
+
+    Число произведений, отзывов и сумма оценок берутся из полей
+    рейтинга, отзывы по месяцам — из отзывов произведений по дням.
+    """
+    totals = Title.objects.filter(pk__in=title_ids).aggregate(
+        titles=Count('id'),
+        reviews=Coalesce(Sum('rating_count'), 0),
+        score_sum=Coalesce(Sum('rating_sum'), 0),
+    )
+    months = list(
+        TitleReviewDay.objects
+        .filter(title_id__in=title_ids)
+        .annotate(month=TruncMonth('day'))
+        .order_by()
+        .values('month')
+        .annotate(total=Sum('reviews'))
+        .values_list('month', 'total')
+    )
+    return totals, months
+
+
+def shift_groups(share, genres=(), categories=(), sign=1):
+    """Прибавляет вклад произведений к сводкам групп, при `sign=-1`
+    вычитает его.
+
+    Так произведение переходит между жанрами и категориями без
+    пересчёта групп целиком, как отзывы в shift_review_volume.
+    """
+    totals, months = share
+    if not totals['titles']:
+        return
+    changes = {
+        name: F(name) + sign * value for name, value in totals.items()
+    }
+    groups = (
+        (GenreStat, GenreReviewMonth, 'genre_id', GENRE_MONTH_ROW_UPSERT,
+         genres),
+        (CategoryStat, CategoryReviewMonth, 'category_id',
+         CATEGORY_MONTH_ROW_UPSERT, categories),
+    )
+    for stat_model, month_model, field, upsert, ids in groups:
+        if not ids:
+            continue
+        stat_model.objects.filter(**{f'{field}__in': ids}).update(**changes)
+        if not months:
+            continue
+        if sign > 0:
+            with connection.cursor() as cursor:
+                cursor.executemany(upsert, [
+                    (pk, month, total)
+                    for pk in ids for month, total in months
+                ])
+            continue
+        for month, total in months:
+            month_model.objects.filter(
+                month=month, **{f'{field}__in': ids}
+            ).update(reviews=F('reviews') - total)
+
+
+def clear_genre(genre_id):
+    """Обнуляет сводку жанра, от которого отвязаны все произведения."""
+    GenreStat.objects.filter(genre_id=genre_id).update(
+        titles=0, reviews=0, score_sum=0
+    )
+    GenreReviewMonth.objects.filter(genre_id=genre_id).delete()
+
+
+def group_total(titles, aggregate):
+    return Coalesce(
+        Subquery(titles.annotate(total=aggregate).values('total')), 0
+    )
+
+
+def refresh_group(group_model, stat_model, month_model, title_model,
+                  review_model, field, ids=None):
+    """Пересчитывает сводки и помесячные отзывы групп по произведениям.
+
+    Без `ids` пересчитываются все группы. Модели передаются явно,
+    чтобы пересчёт можно было запускать и из миграции.
+    """
+    groups = group_model.objects.all()
+    if ids is not None:
+        groups = groups.filter(pk__in=ids)
+    stat_model.objects.bulk_create(
+        [
+            stat_model(**{f'{field}_id': pk})
+            for pk in groups.values_list('pk', flat=True)
+        ],
+        ignore_conflicts=True,
+    )
+    titles = (
+        title_model.objects
+        .filter(**{field: OuterRef(f'{field}_id')})
+        .order_by()
+        .values(field)
+    )
+    stats = stat_model.objects.filter(
+        **{f'{field}_id__in': groups.values('pk')}
+    )
+    stats.update(
+        titles=group_total(titles, Count('id')),
+        reviews=group_total(titles, Sum('rating_count')),
+        score_sum=group_total(titles, Sum('rating_sum')),
+        updated_at=timezone.now(),
+    )
+    months = (
+        review_model.objects
+        .filter(**{f'title__{field}__in': groups.values('pk')})
+        .annotate(month=TruncMonth('pub_date', output_field=DateField()))
+        .order_by()
+        .values(f'title__{field}', 'month')
+        .annotate(total=Count('id'))
+    )
+    month_model.objects.filter(
+        **{f'{field}_id__in': groups.values('pk')}
+    ).delete()
+    month_model.objects.bulk_create(
+        month_model(**{
+            f'{field}_id': row[f'title__{field}'],
+            'month': row['month'],
+            'reviews': row['total'],
+        })
+        for row in months
+    )
+
+
+def refresh_review_days(review_model, day_model):
+    """Пересчитывает отзывы на произведения по дням.
+
+    Модели передаются явно, как в refresh_group.
+    """
+    days = (
+        review_model.objects
+        .annotate(day=TruncDate('pub_date'))
+        .order_by()
+        .values('title', 'day')
+        .annotate(total=Count('id'))
+    )
+    day_model.objects.all().delete()
+    day_model.objects.bulk_create(
+        day_model(title_id=row['title'], day=row['day'], reviews=row['total'])
+        for row in days
+    )
+
+
+def refresh_stats(genres=None, categories=None):
+    """Пересчитывает статистику жанров и категорий.
+
+    `genres` и `categories` — id групп для пересчёта, None — все
+    группы этого вида, пустой набор — ни одной. Полный пересчёт
+    заодно пересчитывает отзывы на произведения по дням.
+    """
+    with transaction.atomic():
+        if genres is None and categories is None:
+            refresh_review_days(Review, TitleReviewDay)
+        if genres is None or genres:
+            refresh_group(
+                Genre, GenreStat, GenreReviewMonth, Title, Review, 'genre',
+                genres,
+            )
+        if categories is None or categories:
+            refresh_group(
+                Category, CategoryStat, CategoryReviewMonth, Title, Review,
+                'category', categories,
+            )
+
+
+def title_groups(title_id):
+    """Id жанров и категории произведения — для точечного пересчёта."""
+    genres = set(
+        GenreTitle.objects.filter(title_id=title_id)
+        .values_list('genre_id', flat=True)
+    )
+    categories = set(
+        Title.objects.filter(pk=title_id, category__isnull=False)
+        .values_list('category_id', flat=True)
+    )
+    return genres, categories
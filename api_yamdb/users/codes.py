@@ -0,0 +1,61 @@
+import hashlib
+import hmac
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, get_random_string
+
+from users.models import ConfCode
+
+CODE_LENGTH = 20
+CODE_TTL = timedelta(days=1)
+KEY_SALT = 'users.ConfCode'
+
+
+def hash_code(code):
+    """HMAC-SHA256 кода на ключе из SECRET_KEY: в БД коды не хранятся."""
+    key = hashlib.sha256((KEY_SALT + settings.SECRET_KEY).encode()).digest()
+    return hmac.new(key, code.encode(), hashlib.sha256).hexdigest()
+
+
+def issue_code(user):
+    """Создаёт новый код подтверждения пользователя и возвращает его."""
+    code = get_random_string(CODE_LENGTH)
+    ConfCode.objects.update_or_create(
+        user=user,
+        defaults={
+            'code': hash_code(code),
+            'expires': timezone.now() + CODE_TTL,
+        },
+    )
+    return code
+
+
+def check_code(conf_code, code):
+    """Код совпадает и не истёк; сравнение идёт за постоянное время."""
+    return (
+        conf_code is not None
+        and conf_code.expires > timezone.now()
+        and constant_time_compare(conf_code.code, hash_code(str(code)))
+    )
+
+
+def delete_batches(queryset, batch_size):
+    """Удаляет строки выборки пачками по `batch_size`, возвращает их число."""
+    deleted = 0
+    while True:
+        batch = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if batch:
+            deleted += queryset.model.objects.filter(
+                pk__in=batch
+            ).delete()[0]
+        if len(batch) < batch_size:
+            return deleted
+
+
+def sweep_expired(batch_size):
+    """Удаляет истёкшие коды пачками по `batch_size` и возвращает их число."""
+    return delete_batches(
+        ConfCode.objects.filter(expires__lte=timezone.now()), batch_size
+    )
@@ -0,0 +1,61 @@
+from time import sleep
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from prometheus_client import start_http_server
+
+from users.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пачками через одно SMTP-соединение. '
+        'С --loop работает постоянно, как фоновый обработчик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Число писем в пачке.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками пустой очереди, в секундах.',
+        )
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            help='Отдавать метрики писем в формате Prometheus на этом порту.',
+        )
+
+    def handle(self, *args, **options):
+        if options['metrics_port']:
+            start_http_server(options['metrics_port'])
+        while True:
+            sent, postponed = self.drain(options['batch_size'])
+            if sent or postponed:
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, отложено: {postponed}'
+                )
+            if not options['loop']:
+                return
+            sleep(options['interval'])
+
+    def drain(self, batch_size):
+        """Разбирает очередь пачками, пока в ней есть письма к отправке."""
+        total_sent = total_postponed = 0
+        while True:
+            sent, postponed = deliver_pending(batch_size)
+            total_sent += sent
+            total_postponed += postponed
+            if sent + postponed < batch_size:
+                return total_sent, total_postponed
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from users.codes import sweep_expired
+from users.outbox import sweep_finished
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет пачками истёкшие коды подтверждения и старые '
+        'письма очереди.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Число строк, удаляемых одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        deleted = sweep_expired(options['batch_size'])
+        self.stdout.write(f'Удалено истёкших кодов: {deleted}')
+        deleted = sweep_finished(options['batch_size'])
+        self.stdout.write(f'Удалено старых писем: {deleted}')
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:24
+
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Схема хэширования на момент миграции; users.codes может измениться.
+KEY_SALT = 'users.ConfCode'
+
+
+def hash_codes(apps, schema_editor):
+    ConfCode = apps.get_model('users', 'ConfCode')
+    key = hashlib.sha256((KEY_SALT + settings.SECRET_KEY).encode()).digest()
+    codes = list(ConfCode.objects.all())
+    for conf_code in codes:
+        conf_code.code = hmac.new(
+            key, conf_code.code.encode(), hashlib.sha256
+        ).hexdigest()
+    ConfCode.objects.bulk_update(codes, ['code'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='confcode',
+            name='expires',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.RunPython(hash_codes, migrations.RunPython.noop),
+    ]
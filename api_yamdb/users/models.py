@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 
 from django.db import models
+from django.utils import timezone
 
 USER_ROLE = 'user'
 MODER_ROLE = 'moderator'
@@ -34,4 +35,40 @@ class ConfCode(models.Model):
         related_name='conf_code',
     )
     code = models.CharField(max_length=64)
-    expires = models.DateTimeField()
+    expires = models.DateTimeField(db_index=True)
+
+
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+EMAIL_STATUSES = [
+    (PENDING, 'В очереди'),
+    (SENT, 'Отправлено'),
+    (FAILED, 'Не отправлено'),
+]
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку, её разбирает команда send_outbox."""
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.EmailField()
+    recipient = models.EmailField()
+    status = models.CharField(
+        choices=EMAIL_STATUSES,
+        default=PENDING,
+        max_length=7,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    send_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['send_after', 'id']
+        indexes = [
+            models.Index(
+                fields=['status', 'send_after'], name='email_queue_idx'
+            ),
+        ]
@@ -0,0 +1,138 @@
+import smtplib
+from datetime import timedelta
+from time import perf_counter
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from prometheus_client import Counter, Histogram
+
+from users.codes import CODE_TTL, delete_batches
+from users.models import FAILED, PENDING, SENT, OutgoingEmail
+
+# На это время забранные письма скрыты от других обработчиков очереди.
+LEASE = timedelta(minutes=5)
+
+SEND_ERRORS = (smtplib.SMTPException, OSError)
+
+EMAILS = Counter(
+    'yamdb_emails_total',
+    'Письма очереди: отправленные, отложенные и брошенные.',
+    ('result',),
+)
+SEND_SECONDS = Histogram(
+    'yamdb_email_send_duration_seconds',
+    'Время отправки одного письма по SMTP.',
+)
+DELIVERY_SECONDS = Histogram(
+    'yamdb_email_delivery_delay_seconds',
+    'Время от регистрации до отправки письма.',
+    buckets=(1, 2.5, 5, 10, 30, 60, 120, 300, 900, 3600),
+)
+
+
+def enqueue(subject, message, recipient):
+    """Ставит письмо в очередь вместо отправки во время запроса."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient=recipient,
+    )
+
+
+def claim_batch(batch_size, now):
+    """Забирает пачку писем, которым пора уйти, и откладывает их на LEASE.
+
+    Строки блокируются с SKIP LOCKED, так что несколько обработчиков
+    разбирают очередь, не отправляя одно письмо дважды.
+    """
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=PENDING, send_after__lte=now)[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(send_after=now + LEASE)
+    return emails
+
+
+def postpone(email, error, now):
+    """Откладывает письмо с удвоением задержки или бросает его."""
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = FAILED
+        email.message = ''
+        EMAILS.labels('failed').inc()
+    else:
+        EMAILS.labels('postponed').inc()
+        email.send_after = now + timedelta(
+            seconds=settings.EMAIL_OUTBOX_RETRY_DELAY
+            * 2 ** (email.attempts - 1)
+        )
+    email.save(update_fields=('attempts', 'last_error', 'status',
+                              'send_after', 'message'))
+
+
+def deliver_pending(batch_size=None):
+    """Отправляет пачку писем из очереди через одно SMTP-соединение.
+
+    Текст отправленного письма стирается: в нём код подтверждения.
+    Возвращает число отправленных и отложенных писем.
+    """
+    now = timezone.now()
+    emails = claim_batch(
+        batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE, now
+    )
+    if not emails:
+        return 0, 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except SEND_ERRORS as error:
+        for email in emails:
+            postpone(email, error, now)
+        return 0, len(emails)
+    sent = []
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.message,
+                from_email=email.from_email,
+                to=[email.recipient],
+                connection=connection,
+            )
+            started = perf_counter()
+            try:
+                message.send()
+            except SEND_ERRORS as error:
+                postpone(email, error, now)
+            else:
+                SEND_SECONDS.observe(perf_counter() - started)
+                sent.append(email)
+    finally:
+        connection.close()
+    sent_at = timezone.now()
+    OutgoingEmail.objects.filter(pk__in=[email.pk for email in sent]).update(
+        status=SENT, sent_at=sent_at, last_error='', message=''
+    )
+    for email in sent:
+        EMAILS.labels('sent').inc()
+        DELIVERY_SECONDS.observe((sent_at - email.created_at).total_seconds())
+    return len(sent), len(emails) - len(sent)
+
+
+def sweep_finished(batch_size):
+    """Удаляет отправленные и брошенные письма старше срока кода."""
+    return delete_batches(
+        OutgoingEmail.objects.filter(
+            status__in=(SENT, FAILED),
+            created_at__lte=timezone.now() - CODE_TTL,
+        ),
+        batch_size,
+    )
@@ -1,9 +1,36 @@
 import sys
+from functools import partial
 from os.path import abspath, dirname, join
 
+import pytest
+from django.core.cache import caches
+
+from api.suggest import suggestions
+from api.throttles import reset_counters
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    suggestions.reset()
+    reset_counters()
+
+
+@pytest.fixture
+def commit(django_capture_on_commit_callbacks):
+    """Контекст, на выходе из которого выполняются колбэки on_commit.
+
+    Тест идёт внутри транзакции, которая не фиксируется; записи внутри
+    контекста ведут себя как зафиксированные.
+    """
+    return partial(django_capture_on_commit_callbacks, execute=True)
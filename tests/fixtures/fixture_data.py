@@ -0,0 +1,51 @@
+import pytest
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name='Фильм', slug='films')
+
+
+@pytest.fixture
+def genres():
+    return [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+
+
+@pytest.fixture
+def make_titles(category, genres):
+    def make_titles(count):
+        titles = []
+        for number in range(count):
+            title = Title.objects.create(
+                name=f'Произведение {number}',
+                year=2000 + number % 20,
+                category=category,
+            )
+            title.genre.set(genres)
+            titles.append(title)
+        return titles
+    return make_titles
+
+
+@pytest.fixture
+def title(make_titles):
+    return make_titles(1)[0]
+
+
+@pytest.fixture
+def review(title, user):
+    return Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7
+    )
+
+
+@pytest.fixture
+def comment(review, user):
+    return Comment.objects.create(
+        review=review, author=user, text='Комментарий'
+    )
@@ -0,0 +1,57 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+
+
+def get(url, **headers):
+    with CaptureQueriesContext(connection) as context:
+        response = async_to_sync(AsyncClient().get)(url, headers=headers)
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReads:
+
+    @pytest.fixture(autouse=True)
+    def async_reads(self, settings):
+        settings.MIDDLEWARE = [
+            'api.async_views.CachedReadMiddleware', *settings.MIDDLEWARE
+        ]
+
+    def test_cached_list_is_served_without_queries(self, title):
+        first, _ = get('/api/v1/titles/')
+        second, queries = get('/api/v1/titles/')
+        assert first['X-Cache'] == 'MISS' and second['X-Cache'] == 'HIT'
+        assert queries == 0, (
+            'Проверьте, что ответ из кэша отдаётся без запросов к БД'
+        )
+        assert second.json() == first.json()
+        assert second['ETag'] == first['ETag']
+        assert second['X-Frame-Options'] == first['X-Frame-Options']
+        response, _ = get('/api/v1/titles/', if_none_match=first['ETag'])
+        assert response.status_code == 304
+
+    def test_reviews_and_comments(self, comment):
+        review = comment.review
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        for path in (url, f'{url}{review.id}/', f'{url}{review.id}/comments/'):
+            get(path)
+            response, queries = get(path)
+            assert response.status_code == 200
+            assert response['X-Cache'] == 'HIT' and queries == 0
+
+    def test_authorized_requests_use_drf(self, title, user_client):
+        get('/api/v1/titles/')
+        token = user_client._credentials['HTTP_AUTHORIZATION']
+        response, _ = get('/api/v1/titles/', authorization=token)
+        assert response.status_code == 200
+        assert response.has_header('Allow'), (
+            'Проверьте, что запросы с токеном проходят через DRF'
+        )
+
+    def test_throttle(self, title, settings):
+        settings.THROTTLE_RATES = {'catalog': '2/min'}
+        codes = [get('/api/v1/titles/')[0].status_code for _ in range(3)]
+        assert codes == [200, 200, 429]
@@ -0,0 +1,122 @@
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import user_cache_key
+from api.checks import auth_user_cache
+from api.tokens import RoleAccessToken
+from tests.fixtures.fixture_user import get_client
+from users.models import User
+
+
+@pytest.mark.django_db
+class TestAuthentication:
+
+    @pytest.fixture(autouse=True)
+    def user_cache(self, settings):
+        settings.AUTH_USER_CACHE_TTL = 60
+
+    def user_queries(self, client, url='/api/v1/titles/'):
+        table = User._meta.db_table
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` с токеном возвращает 200'
+        )
+        return len([
+            query for query in context.captured_queries
+            if f'"{table}"' in query['sql']
+        ])
+
+    def test_token_claims(self, admin):
+        token = RoleAccessToken.for_user(admin)
+        assert (
+            token['username'], token['role'], token['is_superuser']
+        ) == (admin.username, 'admin', False), (
+            'Проверьте, что токен содержит имя и роль пользователя'
+        )
+
+    def test_cached_user(self, user_client):
+        assert self.user_queries(user_client) == 1
+        assert self.user_queries(user_client) == 0, (
+            'Проверьте, что повторный запрос берёт пользователя из кэша'
+        )
+
+    def test_cache_has_no_password(self, user_client, user):
+        self.user_queries(user_client)
+        values = caches['auth'].get(user_cache_key(user.id))
+        assert set(values) == {
+            'id', 'username', 'role', 'is_superuser', 'is_active'
+        }, 'Проверьте, что в кэше нет пароля и личных данных пользователя'
+
+    def test_role_change_resets_cache(self, admin_client, user):
+        client = get_client(user)
+        self.user_queries(client)
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        response = client.post(
+            '/api/v1/categories/', data={'name': 'Книги', 'slug': 'books'}
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что смена роли действует без ожидания кэша'
+        )
+
+    def test_deleted_user(self, user):
+        client = get_client(user)
+        self.user_queries(client)
+        user.delete()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+    def test_inactive_user(self, user):
+        client = get_client(user)
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+    def test_claims_only(self, settings, user):
+        settings.AUTH_USER_CACHE_TTL = 0
+        client = get_client(user)
+        assert self.user_queries(client) == 0, (
+            'Проверьте, что без кэша пользователь собирается из токена '
+            'без запроса к БД'
+        )
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email
+
+    def test_claims_only_checks_writes(self, settings, user):
+        settings.AUTH_USER_CACHE_TTL = 0
+        client = get_client(user)
+        user.is_active = False
+        user.save()
+        response = client.patch('/api/v1/users/me/', data={'bio': '-'})
+        assert response.status_code == 401, (
+            'Проверьте, что без кэша запись проверяет блокировку '
+            'пользователя по БД'
+        )
+
+    def test_local_cache_check(self, settings):
+        assert [error.id for error in auth_user_cache(None)] == ['api.E001'], (
+            'Проверьте, что кэш пользователей в памяти процесса '
+            'при AUTH_USER_CACHE_TTL > 0 даёт ошибку проверки'
+        )
+        settings.AUTH_USER_CACHE_TTL = 0
+        assert auth_user_cache(None) == []
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/users/', '/api/v1/export/reviews/'
+    ))
+    def test_claims_only_demoted_admin(self, settings, admin, url):
+        settings.AUTH_USER_CACHE_TTL = 0
+        client = get_client(admin)
+        assert client.get(url).status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert client.get(url).status_code == 403, (
+            'Проверьте, что разжалованный администратор сразу теряет '
+            'доступ к представлениям администратора'
+        )
+        admin.is_active = False
+        admin.save()
+        assert client.get(url).status_code == 401
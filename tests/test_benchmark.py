@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.generator import review_counts
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+
+def test_review_counts():
+    counts = review_counts(1000, 50, 100, 1.0)
+    assert sum(counts) == 1000
+    assert max(counts) == 100, (
+        'Проверьте, что у произведения не больше отзывов, чем авторов'
+    )
+    assert counts == sorted(counts, reverse=True)
+    assert counts[-1] < counts[10] / 2, (
+        'Проверьте, что отзывы распределены неравномерно'
+    )
+    assert review_counts(100, 10, 100, 0) == [10] * 10
+
+
+@pytest.mark.django_db
+class TestBenchmark:
+
+    @pytest.fixture
+    def dataset(self, tmp_path):
+        call_command(
+            'generate_data', titles=30, users=40, reviews=300, comments=200,
+            genres=3, categories=2, data_dir=str(tmp_path / 'data'),
+            stdout=None,
+        )
+
+    def test_generate_data(self, dataset):
+        assert (
+            Title.objects.count(), User.objects.count(),
+            Review.objects.count(), Comment.objects.count(),
+        ) == (30, 40, 300, 200)
+        assert Title.objects.order_by('-rating_count').first().rating_count > (
+            Title.objects.order_by('rating_count').first().rating_count
+        )
+        with pytest.raises(CommandError):
+            call_command('generate_data', titles=1, users=1)
+
+    def test_benchmark(self, dataset, tmp_path):
+        output = tmp_path / 'baseline.json'
+        call_command(
+            'benchmark_api', iterations=2, rounds=1, warmup=0,
+            output=str(output), stdout=None,
+        )
+        report = json.loads(output.read_text())
+        assert {'titles.list', 'reviews.bulk', 'users.me'} <= set(
+            report['scenarios']
+        )
+        assert report['dataset']['title'] == 30
+        assert not User.objects.filter(username__startswith='bench'), (
+            'Проверьте, что изменения данных откатываются после прогона'
+        )
+        report['scenarios']['titles.list']['queries'] -= 1
+        output.write_text(json.dumps(report))
+        with pytest.raises(CommandError, match='titles.list'):
+            call_command(
+                'benchmark_api', iterations=2, rounds=1, only=['titles'],
+                baseline=str(output), tolerance=100, stdout=None,
+            )
@@ -0,0 +1,138 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+from tests.fixtures.fixture_user import get_client
+
+
+@pytest.mark.django_db
+class TestBulk:
+
+    def test_reviews_bulk_for_title(
+        self, admin_client, title, user, another_user
+    ):
+        url = f'/api/v1/titles/{title.id}/reviews/bulk/'
+        response = admin_client.post(url, data=[
+            {'author': user.username, 'text': 'Отзыв', 'score': 8},
+            {'author': another_user.username, 'text': 'Отзыв', 'score': 4},
+            {'author': user.username, 'text': 'Повтор', 'score': 1},
+            {'author': 'nobody', 'text': 'Отзыв', 'score': 5},
+            {'text': 'Отзыв', 'score': 11},
+        ], format='json')
+        assert response.status_code == 200
+        data = response.json()
+        assert [result['status'] for result in data['results']] == [
+            201, 201, 400, 404, 400
+        ], 'Проверьте, что результат возвращается по каждой записи'
+        assert (data['created'], data['failed']) == (2, 3)
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            12, 2, 6
+        ), 'Проверьте, что рейтинг учитывает отзывы из пачки'
+
+    def test_reviews_bulk_query_count_is_constant(
+        self, admin_client, title, django_user_model
+    ):
+        url = f'/api/v1/titles/{title.id}/reviews/bulk/'
+
+        def post(first, count):
+            items = [
+                {'author': f'bulk{number}', 'text': 'Отзыв', 'score': 5}
+                for number in range(first, first + count)
+            ]
+            for item in items:
+                django_user_model.objects.create(
+                    username=item['author'], email=f'{item["author"]}@a.b'
+                )
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(url, data=items, format='json')
+            assert response.json()['created'] == count
+            return len(context.captured_queries)
+
+        post(0, 1)
+        assert post(1, 2) == post(3, 10), (
+            'Проверьте, что число запросов не зависит от размера пачки'
+        )
+
+    def test_reviews_bulk_ndjson(self, user_client, title):
+        body = '\n'.join([
+            json.dumps({'text': 'Отзыв', 'score': 9}),
+            '',
+            json.dumps({'text': 'Ещё один', 'score': 3}),
+        ])
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/bulk/',
+            data=body,
+            content_type='application/x-ndjson',
+        )
+        assert response.status_code == 200
+        assert [r['status'] for r in response.json()['results']] == [
+            201, 400
+        ], 'Проверьте, что повтор внутри пачки отклоняется'
+
+    def test_user_cannot_set_author(self, user_client, title, another_user):
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/bulk/',
+            data=[{'author': another_user.username, 'text': '-', 'score': 5}],
+            format='json',
+        )
+        assert response.json()['results'][0]['status'] == 403
+        assert not Review.objects.exists()
+
+    def test_cross_title_bulk(self, admin_client, user_client, make_titles):
+        first, second = make_titles(2)
+        items = [
+            {'title': first.id, 'text': 'Отзыв', 'score': 2},
+            {'title': second.id, 'text': 'Отзыв', 'score': 10},
+            {'title': 999, 'text': 'Отзыв', 'score': 5},
+            {'text': 'Отзыв', 'score': 5},
+        ]
+        url = '/api/v1/reviews/bulk/'
+        assert user_client.post(
+            url, data=items, format='json'
+        ).status_code == 403, (
+            'Проверьте, что загрузка по всем произведениям доступна '
+            'только администратору'
+        )
+        response = admin_client.post(url, data=items, format='json')
+        assert [r['status'] for r in response.json()['results']] == [
+            201, 201, 404, 400
+        ]
+        assert dict(Title.objects.values_list('id', 'rating')) == {
+            first.id: 2, second.id: 10
+        }
+
+    def test_comments_bulk(self, user_client, review):
+        response = user_client.post(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+            '/comments/bulk/',
+            data=[{'text': 'Первый'}, {'text': 'Второй'}, {'text': ''}],
+            format='json',
+        )
+        assert [r['status'] for r in response.json()['results']] == [
+            201, 201, 400
+        ]
+        assert Comment.objects.filter(review=review).count() == 2
+
+    def test_batch_limit(self, settings, admin_client, title):
+        settings.BULK_MAX_ITEMS = 2
+        response = admin_client.post(
+            f'/api/v1/titles/{title.id}/reviews/bulk/',
+            data=[{'text': '-', 'score': 5}] * 3,
+            format='json',
+        )
+        assert response.status_code == 400
+
+    def test_bulk_resets_title_cache(self, api_client, user, title, commit):
+        url = f'/api/v1/titles/{title.id}/'
+        api_client.get(url)
+        with commit():
+            get_client(user).post(
+                f'/api/v1/titles/{title.id}/reviews/bulk/',
+                data=[{'text': 'Отзыв', 'score': 7}],
+                format='json',
+            )
+        assert api_client.get(url).json()['rating'] == 7
@@ -0,0 +1,93 @@
+import re
+from importlib import import_module
+from datetime import timedelta
+
+import pytest
+from django.apps import apps as django_apps
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from users.codes import hash_code, issue_code
+from users.models import ConfCode
+
+
+@pytest.mark.django_db
+class TestConfirmationCodes:
+
+    def signup(self, client, username='newbie', email='newbie@yamdb.fake'):
+        return client.post(
+            '/api/v1/auth/signup/',
+            data={'username': username, 'email': email},
+        )
+
+    def token(self, client, username, code):
+        return client.post(
+            '/api/v1/auth/token/',
+            data={'username': username, 'confirmation_code': code},
+        )
+
+    def test_signup_and_token(self, api_client):
+        assert self.signup(api_client).status_code == 200
+        call_command('send_outbox')
+        code = re.search(r'Confirmation code: (\S+)', mail.outbox[0].body)[1]
+        stored = ConfCode.objects.get()
+        assert stored.code != code and stored.code == hash_code(code), (
+            'Проверьте, что в БД хранится хэш кода, а не сам код'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = self.token(api_client, 'newbie', code)
+        assert response.status_code == 200 and 'token' in response.json()
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что пользователь и код читаются одним запросом'
+        )
+
+    def test_wrong_and_expired_code(self, api_client, user):
+        code = issue_code(user)
+        assert self.token(api_client, user.username, 'wrong').status_code == (
+            400
+        )
+        ConfCode.objects.update(expires=timezone.now() - timedelta(minutes=1))
+        assert self.token(api_client, user.username, code).status_code == 400
+        assert self.token(api_client, 'nobody', code).status_code == 404
+
+    def test_sweep(self, user, another_user, admin):
+        for owner in (user, another_user, admin):
+            issue_code(owner)
+        ConfCode.objects.exclude(user=admin).update(
+            expires=timezone.now() - timedelta(days=1)
+        )
+        call_command('sweep_codes', '--batch-size', '1')
+        assert list(ConfCode.objects.values_list('user', flat=True)) == [
+            admin.pk
+        ]
+
+    def test_migration_hashes_like_codes(self, user):
+        ConfCode.objects.create(
+            user=user, code='plain', expires=timezone.now()
+        )
+        migration = import_module(
+            'users.migrations.0003_confcode_expires_index'
+        )
+        migration.hash_codes(django_apps, None)
+        assert ConfCode.objects.get().code == hash_code('plain'), (
+            'Проверьте, что миграция хэширует коды так же, как users.codes'
+        )
+
+    def test_signup_throttle(self, api_client, settings):
+        settings.THROTTLE_RATES = {'signup': '2/hour', 'auth': '4/hour'}
+        for _ in range(2):
+            assert self.signup(api_client).status_code == 200
+        assert self.signup(api_client).status_code == 429, (
+            'Проверьте, что повторные регистрации одного пользователя '
+            'ограничены'
+        )
+        other = self.signup(api_client, 'other', 'other@yamdb.fake')
+        assert other.status_code == 200
+        third = self.signup(api_client, 'third', 'third@yamdb.fake')
+        assert third.status_code == 429, (
+            'Проверьте, что регистрации с одного IP ограничены'
+        )
+        assert ConfCode.objects.count() == 2
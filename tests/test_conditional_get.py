@@ -0,0 +1,113 @@
+import pytest
+
+from reviews.models import Comment, Review
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def assert_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200 and response.has_header('ETag'), (
+            f'Проверьте, что ответ на `{url}` содержит заголовок ETag'
+        )
+        repeated = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert repeated.status_code == 304, (
+            f'Проверьте, что `{url}` с совпадающим If-None-Match '
+            'возвращает 304'
+        )
+        assert repeated['ETag'] == response['ETag']
+        return response['ETag']
+
+    def test_titles(self, api_client, make_titles, commit):
+        title, _ = make_titles(2)
+        for url in ('/api/v1/titles/', f'/api/v1/titles/{title.id}/'):
+            etag = self.assert_not_modified(api_client, url)
+            title.name = f'{title.name}!'
+            with commit():
+                title.save()
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                'Проверьте, что ETag меняется при изменении произведения'
+            )
+
+    def test_titles_last_modified(self, api_client, title):
+        response = api_client.get(f'/api/v1/titles/{title.id}/')
+        repeated = api_client.get(
+            f'/api/v1/titles/{title.id}/',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        assert repeated.status_code == 304, (
+            'Проверьте поддержку If-Modified-Since для произведений'
+        )
+
+    def test_titles_list_changes_with_category(
+        self, api_client, title, commit
+    ):
+        url = '/api/v1/titles/'
+        response = api_client.get(url)
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что список произведений не отдаёт Last-Modified'
+        )
+        etag = self.assert_not_modified(api_client, url)
+        title.category.name = 'Переименованная категория'
+        with commit():
+            title.category.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что ETag списка меняется при переименовании категории'
+        )
+
+    def test_reviews(self, api_client, review, another_user, commit):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = self.assert_not_modified(api_client, url)
+        with commit():
+            Review.objects.create(
+                title_id=review.title_id, author=another_user,
+                text='-', score=1,
+            )
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+        detail = f'{url}{review.id}/'
+        etag = self.assert_not_modified(api_client, detail)
+        review.text = 'Исправленный отзыв'
+        with commit():
+            review.save()
+        assert api_client.get(
+            detail, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 200, (
+            'Проверьте, что ETag отзыва меняется при его изменении'
+        )
+
+    def test_comments(self, api_client, comment, commit):
+        url = (
+            f'/api/v1/titles/{comment.review.title_id}/reviews/'
+            f'{comment.review_id}/comments/'
+        )
+        etag = self.assert_not_modified(api_client, url)
+        comment.text = 'Исправленный комментарий'
+        with commit():
+            comment.save()
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+        with commit():
+            Comment.objects.all().delete()
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_details_changed_elsewhere(self, api_client, comment, settings):
+        settings.RESPONSE_CACHE_ENABLED = False
+        review = comment.review
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        for model, pk, detail in (
+            (Review, review.id, url),
+            (Comment, comment.id, f'{url}comments/{comment.id}/'),
+        ):
+            etag = self.assert_not_modified(api_client, detail)
+            # update() без сигналов: так выглядит правка в другом процессе,
+            # поколения в кэше этого процесса не меняются.
+            model.objects.filter(pk=pk).update(text='Правка')
+            assert api_client.get(
+                detail, HTTP_IF_NONE_MATCH=etag
+            ).status_code == 200, (
+                'Проверьте, что ETag объекта строится из его полей, '
+                'а не только из поколений кэша'
+            )
@@ -0,0 +1,81 @@
+import importlib
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api_yamdb import settings as project_settings
+
+
+@pytest.fixture
+def load_settings(monkeypatch):
+    def load(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return importlib.reload(project_settings)
+
+    yield load
+    monkeypatch.undo()
+    importlib.reload(project_settings)
+
+
+class TestConnectionSettings:
+
+    def test_persistent_connections(self, load_settings):
+        database = load_settings().DATABASES['default']
+        assert database['CONN_MAX_AGE'] == 60
+        assert database['CONN_HEALTH_CHECKS'] is True
+        assert load_settings(SERVER_MODE='asgi').DATABASES['default'][
+            'CONN_MAX_AGE'
+        ] == 0, 'Проверьте, что под ASGI постоянные соединения выключены'
+
+    def test_pool_modes(self, load_settings):
+        database = load_settings(DB_POOL='builtin').DATABASES['default']
+        assert database['OPTIONS']['pool']['max_size'] == 10
+        assert database['CONN_MAX_AGE'] == 0
+        database = load_settings(DB_POOL='pgbouncer').DATABASES['default']
+        assert database['DISABLE_SERVER_SIDE_CURSORS'] is True
+        assert 'pool' not in database['OPTIONS']
+
+    def test_sqlite_profile(self, load_settings):
+        database = load_settings(
+            DB_ENGINE='django.db.backends.sqlite3', SQLITE_PROFILE='fast'
+        ).DATABASES['default']
+        assert 'journal_mode=WAL' in database['OPTIONS']['init_command']
+
+
+@pytest.mark.django_db
+class TestConnections:
+
+    def export(self, client):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/export/titles/')
+            body = b''.join(response.streaming_content).decode()
+        rows = [json.loads(line) for line in body.split('\n') if line]
+        return rows, len(context.captured_queries)
+
+    def test_export_without_server_side_cursors(
+        self, admin_client, make_titles, genres, settings, monkeypatch
+    ):
+        titles = make_titles(3)
+        titles[1].genre.set(genres[:1])
+        settings.EXPORT_CHUNK_SIZE = 2
+        expected, _ = self.export(admin_client)
+        monkeypatch.setitem(
+            connection.settings_dict, 'DISABLE_SERVER_SIDE_CURSORS', True
+        )
+        rows, queries = self.export(admin_client)
+        assert rows == expected, (
+            'Проверьте, что без серверных курсоров выгрузка читается '
+            'порциями по ключу и не меняется'
+        )
+        assert queries >= 4
+
+    def test_stats(self, admin_client, api_client):
+        assert api_client.get('/api/v1/db/stats/').status_code == 401
+        response = admin_client.get('/api/v1/db/stats/')
+        assert response.status_code == 200
+        stats = response.json()['default']
+        assert stats['vendor'] == 'sqlite'
+        assert stats['open'] >= 1 and stats['server_side_cursors'] is True
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.utils import timezone
+
+from reviews.models import Review, Title
+
+
+def read_body(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_titles_ndjson(self, admin_client, make_titles, genres):
+        first, second = make_titles(2)
+        second.genre.set(genres[:1])
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = [json.loads(line) for line in read_body(response).split('\n')
+                if line]
+        assert [(row['id'], row['genre']) for row in rows] == [
+            (first.id, ['comedy', 'drama']),
+            (second.id, ['drama']),
+        ], 'Проверьте, что каждое произведение выгружается со своими жанрами'
+        assert rows[0]['category'] == 'films'
+
+    def test_titles_filters(self, admin_client, make_titles, genres):
+        old, new = make_titles(2)
+        new.genre.set(genres[1:])
+        Title.objects.filter(pk=old.pk).update(
+            updated_at=timezone.now() - timedelta(days=2)
+        )
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        response = admin_client.get(
+            '/api/v1/export/titles/',
+            {'updated_since': since, 'genre': 'comedy'},
+        )
+        rows = [json.loads(line) for line in read_body(response).split('\n')
+                if line]
+        assert [row['id'] for row in rows] == [new.id], (
+            'Проверьте, что выгрузка поддерживает фильтры FilterTitle '
+            'и `updated_since`'
+        )
+
+    def test_reviews_csv(self, admin_client, review, another_user):
+        Review.objects.create(
+            title=review.title, author=another_user, text='Два', score=3
+        )
+        response = admin_client.get(
+            '/api/v1/export/reviews/', {'fmt': 'csv'}
+        )
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(read_body(response))))
+        assert [(row['author'], row['score']) for row in rows] == [
+            (review.author.username, '7'), (another_user.username, '3')
+        ]
+
+    def test_comments_export(self, admin_client, comment):
+        response = admin_client.get(
+            '/api/v1/export/comments/', {'title': comment.review.title_id}
+        )
+        row = json.loads(read_body(response))
+        assert (row['review'], row['text']) == (
+            comment.review_id, comment.text
+        )
+
+    def test_admin_only(self, user_client):
+        for name in ('titles', 'reviews', 'comments'):
+            response = user_client.get(f'/api/v1/export/{name}/')
+            assert response.status_code == 403, (
+                'Проверьте, что выгрузка доступна только администратору'
+            )
+
+    def test_unknown_format(self, admin_client):
+        response = admin_client.get('/api/v1/export/titles/', {'fmt': 'xml'})
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+def test_asgi_streams_chunks(admin_client, make_titles, settings):
+    settings.EXPORT_CHUNK_SIZE = 2
+    make_titles(5)
+    token = admin_client._credentials['HTTP_AUTHORIZATION']
+
+    async def export():
+        response = await AsyncClient().get(
+            '/api/v1/export/titles/', headers={'authorization': token}
+        )
+        chunks = [chunk async for chunk in response.streaming_content]
+        return response, chunks
+
+    response, chunks = async_to_sync(export)()
+    assert response.is_async, (
+        'Проверьте, что под ASGI выгрузка отдаётся асинхронным итератором '
+        'и не собирается в память целиком'
+    )
+    rows = [json.loads(line) for line in b''.join(chunks).decode().split('\n')
+            if line]
+    assert len(rows) == 5 and len(chunks) == 5
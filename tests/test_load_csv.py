@@ -0,0 +1,156 @@
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+
+from reviews.loader import (SOURCES, dependencies, read_chunks, run_inline,
+                            split_file)
+from reviews.models import Comment, GenreTitle, Review, Title
+from users.models import User
+
+DATA = {
+    'users.csv': (
+        'id,username,email,role,bio,first_name,last_name\n'
+        '100,bingobongo,bingobongo@yamdb.fake,user,,,\n'
+        '101,capt_obvious,capt_obvious@yamdb.fake,admin,,,\n'
+    ),
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n2,Книга,book\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+    'titles.csv': (
+        'id,name,year,category\n'
+        '1,Побег из Шоушенка,1994,1\n'
+        '2,"Крестный отец",1972,\n'
+        '3,Гарри Поттер,2001,2\n'
+    ),
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,2,1\n3,3,2\n',
+    'review.csv': (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,"Отличный, ""классика""",100,10,2019-09-24T21:08:21.567Z\n'
+        '2,1,Неплохо,101,5,2019-09-24T21:08:21.567Z\n'
+        '3,3,Так себе,100,4,2019-09-24T21:08:21.567Z\n'
+    ),
+    'comments.csv': (
+        'id,review_id,text,author,pub_date\n'
+        '1,1,Согласен,101,2019-09-24T21:08:21.567Z\n'
+    ),
+}
+
+
+def write_data(path):
+    for name, content in DATA.items():
+        (path / name).write_text(content, encoding='utf-8')
+
+
+class InlineExecutor:
+    """Пул без процессов: тестовая БД в памяти не видна другим процессам."""
+
+    def __init__(self, workers, initializer=None):
+        pass
+
+    def submit(self, function, argument):
+        return run_inline(function, argument)
+
+    def shutdown(self):
+        pass
+
+
+@pytest.mark.parametrize('shard_size', (1, 40, 10 ** 6))
+def test_split_file_reads_each_row_once(tmp_path, shard_size):
+    write_data(tmp_path)
+    path = tmp_path / 'review.csv'
+    rows = [
+        row['id']
+        for start, stop in split_file(path, shard_size)
+        for chunk in read_chunks(path, {}, 2, start, stop)
+        for row in chunk
+    ]
+    assert rows == ['1', '2', '3'], (
+        'Проверьте, что части файла покрывают все строки по одному разу'
+    )
+
+
+def test_dependencies_follow_foreign_keys():
+    assert dependencies(SOURCES) == {
+        'users.csv': set(),
+        'category.csv': set(),
+        'genre.csv': set(),
+        'titles.csv': {'category.csv'},
+        'genre_title.csv': {'genre.csv', 'titles.csv'},
+        'review.csv': {'titles.csv', 'users.csv'},
+        'comments.csv': {'review.csv', 'users.csv'},
+    }, 'Проверьте, что порядок загрузки строится по внешним ключам моделей'
+
+
+@pytest.mark.django_db
+class TestLoadCsv:
+
+    def test_load_csv(self, tmp_path):
+        write_data(tmp_path)
+
+        call_command('load_csv', data_dir=str(tmp_path), chunk_size=2)
+
+        assert User.objects.count() == 2
+        assert GenreTitle.objects.count() == 3
+        assert Review.objects.count() == 3
+        assert Comment.objects.get().author_id == 101
+        assert Title.objects.get(pk=2).category is None, (
+            'Проверьте, что пустой внешний ключ загружается как NULL'
+        )
+        assert Review.objects.get(pk=1).text == 'Отличный, "классика"'
+        assert {
+            pub_date.isoformat()
+            for pub_date in Review.objects.values_list('pub_date', flat=True)
+        } | {Comment.objects.get().pub_date.isoformat()} == {
+            '2019-09-24T21:08:21.567000+00:00'
+        }, 'Проверьте, что дата публикации берётся из файла'
+        assert Review._meta.get_field('pub_date').auto_now_add
+        assert list(
+            Title.objects.order_by('id').values_list('rating', flat=True)
+        ) == [7, None, 4], (
+            'Проверьте, что после загрузки пересчитывается рейтинг'
+        )
+        title = Title.objects.create(name='Новое', year=2000)
+        assert title.pk == 4, (
+            'Проверьте, что после загрузки сбрасываются счётчики id'
+        )
+
+    def test_workers(self, tmp_path):
+        write_data(tmp_path)
+
+        with mock.patch('reviews.loader.ProcessPoolExecutor', InlineExecutor):
+            call_command(
+                'load_csv', data_dir=str(tmp_path), chunk_size=2,
+                workers=2, shard_size=40,
+            )
+
+        assert User.objects.count() == 2
+        assert Review.objects.count() == 3
+        assert Comment.objects.get().author_id == 101
+        assert Review.objects.get(pk=1).text == 'Отличный, "классика"', (
+            'Проверьте, что части файла читаются с начала строки'
+        )
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        write_data(tmp_path)
+        checkpoints = tmp_path / 'checkpoints'
+        call_command(
+            'load_csv', data_dir=str(tmp_path), chunk_size=2,
+            checkpoint_dir=str(checkpoints),
+        )
+        Comment.objects.all().delete()
+        (checkpoints / 'comments.csv.0-end').unlink()
+        (checkpoints / 'review.csv.0-end').write_text('1')
+
+        call_command(
+            'load_csv', data_dir=str(tmp_path), chunk_size=2,
+            checkpoint_dir=str(checkpoints),
+        )
+
+        assert Review.objects.count() == 3, (
+            'Проверьте, что возобновлённая загрузка пропускает уже '
+            'сохранённые строки'
+        )
+        assert Comment.objects.count() == 1, (
+            'Проверьте, что незавершённые файлы загружаются заново'
+        )
+        assert (checkpoints / 'review.csv.0-end').read_text() == '3'
@@ -0,0 +1,118 @@
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test.testcases import LiveServerThread, _StaticFilesHandler
+
+from api.loadtest import Client, Traffic, parse_mix
+from users.models import User
+
+
+def test_parse_mix():
+    assert parse_mix('browse=3, signup') == {'browse': 3, 'signup': 1}
+    with pytest.raises(ValueError):
+        parse_mix('unknown=1')
+
+
+class ClosingHandler(BaseHTTPRequestHandler):
+    """Отвечает без `Connection: close` и закрывает соединение."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def respond(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+        self.close_connection = True
+
+    do_GET = do_POST = respond  # noqa: N815
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def closing_server():
+    server = HTTPServer(('localhost', 0), ClosingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://localhost:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_retry_on_closed_connection(closing_server):
+    client = Client(closing_server)
+    assert client.request('GET', '/')[0] == 200
+    assert client.request('GET', '/')[0] == 200, (
+        'Проверьте, что GET повторяется на новом соединении, '
+        'если сервер закрыл прежнее'
+    )
+    assert client.request('POST', '/', data={})[0] is None, (
+        'Проверьте, что неидемпотентный запрос не повторяется'
+    )
+    assert client.request('POST', '/', data={})[0] == 200
+
+
+@pytest.fixture
+def server(transactional_db, settings):
+    """Сервер в потоке с общим соединением к базе в памяти."""
+    settings.THROTTLE_RATES = {}
+    settings.ALLOWED_HOSTS = ['localhost']
+    shared = {}
+    for connection in connections.all():
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            connection.inc_thread_sharing()
+            shared[connection.alias] = connection
+    thread = LiveServerThread(
+        'localhost', _StaticFilesHandler, connections_override=shared
+    )
+    thread.daemon = True
+    thread.start()
+    thread.is_ready.wait()
+    if thread.error:
+        raise thread.error
+    yield f'http://localhost:{thread.port}'
+    thread.terminate()
+    for connection in shared.values():
+        connection.dec_thread_sharing()
+
+
+def test_load_test(server, tmp_path, review, comment):
+    output = tmp_path / 'load.json'
+    call_command(
+        'load_test', url=server, duration=0.5, concurrency=[2], users=2,
+        mix='browse,title,reviews,comments,review_post,review_patch',
+        output=str(output), stdout=None,
+    )
+    call_command(
+        'load_test', url=server, duration=0.5, concurrency=[2], rate=[20],
+        mix='browse,review_post', users=2, stdout=None,
+    )
+    closed, = json.loads(output.read_text())
+    assert closed['requests'] > 0 and closed['error_rate'] == 0, (
+        f'Проверьте, что смесь действий проходит без ошибок: {closed}'
+    )
+    assert {'browse', 'reviews', 'title', 'comments'} <= set(
+        closed['actions']
+    )
+    assert not User.objects.filter(username__startswith='load'), (
+        'Проверьте, что пользователи нагрузки удаляются после прогона'
+    )
+
+
+def test_signup_flow(server, review):
+    traffic = Traffic(Client(server), {'signup': 1}, users=1)
+    samples = []
+    traffic.signup(random.Random(1), samples)
+    traffic.cleanup()
+    assert [(sample.name, sample.ok) for sample in samples] == [
+        ('signup', True), ('token', True)
+    ], 'Проверьте, что код из письма обменивается на токен'
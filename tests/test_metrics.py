@@ -0,0 +1,95 @@
+import pytest
+from django.core.management import call_command
+from prometheus_client import REGISTRY
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_requests(self, api_client, make_titles):
+        make_titles(3)
+        labels = {
+            'route': 'TitleViewSet.list', 'method': 'GET', 'status': '200'
+        }
+        before = sample('yamdb_http_requests_total', **labels)
+        queries = sample(
+            'yamdb_db_query_duration_seconds_count', route='TitleViewSet.list'
+        )
+        pages = sample(
+            'yamdb_pagination_page_count', route='TitleViewSet.list'
+        )
+        api_client.get('/api/v1/titles/?page=1')
+        assert sample('yamdb_http_requests_total', **labels) == before + 1, (
+            'Проверьте, что запросы считаются по представлению и статусу'
+        )
+        assert sample(
+            'yamdb_db_query_duration_seconds_count', route='TitleViewSet.list'
+        ) > queries, 'Проверьте, что запросы к БД относятся к представлению'
+        assert sample(
+            'yamdb_pagination_page_count', route='TitleViewSet.list'
+        ) == pages + 1
+        response = api_client.get('/metrics')
+        assert response.status_code == 200
+        assert 'yamdb_http_request_duration_seconds_bucket' in (
+            response.content.decode()
+        )
+
+    def test_token(self, api_client, settings):
+        settings.METRICS_TOKEN = 'secret'
+        assert api_client.get('/metrics').status_code == 401
+        response = api_client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer secret'
+        )
+        assert response.status_code == 200
+
+    def test_unknown_methods(self, api_client):
+        before = sample(
+            'yamdb_http_requests_total',
+            route='TitleViewSet.other', method='other', status='401',
+        )
+        api_client.generic('BREW', '/api/v1/titles/')
+        assert sample(
+            'yamdb_http_requests_total',
+            route='TitleViewSet.other', method='other', status='401',
+        ) == before + 1, (
+            'Проверьте, что нестандартные методы попадают в метку `other`'
+        )
+
+    def test_auth_failures(self, api_client, user):
+        before = {
+            reason: sample('yamdb_auth_failures_total', reason=reason)
+            for reason in ('missing_fields', 'unknown_user', 'invalid_code')
+        }
+        url = '/api/v1/auth/token/'
+        api_client.post(url, data={'username': user.username})
+        api_client.post(
+            url, data={'username': 'nobody', 'confirmation_code': '1'}
+        )
+        api_client.post(
+            url, data={'username': user.username, 'confirmation_code': '1'}
+        )
+        for reason, count in before.items():
+            assert sample(
+                'yamdb_auth_failures_total', reason=reason
+            ) == count + 1, f'Проверьте, что считаются отказы `{reason}`'
+
+    def test_signups_and_emails(self, api_client):
+        new = sample('yamdb_signups_total', kind='new')
+        repeat = sample('yamdb_signups_total', kind='repeat')
+        sent = sample('yamdb_emails_total', result='sent')
+        data = {'username': 'newbie', 'email': 'newbie@yamdb.fake'}
+        api_client.post('/api/v1/auth/signup/', data=data)
+        api_client.post('/api/v1/auth/signup/', data=data)
+        assert (
+            sample('yamdb_signups_total', kind='new'),
+            sample('yamdb_signups_total', kind='repeat'),
+        ) == (new + 1, repeat + 1)
+        call_command('send_outbox')
+        assert sample('yamdb_emails_total', result='sent') == sent + 2, (
+            'Проверьте, что отправленные письма попадают в метрики'
+        )
+        assert sample('yamdb_email_delivery_delay_seconds_count') >= 2
@@ -0,0 +1,103 @@
+import smtplib
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import FAILED, PENDING, SENT, OutgoingEmail
+from users.outbox import deliver_pending, enqueue
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise smtplib.SMTPServerDisconnected('Соединение разорвано')
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_signup_enqueues(self, api_client):
+        response = api_client.post(
+            '/api/v1/auth/signup/',
+            data={'username': 'newbie', 'email': 'newbie@yamdb.fake'},
+        )
+        assert response.status_code == 200
+        assert mail.outbox == [], (
+            'Проверьте, что регистрация не отправляет письмо во время запроса'
+        )
+        email = OutgoingEmail.objects.get()
+        assert (email.recipient, email.status) == (
+            'newbie@yamdb.fake', PENDING
+        )
+        call_command('send_outbox')
+        assert [message.to for message in mail.outbox] == [
+            ['newbie@yamdb.fake']
+        ]
+        assert 'Confirmation code' in mail.outbox[0].body
+        email.refresh_from_db()
+        assert email.status == SENT and email.sent_at is not None
+        code = mail.outbox[0].body.rsplit(' ', 1)[-1]
+        assert not OutgoingEmail.objects.filter(
+            message__contains=code
+        ).exists(), 'Проверьте, что после отправки код не остаётся в БД'
+
+    def test_sweep_finished(self):
+        old = timezone.now() - timedelta(days=2)
+        emails = {
+            (status, created_at): enqueue('Тема', '', 'user@yamdb.fake')
+            for status in (PENDING, SENT, FAILED)
+            for created_at in (old, timezone.now())
+        }
+        for (status, created_at), email in emails.items():
+            OutgoingEmail.objects.filter(pk=email.pk).update(
+                status=status, created_at=created_at
+            )
+        call_command('sweep_codes', '--batch-size', '1')
+        assert set(OutgoingEmail.objects.values_list('pk', flat=True)) == {
+            email.pk for (status, created_at), email in emails.items()
+            if status == PENDING or created_at != old
+        }, 'Проверьте, что sweep_codes удаляет старые отправленные письма'
+
+    def test_batch_reuses_connection(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.CountingBackend'
+        CountingBackend.opened = 0
+        for number in range(5):
+            enqueue('Тема', 'Текст', f'user{number}@yamdb.fake')
+        assert deliver_pending(batch_size=3) == (3, 0)
+        assert deliver_pending(batch_size=3) == (2, 0)
+        assert deliver_pending(batch_size=3) == (0, 0)
+        assert len(mail.outbox) == 5
+        assert CountingBackend.opened == 2, (
+            'Проверьте, что пачка отправляется через одно соединение'
+        )
+
+    def test_retry_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FailingBackend'
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 60
+        email = enqueue('Тема', 'Текст', 'user@yamdb.fake')
+        assert deliver_pending() == (0, 1)
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (PENDING, 1)
+        assert email.send_after > timezone.now()
+        assert 'Соединение разорвано' in email.last_error
+        assert deliver_pending() == (0, 0), (
+            'Проверьте, что отложенное письмо не отправляется до срока'
+        )
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        deliver_pending()
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (FAILED, 2)
+        assert email.message == ''
@@ -0,0 +1,111 @@
+import json
+from base64 import urlsafe_b64encode
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+
+def collect(client, url):
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+        )
+        data = response.json()
+        ids.extend(item['id'] for item in data['results'])
+        url = data['next']
+    return ids, data
+
+
+@pytest.mark.django_db
+class TestPagination:
+
+    def test_titles_cursor_walks_all_pages(self, api_client, make_titles):
+        make_titles(25)
+        ids, last_page = collect(api_client, '/api/v1/titles/?pagination=cursor')
+        expected = list(
+            Title.objects.order_by('-year', 'id').values_list('id', flat=True)
+        )
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация выдаёт все произведения '
+            'по одному разу в порядке (-year, id)'
+        )
+        assert 'count' not in last_page, (
+            'Проверьте, что в курсорном режиме записи не подсчитываются'
+        )
+        previous = api_client.get(last_page['previous']).json()
+        assert [item['id'] for item in previous['results']] == expected[
+            10:20
+        ], 'Проверьте ссылку `previous` в курсорном режиме'
+
+    def test_reviews_cursor(self, api_client, title, django_user_model):
+        for number in range(12):
+            author = django_user_model.objects.create(
+                username=f'user{number}', email=f'user{number}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text='-', score=5
+            )
+        url = f'/api/v1/titles/{title.id}/reviews/?pagination=cursor'
+        ids, _ = collect(api_client, url)
+        assert ids == list(
+            title.reviews.order_by('pub_date', 'id')
+            .values_list('id', flat=True)
+        ), 'Проверьте курсорную пагинацию отзывов'
+
+    @pytest.mark.parametrize('kind, position', (
+        ('titles', ['abc', 1]),
+        ('titles', [{'a': 1}, 1]),
+        ('titles', [None, 1]),
+        ('reviews', ['garbage', 1]),
+        ('reviews', ['2020-01-01T00:00:00Z', 'x']),
+    ))
+    def test_invalid_cursor_values(self, api_client, title, kind, position):
+        url = '/api/v1/titles/'
+        if kind == 'reviews':
+            url = f'{url}{title.id}/reviews/'
+        cursor = urlsafe_b64encode(json.dumps({'p': position}).encode())
+        response = api_client.get(url, {'cursor': cursor.decode()})
+        assert response.status_code == 404, (
+            'Проверьте, что курсор с неверными значениями возвращает 404'
+        )
+
+    @pytest.mark.parametrize('query', ('ordering=name', 'q=Произведение'))
+    def test_cursor_rejects_own_ordering(self, api_client, title, query):
+        response = api_client.get(f'/api/v1/titles/?pagination=cursor&{query}')
+        assert response.status_code == 400, (
+            'Проверьте, что курсорный режим не сочетается с `ordering` и `q`'
+        )
+
+    def test_page_number_without_count(self, api_client, make_titles):
+        make_titles(15)
+        with CaptureQueriesContext(connection) as context:
+            data = api_client.get('/api/v1/titles/?count=false').json()
+        assert 'count' not in data and data['next'], (
+            'Проверьте, что `count=false` отключает подсчёт записей'
+        )
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что при `count=false` не выполняется COUNT'
+        data = api_client.get(data['next']).json()
+        assert len(data['results']) == 5 and data['next'] is None
+
+    def test_cursor_without_count(self, api_client, make_titles):
+        make_titles(15)
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get('/api/v1/titles/?pagination=cursor')
+        assert response.status_code == 200
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что в курсорном режиме не выполняется COUNT'
+
+    def test_page_number_is_default(self, api_client, make_titles):
+        make_titles(11)
+        data = api_client.get('/api/v1/titles/?page=2').json()
+        assert data['count'] == 11 and len(data['results']) == 1, (
+            'Проверьте, что нумерованная пагинация работает по умолчанию'
+        )
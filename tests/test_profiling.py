@@ -0,0 +1,69 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.profiling import Profile, current, install, recorder, sql_shape
+from api.serializers import FlatTitleSerializer
+from reviews.models import Title
+
+
+def test_sql_shape():
+    assert sql_shape(
+        'SELECT "id" FROM "t"  WHERE "id" IN (%s, %s, %s) LIMIT 21'
+    ) == 'SELECT "id" FROM "t" WHERE "id" IN (...) LIMIT ?'
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    @pytest.fixture(autouse=True)
+    def profiling(self, settings, tmp_path):
+        settings.MIDDLEWARE = [
+            'api.profiling.ProfilingMiddleware', *settings.MIDDLEWARE
+        ]
+        settings.PROFILING_DIR = str(tmp_path)
+        recorder.reset()
+        yield
+        recorder.reset()
+
+    def test_server_timing(self, api_client, make_titles):
+        make_titles(3)
+        response = api_client.get('/api/v1/titles/')
+        timing = dict(
+            item.strip().split(';', 1)
+            for item in response['Server-Timing'].split(',')
+        )
+        assert set(timing) == {'db', 'serialize', 'view'}, (
+            'Проверьте, что замеры отдаются в заголовке Server-Timing'
+        )
+        assert 'queries' in timing['db']
+
+    def test_report(self, api_client, title, settings):
+        settings.PROFILING_SERVER_TIMING = False
+        for _ in range(3):
+            response = api_client.get(f'/api/v1/titles/{title.id}/reviews/')
+            assert not response.has_header('Server-Timing')
+        api_client.get('/api/v1/genres/')
+        recorder.flush()
+        output = StringIO()
+        call_command('profile_report', '--sort', 'queries', stdout=output)
+        report = output.getvalue()
+        assert 'ReviewViewSet.list | 3 |' in report, (
+            'Проверьте, что замеры собираются по представлению и действию'
+        )
+        assert 'GenreViewSet.list | 1 |' in report
+        assert 'SELECT' in report
+
+    def test_flat_serializer(self, title):
+        install()
+        row = FlatTitleSerializer.rows(Title.objects.all()).get()
+        profile = Profile()
+        token = current.set(profile)
+        try:
+            FlatTitleSerializer(row).data
+        finally:
+            current.reset(token)
+        assert profile.serialize > 0, (
+            'Проверьте, что время плоских сериализаторов тоже замеряется'
+        )
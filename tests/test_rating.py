@@ -0,0 +1,63 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+
+
+def rating(title):
+    title.refresh_from_db()
+    return title.rating_sum, title.rating_count, title.rating
+
+
+@pytest.mark.django_db
+class TestRating:
+
+    def test_create(self, title, user, another_user):
+        assert rating(title) == (0, 0, None)
+        Review.objects.create(title=title, author=user, text='-', score=9)
+        Review.objects.create(
+            title=title, author=another_user, text='-', score=4
+        )
+        assert rating(title) == (13, 2, 6), (
+            'Проверьте, что новый отзыв прибавляется к рейтингу произведения'
+        )
+
+    def test_score_change(self, review):
+        review.score = 2
+        review.save()
+        assert rating(review.title) == (2, 1, 2), (
+            'Проверьте, что изменение оценки сдвигает рейтинг'
+        )
+        review.text = 'Без новой оценки'
+        review.save()
+        assert rating(review.title) == (2, 1, 2)
+
+    def test_title_change(self, make_titles, user):
+        first, second = make_titles(2)
+        review = Review.objects.create(
+            title=first, author=user, text='-', score=8
+        )
+        review.title = second
+        review.score = 6
+        review.save()
+        assert rating(first) == (0, 0, None), (
+            'Проверьте, что отзыв, перенесённый на другое произведение, '
+            'вычитается из рейтинга прежнего'
+        )
+        assert rating(second) == (6, 1, 6)
+
+    def test_delete(self, review, another_user):
+        Review.objects.create(
+            title=review.title, author=another_user, text='-', score=3
+        )
+        review.delete()
+        assert rating(review.title) == (3, 1, 3)
+        Review.objects.all().delete()
+        assert rating(review.title) == (0, 0, None), (
+            'Проверьте, что без отзывов рейтинг произведения пустой'
+        )
+
+    def test_rebuild_command(self, review):
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        call_command('rebuild_ratings')
+        assert rating(review.title) == (7, 1, 7)
@@ -0,0 +1,102 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.checks import response_cache
+from reviews.models import Genre, Review
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+    )
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_titles_list_is_cached(self, api_client, make_titles):
+        make_titles(3)
+        first, _ = get(api_client, '/api/v1/titles/?year=2001')
+        second, queries = get(api_client, '/api/v1/titles/?year=2001&name=')
+        assert first['X-Cache'] == 'MISS' and second['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный запрос с теми же параметрами '
+            'отдаётся из кэша'
+        )
+        assert queries == 0 and second.json() == first.json()
+
+    def test_review_invalidates_title(self, api_client, title, user, commit):
+        get(api_client, f'/api/v1/titles/{title.id}/')
+        get(api_client, '/api/v1/titles/')
+        with commit():
+            Review.objects.create(title=title, author=user, text='-', score=8)
+        detail, _ = get(api_client, f'/api/v1/titles/{title.id}/')
+        listing, _ = get(api_client, '/api/v1/titles/')
+        assert detail['X-Cache'] == listing['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения'
+        )
+        assert detail.json()['rating'] == 8
+
+    def test_invalidates_after_commit(
+        self, api_client, title, user, django_capture_on_commit_callbacks
+    ):
+        url = f'/api/v1/titles/{title.id}/'
+        get(api_client, url)
+        with django_capture_on_commit_callbacks() as callbacks:
+            Review.objects.create(title=title, author=user, text='-', score=8)
+            response, _ = get(api_client, url)
+            assert response['X-Cache'] == 'HIT', (
+                'Проверьте, что кэш сбрасывается только после фиксации '
+                'транзакции, иначе читатель закэширует незафиксированные '
+                'данные под новым поколением'
+            )
+        for callback in callbacks:
+            callback()
+        response, _ = get(api_client, url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 8
+
+    def test_genre_rename_invalidates_titles(self, api_client, title, commit):
+        get(api_client, '/api/v1/titles/')
+        get(api_client, '/api/v1/genres/')
+        genre = Genre.objects.get(slug='drama')
+        genre.name = 'Трагедия'
+        with commit():
+            genre.save()
+        response, _ = get(api_client, '/api/v1/titles/')
+        assert 'Трагедия' in [
+            item['name'] for item in response.json()['results'][0]['genre']
+        ], 'Проверьте, что изменение жанра сбрасывает кэш произведений'
+        response, _ = get(api_client, '/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS'
+
+    def test_other_title_stays_cached(
+        self, api_client, make_titles, user, commit
+    ):
+        first, second = make_titles(2)
+        get(api_client, f'/api/v1/titles/{first.id}/')
+        with commit():
+            Review.objects.create(
+                title=second, author=user, text='-', score=8
+            )
+        response, _ = get(api_client, f'/api/v1/titles/{first.id}/')
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что отзыв сбрасывает кэш только своего произведения'
+        )
+
+    def test_stats_for_admin_only(self, api_client, admin_client):
+        assert api_client.get('/api/v1/cache/stats/').status_code == 401
+        response = admin_client.get('/api/v1/cache/stats/')
+        assert response.status_code == 200
+        assert set(response.json()) == {'hits', 'misses', 'invalidations'}
+
+    def test_local_cache_check(self, settings):
+        assert [error.id for error in response_cache(None)] == ['api.W001'], (
+            'Проверьте, что включённый кэш ответов в памяти процесса '
+            'даёт предупреждение проверки'
+        )
+        settings.RESPONSE_CACHE_ENABLED = False
+        assert response_cache(None) == []
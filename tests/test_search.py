@@ -0,0 +1,80 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+from reviews.search import SQLITE_REBUILD, install
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+    def search(self, client, query, **params):
+        response = client.get('/api/v1/titles/', {'q': query, **params})
+        assert response.status_code == 200, (
+            'Проверьте, что поиск `?q=` по произведениям возвращает 200'
+        )
+        return [item['id'] for item in response.json()['results']]
+
+    def test_ranked_by_relevance(self, api_client, category):
+        in_description = Title.objects.create(
+            name='Тихий Дон', year=1940, category=category,
+            description='Роман о казаках и войне',
+        )
+        in_name = Title.objects.create(
+            name='Война и мир', year=1869, category=category,
+            description='Роман-эпопея',
+        )
+        Title.objects.create(name='Идиот', year=1869, category=category)
+        assert self.search(api_client, 'войн') == [
+            in_name.id, in_description.id
+        ], (
+            'Проверьте, что совпадение в названии ранжируется выше '
+            'совпадения в описании'
+        )
+
+    def test_index_follows_writes(self, api_client, title, commit):
+        assert self.search(api_client, 'Произведение') == [title.id]
+        title.name = 'Мастер и Маргарита'
+        with commit():
+            title.save()
+        assert self.search(api_client, 'Произведение') == []
+        assert self.search(api_client, 'маргарита') == [title.id]
+        with commit():
+            title.delete()
+        assert self.search(api_client, 'маргарита') == []
+
+    def test_combines_with_filters(self, api_client, make_titles, genres):
+        first, second = make_titles(2)
+        second.genre.set(genres[:1])
+        assert self.search(
+            api_client, 'Произведение', genre='comedy'
+        ) == [first.id]
+
+    def test_query_without_words(self, api_client, title):
+        assert self.search(api_client, '"*()') == []
+
+    def test_reinstall_keeps_index(self, api_client, title):
+        with CaptureQueriesContext(connection) as context:
+            install(connection)
+        assert not any(
+            query['sql'] == SQLITE_REBUILD
+            for query in context.captured_queries
+        ), 'Проверьте, что существующий индекс не строится заново'
+        assert self.search(api_client, 'Произведение') == [title.id]
+
+
+@pytest.mark.django_db
+def test_benchmark_command(title):
+    output = io.StringIO()
+    call_command(
+        'benchmark_search', 'Произведение', '--repeat', '2', stdout=output
+    )
+    lines = output.getvalue().splitlines()
+    assert [line.split(':')[0] for line in lines] == [
+        "'Произведение' fulltext", "'Произведение' icontains"
+    ]
+    assert all(' 1 записей' in line for line in lines)
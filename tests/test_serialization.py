@@ -0,0 +1,94 @@
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from api.serializers import (CommentSerializer, GetTitleSerializer,
+                             ReviewSerializer)
+from reviews.models import Title
+
+PAYLOAD = {
+    'name': 'Фильм\u2028с переводом строки',
+    'date': datetime(2024, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc),
+    'price': Decimal('1.50'),
+    'rating': 7.25,
+    'items': [None, True, 1],
+}
+
+
+@pytest.mark.parametrize('fast', (True, False))
+def test_renderer_matches_drf(fast, monkeypatch):
+    if not fast:
+        monkeypatch.setattr(renderers, 'orjson', None)
+    assert FastJSONRenderer().render(PAYLOAD) == JSONRenderer().render(
+        PAYLOAD
+    ), 'Проверьте, что FastJSONRenderer отдаёт тот же JSON, что и DRF'
+    indented = {'renderer_context': {'indent': 2}}
+    assert FastJSONRenderer().render(PAYLOAD, **indented) == (
+        JSONRenderer().render(PAYLOAD, **indented)
+    )
+
+
+def test_parser_matches_drf():
+    body = json.dumps({'text': 'Отзыв', 'score': 7}).encode()
+    assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+        io.BytesIO(body)
+    )
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(b'{"text": '))
+
+
+@pytest.mark.django_db
+class TestFlatSerializers:
+
+    def test_titles(self, api_client, make_titles, genres):
+        make_titles(3)
+        bare = Title.objects.create(name='Без категории', year=1999)
+        bare.genre.set(genres[:1])
+        Title.objects.create(name='Без жанров', year=1998)
+        queryset = Title.objects.order_by('-year', 'id')
+        expected = json.loads(json.dumps(
+            GetTitleSerializer(queryset, many=True).data
+        ))
+        response = api_client.get('/api/v1/titles/?ordering=-year')
+        assert response.json()['results'] == expected, (
+            'Проверьте, что список произведений совпадает с выводом '
+            'GetTitleSerializer'
+        )
+        response = api_client.get(f'/api/v1/titles/{bare.id}/')
+        assert response.json() == expected[-2]
+        assert api_client.get('/api/v1/titles/0/').status_code == 404
+
+    def test_reviews_and_comments(self, api_client, comment):
+        review = comment.review
+        reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        for url, expected in (
+            (reviews_url, ReviewSerializer(review).data),
+            (comments_url, CommentSerializer(comment).data),
+        ):
+            expected = json.loads(json.dumps(expected))
+            assert api_client.get(url).json()['results'] == [expected], (
+                f'Проверьте, что `{url}` совпадает с выводом '
+                'обычного сериализатора'
+            )
+            response = api_client.get(f'{url}{expected["id"]}/')
+            assert response.json() == expected
+        response = api_client.get(f'{reviews_url}?pagination=cursor')
+        assert response.json()['results'][0]['id'] == review.id
+
+    def test_benchmark(self, comment, capsys):
+        call_command('benchmark_serialization', size=5, repeat=1)
+        lines = capsys.readouterr().out.splitlines()
+        assert [line.split(' | ')[:2] for line in lines[1:]] == [
+            ['titles', '1'], ['reviews', '1'], ['comments', '1']
+        ]
@@ -9,3 +9,6 @@ class TestSettings:
         assert settings.DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql', (
             'Проверьте, что используете базу данных postgresql'
         )
+        assert not isinstance(settings.SECRET_KEY, tuple), (
+            'Проверьте, что SECRET_KEY в настройках — строка, а не кортеж'
+        )
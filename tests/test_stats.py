@@ -0,0 +1,164 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import (Category, CategoryReviewMonth, CategoryStat,
+                            Genre, GenreReviewMonth, GenreStat, GenreTitle,
+                            Review)
+from reviews.stats import refresh_stats
+
+
+def current_month():
+    return timezone.localdate().strftime('%Y-%m')
+
+
+def snapshot():
+    return [
+        sorted(model.objects.values_list(*fields))
+        for model, fields in (
+            (GenreStat, ('genre_id', 'titles', 'reviews', 'score_sum')),
+            (CategoryStat, ('category_id', 'titles', 'reviews', 'score_sum')),
+        )
+    ] + [
+        sorted(
+            model.objects.filter(reviews__gt=0)
+            .values_list(field, 'month', 'reviews')
+        )
+        for model, field in (
+            (GenreReviewMonth, 'genre_id'),
+            (CategoryReviewMonth, 'category_id'),
+        )
+    ]
+
+
+@pytest.mark.django_db
+class TestStats:
+
+    def stats(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает 200'
+        )
+        return response.json()
+
+    def summary(self, data):
+        return data['titles'], data['reviews'], data['average_score']
+
+    def test_follow_reviews(self, api_client, make_titles, user,
+                            another_user):
+        first, second = make_titles(2)
+        Review.objects.create(title=first, author=user, text='-', score=8)
+        review = Review.objects.create(
+            title=second, author=another_user, text='-', score=3
+        )
+        data = self.stats(api_client, '/api/v1/genres/drama/stats/')
+        assert self.summary(data) == (2, 2, 5.5), (
+            'Проверьте, что статистика жанра учитывает отзывы на его '
+            'произведения'
+        )
+        assert data['months'] == [
+            {'month': current_month(), 'reviews': 2}
+        ]
+        review.score = 9
+        review.save()
+        review.delete()
+        data = self.stats(api_client, '/api/v1/categories/films/stats/')
+        assert self.summary(data) == (2, 1, 8.0)
+        assert data['months'] == [
+            {'month': current_month(), 'reviews': 1}
+        ]
+
+    def test_follow_titles(self, api_client, admin_client, make_titles,
+                           genres, user):
+        first, second = make_titles(2)
+        Review.objects.create(title=first, author=user, text='-', score=6)
+        Category.objects.create(name='Книги', slug='books')
+        admin_client.patch(
+            f'/api/v1/titles/{first.id}/', data={'category': 'books'}
+        )
+        second.genre.remove(genres[0])
+        data = self.stats(api_client, '/api/v1/categories/books/stats/')
+        assert self.summary(data) == (1, 1, 6.0), (
+            'Проверьте, что смена категории переносит произведение '
+            'в статистику новой категории'
+        )
+        data = self.stats(api_client, '/api/v1/genres/drama/stats/')
+        assert self.summary(data) == (1, 1, 6.0)
+        first.delete()
+        data = self.stats(api_client, '/api/v1/categories/books/stats/')
+        assert self.summary(data) == (0, 0, None)
+        assert data['months'] == []
+
+    def test_title_changes_are_incremental(self, make_titles, genres, user,
+                                           another_user):
+        first, second, third = make_titles(3)
+        for title, author, score in (
+            (first, user, 6), (first, another_user, 9), (second, user, 3),
+        ):
+            Review.objects.create(
+                title=title, author=author, text='-', score=score
+            )
+        books = Category.objects.create(name='Книги', slug='books')
+        western = Genre.objects.create(name='Вестерн', slug='western')
+        first.refresh_from_db()
+        with CaptureQueriesContext(connection) as context:
+            first.category = books
+            first.save()
+            first.genre.remove(genres[0], western)
+            second.genre.clear()
+            western.titles.add(first, second)
+            GenreTitle.objects.create(title=third, genre=western)
+            genres[1].titles.remove(first, second)
+        third.delete()
+        assert not any(
+            'FROM "reviews_review"' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что правка произведений сдвигает сводки групп '
+            'без пересчёта отзывов'
+        )
+        incremental = snapshot()
+        refresh_stats()
+        assert incremental == snapshot(), (
+            'Проверьте, что сводки после точечных сдвигов совпадают '
+            'с полным пересчётом'
+        )
+        genres[0].titles.clear()
+        incremental = snapshot()
+        refresh_stats()
+        assert incremental == snapshot()
+
+    def test_bulk_reviews(self, admin_client, title, user, another_user):
+        admin_client.post(
+            f'/api/v1/titles/{title.id}/reviews/bulk/',
+            data=[
+                {'author': user.username, 'text': '-', 'score': 10},
+                {'author': another_user.username, 'text': '-', 'score': 5},
+            ],
+            format='json',
+        )
+        data = self.stats(admin_client, '/api/v1/genres/comedy/stats/')
+        assert self.summary(data) == (1, 2, 7.5)
+        assert data['months'] == [
+            {'month': current_month(), 'reviews': 2}
+        ]
+
+    def test_read_is_constant(self, api_client, review):
+        with CaptureQueriesContext(connection) as context:
+            self.stats(api_client, '/api/v1/genres/drama/stats/')
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что статистика читается из сводных таблиц: '
+            'группа со сводкой и помесячные отзывы'
+        )
+
+    def test_refresh_command(self, api_client, review):
+        GenreStat.objects.update(titles=0, reviews=0, score_sum=0)
+        call_command('refresh_stats')
+        data = self.stats(api_client, '/api/v1/genres/drama/stats/')
+        assert self.summary(data) == (1, 1, 7.0)
+
+    def test_unknown_group(self, api_client):
+        response = api_client.get('/api/v1/genres/unknown/stats/')
+        assert response.status_code == 404
@@ -0,0 +1,98 @@
+from unittest import mock
+
+import pytest
+from django.db import DatabaseError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from api.suggest import make_item, suggestions
+from reviews.models import Genre, Title
+
+
+@pytest.mark.django_db
+class TestSuggest:
+    url = '/api/v1/suggest/'
+
+    def names(self, client, query, **params):
+        response = client.get(self.url, {'q': query, **params})
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{self.url}` возвращает 200'
+        )
+        return [item['name'] for item in response.json()['results']]
+
+    def test_prefix_and_word_matches(self, api_client, category, genres):
+        Title.objects.create(name='Война и мир', year=1869, category=category)
+        Title.objects.create(name='Мир Полудня', year=1962, category=category)
+        assert self.names(api_client, 'мир') == ['Мир Полудня', 'Война и мир'], (
+            'Проверьте, что совпадения с начала названия идут раньше '
+            'совпадений по словам'
+        )
+        assert self.names(api_client, 'ф') == ['Фильм']
+        assert self.names(api_client, 'ко', type='genre') == ['Комедия']
+
+    def test_served_from_memory(self, api_client, title):
+        self.names(api_client, 'про')
+        with CaptureQueriesContext(connection) as context:
+            assert self.names(api_client, 'про') == [title.name]
+        assert not context.captured_queries, (
+            'Проверьте, что подсказки выдаются без запросов к БД'
+        )
+
+    def test_follows_writes(self, api_client, genres, commit):
+        genre = genres[0]
+        assert self.names(api_client, 'драм') == ['Драма']
+        genre.name = 'Триллер'
+        with commit():
+            genre.save()
+        assert self.names(api_client, 'драм') == []
+        assert self.names(api_client, 'трил') == ['Триллер']
+        with commit():
+            Genre.objects.get(pk=genre.pk).delete()
+        assert self.names(api_client, 'трил') == []
+
+    def test_rolled_back_writes(self, api_client, genres):
+        assert self.names(api_client, 'драм') == ['Драма']
+        with pytest.raises(DatabaseError), transaction.atomic():
+            Genre.objects.create(name='Триллер', slug='thriller')
+            Genre.objects.filter(name='Драма').get().delete()
+            raise DatabaseError
+        assert self.names(api_client, 'драм') == ['Драма']
+        assert self.names(api_client, 'трил') == [], (
+            'Проверьте, что откаченные записи не попадают в подсказки'
+        )
+
+    def test_limit(self, api_client, make_titles):
+        make_titles(5)
+        assert len(self.names(api_client, 'произв', limit=3)) == 3
+        assert self.names(api_client, '') == []
+
+    def test_unknown_type(self, api_client, title):
+        response = api_client.get(self.url, {'q': 'про', 'type': 'bogus'})
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестный `type` возвращает 400'
+        )
+
+    def test_stale_index_does_not_block(self, api_client, title, settings):
+        self.names(api_client, 'про')
+        settings.SUGGEST_TTL = 0
+        with suggestions.build_lock:
+            with CaptureQueriesContext(connection) as context:
+                assert self.names(api_client, 'про') == [title.name]
+        assert not context.captured_queries, (
+            'Проверьте, что пока индекс перестраивается другим потоком, '
+            'подсказки выдаются по старому индексу'
+        )
+
+    def test_rebuild_keeps_concurrent_writes(self, genres):
+        values_list = Genre.objects.values_list
+
+        def write_during_build(*fields):
+            suggestions.add('genre', 0, make_item('genre', 0, 'Вестерн', 'w'))
+            return values_list(*fields)
+
+        with mock.patch.object(
+            Genre.objects, 'values_list', side_effect=write_during_build
+        ):
+            suggestions.rebuild()
+        assert [item['name'] for item in suggestions.search('вес', 5)] == [
+            'Вестерн'
+        ], 'Проверьте, что правки во время построения индекса не теряются'
@@ -0,0 +1,80 @@
+from unittest import mock
+
+import pytest
+
+from api.checks import throttle_cache
+from api.throttles import CacheCounters, LocalCounters
+
+
+@pytest.mark.parametrize('backend', (LocalCounters(), CacheCounters()))
+def test_counters_roll_windows(backend, settings):
+    settings.THROTTLE_CACHE_ALIAS = 'default'
+    assert backend.hit('key', 10, 60) == (0, 1)
+    assert backend.hit('key', 10, 60) == (0, 2)
+    assert backend.hit('key', 11, 60) == (2, 1), (
+        'Проверьте, что счётчик прошлого окна переходит в новое окно'
+    )
+    assert backend.hit('key', 13, 60)[0] == 0
+
+
+def test_local_cache_check(settings):
+    settings.THROTTLE_BACKEND = 'cache'
+    assert [error.id for error in throttle_cache(None)] == ['api.E002'], (
+        'Проверьте, что общие счётчики в кэше процесса дают ошибку проверки'
+    )
+    settings.THROTTLE_BACKEND = 'local'
+    assert throttle_cache(None) == []
+
+
+@pytest.mark.django_db
+class TestThrottles:
+
+    @pytest.fixture(params=('local', 'cache'))
+    def rates(self, request, settings):
+        settings.THROTTLE_BACKEND = request.param
+        settings.THROTTLE_RATES = {'catalog': '3/min', 'writes': '2/min'}
+        return settings
+
+    def test_catalog_reads(self, rates, api_client, user_client, admin_client):
+        with mock.patch('api.throttles.time', return_value=6000.0):
+            codes = [
+                api_client.get('/api/v1/genres/').status_code
+                for _ in range(4)
+            ]
+            assert codes == [200, 200, 200, 429], (
+                'Проверьте, что чтение каталога анонимами ограничено'
+            )
+            assert user_client.get('/api/v1/genres/').status_code == 200
+        with mock.patch('api.throttles.time', return_value=6090.0):
+            assert api_client.get('/api/v1/genres/').status_code == 200, (
+                'Проверьте, что окно скользит и старые запросы забываются'
+            )
+        response = admin_client.get('/api/v1/throttle/stats/')
+        assert response.json() == {'rejections': {'catalog': 1}}
+
+    def test_forwarded_clients(self, rates, api_client):
+        with mock.patch('api.throttles.time', return_value=6000.0):
+            codes = [
+                api_client.get(
+                    '/api/v1/genres/', HTTP_X_FORWARDED_FOR=address
+                ).status_code
+                for address in (
+                    '10.0.0.1', '1.1.1.1, 10.0.0.1', '2.2.2.2, 10.0.0.1',
+                    '10.0.0.1', '10.0.0.2',
+                )
+            ]
+        assert codes == [200, 200, 200, 429, 200], (
+            'Проверьте, что клиенты за прокси ограничиваются по IP, '
+            'который nginx добавил в X-Forwarded-For'
+        )
+
+    def test_writes(self, rates, user_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        codes = [
+            user_client.post(url, data={'text': '-', 'score': 5}).status_code
+            for _ in range(3)
+        ]
+        assert codes == [201, 400, 429], (
+            'Проверьте, что запись одним пользователем ограничена'
+        )
+        assert user_client.get(url).status_code == 200
@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.filters import StableOrderingFilter
+from api.views import TitleViewSet
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestTitles:
+
+    def count_list_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+        )
+        return len(context.captured_queries)
+
+    def test_list_query_count_does_not_depend_on_page_size(
+        self, api_client, make_titles, commit
+    ):
+        make_titles(2)
+        small_page = self.count_list_queries(api_client, '/api/v1/titles/')
+        with commit():
+            make_titles(8)
+        full_page = self.count_list_queries(api_client, '/api/v1/titles/')
+        assert small_page == full_page == 3, (
+            'Проверьте, что список произведений загружается постоянным '
+            'числом запросов: подсчёт, произведения с категорией, жанры'
+        )
+
+    def test_rating_filters_and_ordering(
+        self, api_client, make_titles, user
+    ):
+        low, high, unrated = make_titles(3)
+        Review.objects.create(title=low, author=user, text='-', score=2)
+        Review.objects.create(title=high, author=user, text='-', score=9)
+
+        response = api_client.get('/api/v1/titles/?rating_min=5')
+        assert [item['id'] for item in response.json()['results']] == [
+            high.id
+        ], 'Проверьте фильтр `rating_min` для произведений'
+
+        response = api_client.get('/api/v1/titles/?rating_max=5')
+        assert [item['id'] for item in response.json()['results']] == [
+            low.id
+        ], 'Проверьте фильтр `rating_max` для произведений'
+
+        response = api_client.get('/api/v1/titles/?ordering=-rating')
+        ids = [item['id'] for item in response.json()['results']]
+        rated = list(
+            Title.objects.exclude(rating=None)
+            .order_by('-rating').values_list('id', flat=True)
+        )
+        assert [i for i in ids if i != unrated.id] == rated, (
+            'Проверьте сортировку произведений по `rating`'
+        )
+
+    def test_ordering_ties_are_stable(self, api_client, make_titles):
+        titles = make_titles(12)
+        ids = []
+        for page in (1, 2):
+            response = api_client.get(
+                f'/api/v1/titles/?ordering=rating&page={page}'
+            )
+            ids += [item['id'] for item in response.json()['results']]
+        assert ids == sorted(title.id for title in titles), (
+            'Проверьте, что при равных значениях поля сортировки '
+            'произведения упорядочены по `id` и не повторяются на страницах'
+        )
+        view = TitleViewSet()
+        for query, ordering in (
+            ('?ordering=rating', ('rating', 'id')),
+            ('?ordering=-year,name', ('-year', 'name', 'id')),
+            ('', ('-year', 'id')),
+        ):
+            request = Request(APIRequestFactory().get(query))
+            assert StableOrderingFilter().get_ordering(
+                request, Title.objects.all(), view
+            ) == ordering, 'Проверьте, что сортировка заканчивается на `id`'
@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db.models import F
+
+from reviews.models import Review, TitleReviewDay
+
+
+@pytest.fixture
+def prior(settings):
+    settings.RATING_PRIOR_MEAN = 5
+    settings.RATING_PRIOR_WEIGHT = 2
+
+
+@pytest.mark.django_db
+class TestTop:
+
+    def top(self, client, query=''):
+        url = f'/api/v1/titles/top/{query}'
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает 200'
+        )
+        return response.json()['results']
+
+    def ids(self, results):
+        return [item['id'] for item in results]
+
+    def test_bayesian_order(self, api_client, prior, make_titles, user,
+                            another_user):
+        single, many, empty = make_titles(3)
+        Review.objects.create(title=single, author=user, text='-', score=10)
+        for author in (user, another_user):
+            Review.objects.create(title=many, author=author, text='-', score=9)
+        results = self.top(api_client)
+        assert self.ids(results) == [many.id, single.id], (
+            'Проверьте, что лучшие произведения сортируются по взвешенному '
+            'рейтингу и без отзывов в него не попадают'
+        )
+        assert results[0]['bayesian_rating'] == 7.0
+        assert results[1]['bayesian_rating'] == pytest.approx(20 / 3)
+
+    def test_rating_follows_reviews(self, api_client, prior, review, commit):
+        review.score = 1
+        with commit():
+            review.save()
+        assert self.top(api_client)[0]['bayesian_rating'] == 11 / 3
+        with commit():
+            review.delete()
+        assert self.top(api_client) == []
+
+    def test_filters_and_limit(self, api_client, make_titles, user):
+        titles = make_titles(3)
+        for title in titles:
+            Review.objects.create(title=title, author=user, text='-', score=5)
+        assert self.ids(self.top(api_client, '?year=2001')) == [titles[1].id]
+        assert len(self.top(api_client, '?genre=drama&category=films')) == 3
+        assert self.top(api_client, '?genre=unknown') == []
+        assert len(self.top(api_client, '?limit=2')) == 2
+
+    def test_trending_window(self, api_client, make_titles, user,
+                             another_user):
+        old, fresh = make_titles(2)
+        for author in (user, another_user):
+            Review.objects.create(title=old, author=author, text='-', score=5)
+        Review.objects.create(title=fresh, author=user, text='-', score=5)
+        TitleReviewDay.objects.filter(title=old).update(
+            day=F('day') - timedelta(days=10)
+        )
+        results = self.top(api_client, '?window=7')
+        assert self.ids(results) == [fresh.id], (
+            'Проверьте, что популярные за период считаются только по '
+            'отзывам из окна'
+        )
+        assert results[0]['recent_reviews'] == 1
+        results = self.top(api_client, '?window=30')
+        assert [item['recent_reviews'] for item in results] == [2, 1]
+
+    def test_bulk_and_refresh(self, admin_client, title, user, another_user):
+        admin_client.post(
+            f'/api/v1/titles/{title.id}/reviews/bulk/',
+            data=[
+                {'author': user.username, 'text': '-', 'score': 10},
+                {'author': another_user.username, 'text': '-', 'score': 5},
+            ],
+            format='json',
+        )
+        assert self.top(admin_client, '?window=1')[0]['recent_reviews'] == 2
+        TitleReviewDay.objects.all().delete()
+        call_command('refresh_stats')
+        assert self.top(admin_client, '?window=1')[0]['recent_reviews'] == 2
+
+    def test_bad_params(self, api_client):
+        for query in ('?limit=x', '?window=x', '?year=x'):
+            response = api_client.get(f'/api/v1/titles/top/{query}')
+            assert response.status_code == 400, (
+                f'Проверьте, что `{query}` отклоняется с кодом 400'
+            )
@@ -0,0 +1,101 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+from tests.fixtures.fixture_user import get_client
+
+
+@pytest.mark.django_db
+class TestWriteQueries:
+
+    def count_queries(self, method, url, data=None, expected_status=200):
+        with CaptureQueriesContext(connection) as context:
+            if data is None:
+                response = method(url)
+            else:
+                response = method(url, data=data, format='json')
+        assert response.status_code == expected_status, (
+            f'Проверьте, что запрос к `{url}` возвращает статус '
+            f'{expected_status}'
+        )
+        return len(context.captured_queries)
+
+    def test_review_create(self, another_user, title):
+        client = get_client(another_user)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        queries = self.count_queries(
+            client.post, url, {'text': 'Отзыв', 'score': 5}, 201
+        )
+        assert queries == 11, (
+            'Проверьте, что создание отзыва выполняет: пользователь, '
+            'произведение, точка сохранения, вставка, рейтинг, сводки '
+            'жанров и категории, отзывы за день и за месяц, '
+            'освобождение точки'
+        )
+
+    def test_review_duplicate(self, user_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        queries = self.count_queries(
+            user_client.post, url, {'text': 'Ещё', 'score': 5}, 400
+        )
+        assert queries == 6, (
+            'Проверьте, что повторный отзыв отклоняется по ограничению '
+            'уникальности, без предварительной проверки'
+        )
+        assert Review.objects.filter(title_id=review.title_id).count() == 1
+
+    def test_review_update(self, user_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        queries = self.count_queries(user_client.patch, url, {'score': 3})
+        assert queries == 9, (
+            'Проверьте, что изменение отзыва не перечитывает произведение '
+            'и автора повторно'
+        )
+        assert Title.objects.get(pk=review.title_id).rating == 3
+
+    def test_review_delete(self, user_client, comment):
+        review = comment.review
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        queries = self.count_queries(user_client.delete, url, None, 204)
+        assert queries == 12
+        assert Title.objects.get(pk=review.title_id).rating is None
+
+    def test_comment_create(self, user_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        queries = self.count_queries(
+            user_client.post, url, {'text': 'Комментарий'}, 201
+        )
+        assert queries == 3, (
+            'Проверьте, что создание комментария выполняет: пользователь, '
+            'отзыв, вставка'
+        )
+
+    def test_comment_update(self, user_client, comment):
+        review = comment.review
+        url = (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+            f'/comments/{comment.id}/'
+        )
+        queries = self.count_queries(user_client.patch, url, {'text': 'Нов'})
+        assert queries == 4
+
+    def test_comment_delete(self, user_client, comment):
+        review = comment.review
+        url = (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+            f'/comments/{comment.id}/'
+        )
+        queries = self.count_queries(user_client.delete, url, None, 204)
+        assert queries == 4
+
+    def test_comment_requires_review_of_title(
+        self, user_client, make_titles, review
+    ):
+        other = make_titles(2)[1]
+        url = f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == 404, (
+            'Проверьте, что отзыв ищется только среди отзывов '
+            'произведения из адреса'
+        )